@@ -10,9 +10,10 @@ INPUT_DIR = ASSETS_DIR / "input"
 OUTPUT_DIR = ASSETS_DIR / "output"
 LOGS_DIR = BASE_DIR / "logs"
 UPLOAD_DIR = BASE_DIR / "uploads"  # Untuk upload file via web
+JOBS_DIR = ASSETS_DIR / "jobs"     # Database antrian job OCR
 
 # ----- Buat direktori jika belum ada -----
-for d in [INPUT_DIR, OUTPUT_DIR, LOGS_DIR, UPLOAD_DIR]:
+for d in [INPUT_DIR, OUTPUT_DIR, LOGS_DIR, UPLOAD_DIR, JOBS_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
 # ----- Path gambar default (opsional) -----
@@ -34,7 +35,169 @@ OCR_CONFIG = {
     'enhancement_level': 'aggressive',   # Untuk gambar buruk
     'confidence_threshold': 0.2,
     'enable_text_correction': True,
-    'enable_word_dictionary': True
+    'enable_word_dictionary': True,
+    'reader_pool_size': 1,           # Jumlah reader EasyOCR yang dimuat sekali per proses
+    'quantize': True,                # int8 dinamis (LSTM/Linear recognizer) di CPU; bandingkan
+                                     # dulu dengan `python -m utils.quantize_bench`
+    'model_cache_dir': ASSETS_DIR / "cache" / "models",  # Modul reader siap pakai (CPU); None = mati
+    'save_output_files': True,       # Tulis *_text.txt & *_detail.txt ke OUTPUT_DIR
+    'auto_rotate': False,            # Luruskan kartu miring (> 5 derajat) sebelum OCR
+    'enhance_text': False,           # Bilateral + CLAHE + sharpen sebelum OCR; nyalakan setelah
+                                     # dibandingkan dengan `python -m utils.preprocess_bench`
+    'recognition_variants': [],      # mis. ['clahe', 'otsu']: deteksi sekali, box yang sama
+                                     # dikenali ulang di varian ini, ambil confidence tertinggi
+    'warmup_on_startup': True        # Muat + inferensi dummy saat app start (background)
+}
+
+# ----- Pembagian CPU proses OCR (utils/resources.py) -----
+# workers x threads_per_worker sebaiknya tidak melebihi jumlah CPU. None =
+# hasil `python -m utils.resources calibrate` jika ada, selain itu cpu // 4 worker.
+RESOURCE_CONFIG = {
+    'cpus': None,                # Batasi jumlah CPU yang dipakai (None = semua yang diizinkan)
+    'workers': None,             # Proses OCR (web prefork / worker job / batch / terawasi)
+    'threads_per_worker': None,  # Thread torch + OpenCV per proses (None = cpus // workers)
+    'pin_cpus': False,           # Affinity: setiap worker dipin ke irisan core sendiri
+    'calibration_file': ASSETS_DIR / "cache" / "resources.json",
+}
+
+# ----- Antrian job OCR (background) -----
+JOB_CONFIG = {
+    'db_path': JOBS_DIR / "jobs.sqlite3",  # Bisa diletakkan di filesystem bersama
+    'workers': None,             # Jumlah proses worker (None = RESOURCE_CONFIG)
+    'poll_interval': 1.0,        # Detik menunggu saat antrian kosong
+    'lease_timeout': 600,        # Job 'running' lebih lama dari ini dianggap worker mati
+    'max_attempts': 3,           # Percobaan maksimal sebelum job ditandai gagal
+    'deadline': 120,             # Detik maksimal OCR satu job (dicek di setiap checkpoint tahap)
+    'cancel_check_interval': 1.0,  # Detik minimal antar cek pembatalan job ke database
+}
+
+# ----- Worker OCR terawasi (isolasi crash + deadline keras per gambar) -----
+# Jika aktif, OCR di web/worker job dijalankan di proses terpisah yang dibunuh
+# dan dijalankan ulang saat macet/crash. Setiap proses memuat model sendiri
+# (memori model x workers) dan micro-batching in-process tidak dipakai.
+SUPERVISOR_CONFIG = {
+    'enabled': False,
+    'workers': None,             # Proses OCR terawasi per proses web/worker (None = RESOURCE_CONFIG)
+    'deadline': 60,              # Detik maksimal per gambar sebelum dibatalkan
+    'cancel_grace': 5,           # Detik menunggu checkpoint setelah cancel sebelum kill
+    'startup_timeout': 180,      # Detik maksimal worker memuat model
+}
+
+# ----- Batch upload (banyak file / arsip ZIP/TAR) -----
+BATCH_CONFIG = {
+    'workers': None,             # Proses OCR paralel, masing-masing memuat reader (None = RESOURCE_CONFIG)
+    'max_entries': 500,          # Maksimal gambar per batch
+    'max_entry_mb': 50,          # Maksimal ukuran satu gambar di dalam arsip
+}
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+# ----- Cache hasil OCR (key: sha256 gambar + fingerprint OCR_CONFIG) -----
+CACHE_CONFIG = {
+    'enabled': True,
+    'memory_items': 256,                       # LRU di memori per proses
+    'disk_dir': ASSETS_DIR / "cache" / "results",
+    'disk_max_mb': 200,                        # Eviction file paling lama dipakai
+}
+
+# ----- Micro-batching request OCR bersamaan di proses web -----
+BATCHING_CONFIG = {
+    'enabled': True,
+    'window_ms': 20,             # Lama menunggu request lain sebelum batch dijalankan
+    'max_batch': 8,              # Gambar maksimal per batch
+    'recognize_batch': 16,       # Crop text per batch recognizer
+}
+
+# ----- Admission control endpoint OCR (backpressure saat burst) -----
+ADMISSION_CONFIG = {
+    'enabled': True,
+    # Inferensi torch sudah multi-thread; slot lebih banyak dari ini hanya saling rebut core.
+    # None = worker OCR dari rencana CPU proses ini (resources.child_plan), dikali
+    # max_batch jika batching (satu slot inferensi melayani max_batch request).
+    # Angka eksplisit = total untuk semua worker serve.py (dibagi rata).
+    'max_concurrent': None,
+    'max_queue': 16,             # Request menunggu slot; lebih dari ini langsung 503
+    'queue_timeout': 30.0,       # Detik maksimal menunggu slot sebelum 503
+    'retry_after': 5,            # Retry-After minimal (detik) pada response 503
+}
+
+# ----- Server produksi prefork (python serve.py) -----
+SERVER_CONFIG = {
+    'host': '0.0.0.0',
+    'port': 8000,
+    'workers': None,             # Proses fork; bobot model dibagi copy-on-write (None = RESOURCE_CONFIG)
+    'threads_per_worker': None,  # Thread torch/OpenCV per worker (None = RESOURCE_CONFIG)
+    'respawn_delay': 1.0,        # Detik sebelum worker yang mati dijalankan ulang
+}
+
+# ----- Kebijakan resolusi deteksi -----
+# Skala deteksi CRAFT dipilih dari tinggi huruf yang terukur di gambar; box
+# hasil deteksi dikembalikan ke koordinat penuh dan rekognisi memakai gambar asli.
+RESOLUTION_CONFIG = {
+    'enabled': True,
+    'detect_text_height': 24,        # Tinggi huruf target (px) saat deteksi
+    'min_detect_scale': 0.25,
+    'max_detect_scale': 1.5,
+    'detect_on_downscaled': True,    # Deteksi di salinan kecil (INTER_AREA), bukan resize CRAFT
+    'min_text_height': 16,           # Preprocess hanya upscale jika huruf lebih kecil dari ini
+    'max_upscale': 1.8,
+    'card_text_ratio': 0.04,         # Perkiraan tinggi huruf / sisi pendek kartu (fallback)
+    'estimate_max_side': 1024,       # Resolusi kerja saat mengukur tinggi huruf
+}
+
+# ----- Mode template KTP (rekognisi per field tanpa deteksi CRAFT) -----
+# Koordinat box relatif terhadap kartu (0..1: x0, y0, x1, y1), layout e-KTP.
+_KTP_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ "
+_KTP_DIGITS = "0123456789"
+KTP_TEMPLATE_CONFIG = {
+    'enabled': False,
+    'card_aspect': 85.6 / 54,        # Ukuran kartu ID-1 (mm)
+    'aspect_tolerance': 0.15,        # Selisih rasio yang masih dianggap kartu
+    'min_card_area': 0.35,           # Kontur kartu minimal 35% luas gambar
+    'canvas_width': 1000,            # Lebar kartu setelah diluruskan (pixel)
+    'min_nik_digits': 16,            # NIK kurang dari ini -> fallback ke readtext
+    'label_box': (0.03, 0.24),       # Kolom label (x0, x1)
+    'fields': [
+        # (label, (x0, y0, x1, y1) box nilai, allowlist)
+        ("NIK", (0.20, 0.150, 0.72, 0.250), _KTP_DIGITS),
+        ("Nama", (0.26, 0.255, 0.72, 0.320), _KTP_UPPER + ".,'-"),
+        ("Tempat/Tgl Lahir", (0.26, 0.320, 0.72, 0.385), _KTP_UPPER + _KTP_DIGITS + ",.-"),
+        ("Jenis Kelamin", (0.26, 0.385, 0.50, 0.445), "ABEIKLMNPRU- "),
+        ("Gol. Darah", (0.60, 0.385, 0.72, 0.445), "ABO-+"),
+        ("Alamat", (0.26, 0.445, 0.72, 0.505), _KTP_UPPER + _KTP_DIGITS + ".,/-"),
+        ("RT/RW", (0.26, 0.505, 0.50, 0.560), _KTP_DIGITS + "/"),
+        ("Kel/Desa", (0.26, 0.560, 0.72, 0.615), _KTP_UPPER + _KTP_DIGITS + ".-"),
+        ("Kecamatan", (0.26, 0.615, 0.72, 0.670), _KTP_UPPER + ".-"),
+        ("Agama", (0.26, 0.670, 0.72, 0.725), _KTP_UPPER),
+        ("Status Perkawinan", (0.26, 0.725, 0.72, 0.780), _KTP_UPPER),
+        ("Pekerjaan", (0.26, 0.780, 0.72, 0.835), _KTP_UPPER + "/."),
+        ("Kewarganegaraan", (0.26, 0.835, 0.72, 0.890), "WNIA "),
+        ("Berlaku Hingga", (0.26, 0.890, 0.72, 0.945), _KTP_UPPER + _KTP_DIGITS + "-"),
+    ],
+}
+
+# ----- Engine OCR (src/engines): easyocr, tesseract, atau auto -----
+# 'auto' = router: engine dengan perkiraan biaya per hasil valid terendah
+# dicoba dulu (mis. Tesseract + whitelist digit untuk baris NIK), engine
+# berikutnya hanya dipakai jika hasilnya gagal validasi.
+ENGINE_CONFIG = {
+    'engine': 'easyocr',                  # Engine OCRProcessor (web / job / batch / template)
+    'engines': ['tesseract', 'easyocr'],  # Kandidat router; urutan awal saat biaya sama
+    'prior_seconds': {'tesseract': 0.2, 'easyocr': 1.0},  # Perkiraan biaya sebelum terukur
+    'min_confidence': 0.5,                # Field template di bawah ini -> eskalasi
+    'tesseract_lang': 'ind',
+    'tesseract_cmd': None,                # Path binary tesseract (None = dari PATH)
+    'tesseract_tmp_dir': '/dev/shm',      # File sementara batch (tmpfs); None / tidak ada = temp default
+}
+
+# ----- Thumbnail gambar upload untuk halaman hasil -----
+THUMBNAIL_CONFIG = {
+    'dir': ASSETS_DIR / "cache" / "thumbs",
+    'widths': (240, 480, 960),   # Lebar tetap; permintaan lain dibulatkan ke atas
+    'max_mb': 100,               # Eviction thumbnail paling lama tidak dipakai
+    'jpeg_quality': 80,
+    'webp_quality': 75,
+    'max_age': 365 * 24 * 3600,  # Cache-Control untuk file bernama hash isi (immutable)
+    'mutable_max_age': 300,      # Cache-Control untuk nama file lama yang bisa berubah
 }
 
 # ----- Format file -----
@@ -43,6 +206,15 @@ SUPPORTED_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
 # ----- Flask upload -----
 ALLOWED_EXTENSIONS = {ext.strip('.') for ext in SUPPORTED_FORMATS}  # {'jpg','png',...}
 
+# ----- Upload web -----
+UPLOAD_CONFIG = {
+    'zero_disk': True,           # Decode langsung dari request, tanpa file.save() dulu
+    'persist_uploads': True,     # Simpan file asli ke UPLOAD_DIR di background
+    'max_mb': 50,                # Ukuran upload maksimal
+    'max_pixels': 40_000_000,    # Tolak gambar raksasa dari header (sebelum decode)
+    'header_bytes': 64 * 1024,   # Byte awal yang dibaca untuk mengenali format/dimensi
+}
+
 # ----- Logging -----
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 LOG_LEVEL = 'INFO'
@@ -1,32 +1,62 @@
+import atexit
 import logging
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
-from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Blueprint, Flask, Response, current_app, render_template, request, redirect, url_for, flash, send_file, send_from_directory, jsonify
 from werkzeug.utils import secure_filename
 
-from config import LOG_FORMAT, LOG_LEVEL, LOGS_DIR, ALLOWED_EXTENSIONS, UPLOAD_DIR
-from src.ocr_processor import OCRProcessor
+from config import (LOG_FORMAT, LOG_LEVEL, LOGS_DIR, ALLOWED_EXTENSIONS, UPLOAD_DIR, UPLOAD_CONFIG,
+                    OCR_CONFIG, THUMBNAIL_CONFIG)
+from src.batch_processor import iter_upload_entries, process_batch
+from src.job_queue import JobQueue
+from src.ocr_processor import OCRTimeout, shutdown_readers
+from src.supervisor import OCRWorkerCrashed, create_ocr_processor
+from src.ocr_stream import OCRProgressStream, cancel as cancel_ocr_stream
+from utils.admission import AdmissionRejected, get_admission_controller
+from utils.content_store import ContentStore, content_digest
+from utils.export_utils import FORMATS as EXPORT_FORMATS, iter_export, iter_filtered_rows, parse_time
+from utils.metrics import STARTUP_DURATION, gauge, render_metrics, stage_timer, track_request
+from utils.thumbnails import FORMATS, ThumbnailCache, is_immutable_name, pick_format, pick_width
+from utils.upload_utils import UploadRejected, read_image_upload
 from utils.validation import validate_setup
 
 # --- Excel ---
-from utils.excel_utils import save_to_excel_structured   # 🔹 gunakan fungsi baru
+from utils.excel_utils import HEADERS, save_result_to_excel, save_rows_to_excel   # 🔹 gunakan fungsi baru
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 # ----- Setup Flask -----
-app = Flask(__name__)
-app.secret_key = "supersecretkey"
+bp = Blueprint("web", __name__)
 
 UPLOAD_FOLDER = UPLOAD_DIR
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 # Folder hasil OCR
 OUTPUT_FOLDER = Path("assets/output")
 OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
 
+logger = logging.getLogger(__name__)
+
+# Objek bersama per proses, diisi init_services() lewat create_app()
+SETUP_VALID = False
+startup_warmup = False  # Reader dimuat + warmup saat startup (readiness menunggu warm)
+ocr_processor = None
+admission = None
+job_queue = None
+batch_inline = False   # serve.py: batch memakai OCR worker prefork, bukan process pool sendiri
+upload_store = None
+thumbnail_cache = None
+
 # ----- Logging -----
 def setup_logging():
+    if logging.getLogger().handlers:
+        return logger
     log_file = LOGS_DIR / f"ocr_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     logging.basicConfig(
         level=getattr(logging, LOG_LEVEL),
@@ -36,41 +66,485 @@ def setup_logging():
             logging.StreamHandler(sys.stdout)
         ]
     )
-    return logging.getLogger(__name__)
+    return logger
+
+def init_services(warmup=None):
+    """
+    Siapkan objek bersama proses (sekali saja): validasi setup, OCRProcessor,
+    admission control, antrian job, dan content store upload.
+
+    Args:
+        warmup (bool, optional): Muat + warmup reader di background thread
+            (default OCR_CONFIG['warmup_on_startup']). serve.py memakai False
+            karena reader sudah dimuat di proses master sebelum fork.
+    """
+    global SETUP_VALID, ocr_processor, admission, job_queue, upload_store, thumbnail_cache, startup_warmup
+    if ocr_processor is not None:
+        return
+
+    # Validasi setup sekali saat startup (bukan per request)
+    SETUP_VALID = validate_setup()
+    if not SETUP_VALID:
+        logger.error("Setup tidak valid. Endpoint OCR menolak request sampai diperbaiki.")
+
+    # OCR processor (reader dimuat sekali per proses, atau di worker terawasi
+    # jika SUPERVISOR_CONFIG['enabled'])
+    ocr_processor = create_ocr_processor()
+    atexit.register(shutdown_readers)
+    if warmup is None:
+        warmup = OCR_CONFIG['warmup_on_startup']
+    startup_warmup = bool(SETUP_VALID and warmup)
+    if startup_warmup:
+        # Di background supaya /healthz sudah bisa menjawab selama model dimuat
+        threading.Thread(target=ocr_processor.warmup, name="ocr-warmup", daemon=True).start()
+
+    # Admission control: batasi OCR bersamaan, 503 jika antrian penuh
+    admission = get_admission_controller()
+
+    # Antrian job OCR (diproses oleh worker.py)
+    job_queue = JobQueue()
+    gauge("ocr_job_queue_depth", "Job OCR berstatus queued di antrian",
+          fn=lambda: job_queue.counts().get("queued", 0))
+
+    upload_store = ContentStore(UPLOAD_FOLDER)
+    thumbnail_cache = ThumbnailCache(UPLOAD_FOLDER)
+
+def create_app(warmup=None):
+    """
+    App factory Flask
+
+    Args:
+        warmup (bool, optional): Diteruskan ke init_services
+
+    Returns:
+        Flask: Aplikasi dengan semua route terdaftar
+    """
+    started = time.perf_counter()
+    setup_logging()
+    init_services(warmup)
+
+    app = Flask(__name__)
+    app.secret_key = "supersecretkey"
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    # Request dengan Content-Length di atas batas langsung ditolak (413) oleh Flask
+    app.config['MAX_CONTENT_LENGTH'] = UPLOAD_CONFIG['max_mb'] * 1024 * 1024 + 1024 * 1024
+    app.register_blueprint(bp)
+
+    STARTUP_DURATION.set(_IMPORT_SECONDS, phase="import")
+    STARTUP_DURATION.set(time.perf_counter() - started, phase="create_app")
+    return app
+
+_app = None
+_app_lock = threading.Lock()
+
+def __getattr__(name):
+    """
+    `main:app` untuk `flask --app main run`, gunicorn, dan konfigurasi WSGI
+    lama: app dibuat saat atribut pertama kali diakses, jadi `import main`
+    tetap murah (lihat utils/startup_profile.py)
+    """
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if _app is None:
+            _app = create_app()
+    return _app
+
+@bp.app_errorhandler(AdmissionRejected)
+def admission_rejected(e):
+    response = jsonify({"error": str(e), "retry_after": e.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
 
-logger = setup_logging()
+@bp.app_errorhandler(OCRTimeout)
+def ocr_timeout(e):
+    logger.warning(f"OCR timeout: {str(e)}")
+    return jsonify({"error": "OCR melewati batas waktu", "detail": str(e)}), 504
+
+@bp.app_errorhandler(OCRWorkerCrashed)
+def ocr_worker_crashed(e):
+    logger.error(f"Worker OCR crash: {str(e)}")
+    return jsonify({"error": "Worker OCR berhenti saat memproses gambar"}), 502
 
 # ----- Utility -----
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def read_ocr_result(file_path: Path):
-    """Membaca file .txt hasil OCR"""
-    if not file_path.exists():
-        return None
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
+def ocr_upload(file, filename):
+    """
+    Jalankan OCR untuk satu FileStorage upload
+
+    Mode zero_disk: upload dibaca ke buffer terbatas, header dicek, lalu
+    di-decode sekali dengan cv2.imdecode; file asli disimpan di background.
+    File upload disimpan di content store (nama = sha256 isi file).
+
+    Returns:
+        tuple: (OCRResult atau None jika gagal, nama file di UPLOAD_FOLDER
+                atau None jika upload tidak disimpan)
+
+    Raises:
+        UploadRejected: Jika upload ditolak (ukuran/format/dimensi)
+    """
+    if not UPLOAD_CONFIG['zero_disk']:
+        with stage_timer('upload_receive'):
+            data = file.read()
+        stored_name = upload_store.put(data, Path(filename).suffix)
+        file_path = upload_store.path_for(stored_name)
+        logger.info(f"File diupload: {file_path}")
+        with admission.admit():
+            return ocr_processor.process_image(file_path, source_name=filename), stored_name
+
+    return ocr_stream(file.stream, filename)
+
+def ocr_stream(stream, filename, persist=None, save_files=None):
+    """
+    OCR langsung dari stream request (tanpa menulis upload ke disk dulu)
+
+    Args:
+        stream: File-like berisi gambar (FileStorage.stream / request.stream)
+        filename (str): Nama file asli
+        persist (bool, optional): Simpan upload asli (default UPLOAD_CONFIG)
+        save_files (bool, optional): Tulis file text/detail (default OCR_CONFIG)
+
+    Returns:
+        tuple: Sama seperti ocr_upload
+
+    Raises:
+        UploadRejected: Jika upload ditolak
+        AdmissionRejected: Jika antrian OCR penuh / timeout
+    """
+    data, digest, stored_name, timings = receive_upload(stream, filename, persist)
+    with admission.admit():
+        result = ocr_processor.process_bytes(data, filename, save_files=save_files,
+                                             digest=digest, timings=timings)
+    return result, stored_name
+
+def receive_upload(stream, filename, persist=None):
+    """
+    Baca upload gambar dari stream request dan simpan aslinya (opsional)
+
+    Returns:
+        tuple: (bytes, sha256 digest, nama file tersimpan atau None, dict timings)
+
+    Raises:
+        UploadRejected: Jika upload ditolak (ukuran/format/dimensi)
+    """
+    if persist is None:
+        persist = UPLOAD_CONFIG['persist_uploads']
+    timings = {}
+    with stage_timer('upload_receive', timings):
+        data, info = read_image_upload(stream, request.content_length)
+    logger.info(f"Upload diterima: {filename} ({info['format']}, {len(data)} bytes)")
+    digest = content_digest(data)
+    stored_name = None
+    if persist:
+        stored_name = upload_store.put(data, f".{info['format']}", digest, background=True)
+    return data, digest, stored_name, timings
+
+def request_image_stream():
+    """
+    Ambil (filename, stream) gambar dari request: multipart 'image' atau
+    body mentah image/* (nama file dari query '?filename=').
+
+    Returns:
+        tuple: (filename, stream), atau (None, None) jika tidak ada gambar
+    """
+    file = request.files.get("image")
+    if file is not None and file.filename:
+        return secure_filename(file.filename), file.stream
+    if request.mimetype.startswith("image/") or request.mimetype == "application/octet-stream":
+        return secure_filename(request.args.get("filename", "")) or "upload", request.stream
+    return None, None
+
+def request_flag(name, default):
+    """Baca opsi boolean dari query string / form (1/0, true/false, yes/no)"""
+    value = request.values.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# ----- Health check (untuk load balancer) -----
+@bp.route("/healthz")
+def healthz():
+    """Liveness: proses hidup dan bisa menjawab request"""
+    return jsonify({"status": "ok"})
+
+@bp.route("/readyz")
+def readyz():
+    """
+    Readiness: setup valid dan reader EasyOCR sudah dimuat + warm. Tanpa
+    warmup di startup reader baru dimuat oleh request pertama, jadi hanya
+    setup yang diperiksa (kalau tidak, /readyz 503 selamanya).
+    """
+    reader = ocr_processor.reader_status()
+    ready = SETUP_VALID and (not startup_warmup or (reader['loaded'] and reader['warm']))
+    body = {"ready": ready, "setup_valid": SETUP_VALID, "reader": reader}
+    return jsonify(body), (200 if ready else 503)
+
+# ----- Metrics (format teks Prometheus) -----
+@bp.route("/metrics")
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 # ----- Route untuk serve file upload -----
-@app.route('/uploads/<filename>')
+def _upload_max_age(filename):
+    if is_immutable_name(filename):
+        return THUMBNAIL_CONFIG['max_age']
+    return THUMBNAIL_CONFIG['mutable_max_age']
+
+@bp.route('/uploads/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    response = send_from_directory(current_app.config['UPLOAD_FOLDER'], filename,
+                                   max_age=_upload_max_age(filename))
+    response.cache_control.public = True
+    if is_immutable_name(filename):
+        response.cache_control.immutable = True
+    return response
+
+@bp.route('/uploads/<filename>/thumb/<int:width>')
+def upload_thumbnail(filename, width):
+    """
+    Thumbnail file upload (dibuat sekali, lalu dari cache disk).
+    Format dari query '?format=jpeg|webp' atau header Accept.
+    """
+    filename = secure_filename(filename)
+    fmt = request.args.get("format")
+    if fmt is None:
+        fmt = pick_format(request.headers.get("Accept"))
+    elif fmt not in FORMATS:
+        return jsonify({"error": "Format thumbnail harus jpeg atau webp"}), 400
+
+    path, mimetype = thumbnail_cache.get(filename, pick_width(width), fmt)
+    if path is None:
+        return jsonify({"error": "Gambar tidak ditemukan"}), 404
+
+    response = send_file(path, mimetype=mimetype, etag=path.name,
+                         max_age=_upload_max_age(filename), conditional=True)
+    response.cache_control.public = True
+    if is_immutable_name(filename):
+        response.cache_control.immutable = True
+    if "format" not in request.args:
+        response.vary.add("Accept")
+    return response
 
 # ----- Route download Excel -----
-@app.route("/download_excel")
+@bp.route("/download_excel")
 def download_excel():
     excel_file = OUTPUT_FOLDER / "ocr_results.xlsx"
     if excel_file.exists():
         return send_from_directory(excel_file.parent, excel_file.name, as_attachment=True)
     else:
         flash("File Excel belum tersedia.")
-        return redirect(url_for("index"))
+        return redirect(url_for("web.index"))
+
+@bp.route("/export")
+@track_request("export")
+def export_results():
+    """
+    Export hasil OCR sebagai CSV atau JSON Lines, dikirim per baris.
+    Query: format=csv|jsonl, since, until (YYYY-MM-DD atau ISO datetime;
+    since inklusif, until eksklusif), nik_prefix, source.
+    """
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Format export harus csv atau jsonl"}), 400
+    try:
+        since = parse_time(request.args.get("since"))
+        until = parse_time(request.args.get("until"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = iter_filtered_rows(
+        since=since,
+        until=until,
+        nik_prefix=request.args.get("nik_prefix"),
+        source=request.args.get("source"),
+    )
+    filename = f"ocr_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(iter_export(fmt, rows), mimetype=EXPORT_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}",
+                             "X-Accel-Buffering": "no"})
+
+# ----- Routes job OCR (async) -----
+@bp.route("/jobs", methods=["POST"])
+@track_request("jobs_submit")
+def submit_job():
+    file = request.files.get("image")
+    if file is None or file.filename == "":
+        return jsonify({"error": "Tidak ada file yang dipilih"}), 400
+    if not allowed_file(file.filename):
+        return jsonify({"error": "Format file tidak didukung"}), 400
+
+    # Disimpan per hash isi supaya upload dengan nama sama tidak saling menimpa
+    filename = secure_filename(file.filename)
+    stored_name = upload_store.put(file.read(), Path(filename).suffix)
+
+    job_id = job_queue.submit(upload_store.path_for(stored_name), filename)
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for("web.job_status", job_id=job_id),
+    }), 202
+
+@bp.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job tidak ditemukan"}), 404
+    return jsonify({
+        "job_id": job["id"],
+        "status": job["status"],
+        "source_file": job["source_name"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "error": job["error"],
+    })
+
+@bp.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    if not job_queue.cancel(job_id):
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job tidak ditemukan"}), 404
+        return jsonify({"error": f"Job sudah {job['status']}"}), 409
+    return jsonify({"job_id": job_id, "status": "cancelled"})
+
+# ----- JSON API -----
+@bp.route("/api/v1/ocr", methods=["POST"])
+@track_request("api_ocr")
+def api_ocr():
+    """
+    OCR satu gambar dan kembalikan field KTP sebagai JSON
+
+    Input: multipart field 'image', atau body mentah (Content-Type image/*)
+    dengan nama file opsional di query '?filename='.
+    Opsi (query/form): write_files, excel, store_upload (1/0).
+    """
+    if not SETUP_VALID:
+        return jsonify({"error": "Setup tidak valid"}), 503
+
+    filename, stream = request_image_stream()
+    if stream is None:
+        return jsonify({"error": "Kirim gambar sebagai multipart 'image' atau body image/*"}), 400
+
+    write_files = request_flag("write_files", OCR_CONFIG['save_output_files'])
+    write_excel = request_flag("excel", True)
+    store_upload = request_flag("store_upload", UPLOAD_CONFIG['persist_uploads'])
+
+    try:
+        result, stored_name = ocr_stream(stream, filename, persist=store_upload,
+                                         save_files=write_files)
+    except UploadRejected as e:
+        return jsonify({"error": str(e)}), e.status
+    if result is None:
+        return jsonify({"error": "OCR gagal memproses gambar"}), 422
+
+    if write_excel:
+        save_result_to_excel(result, filename)
+
+    body = result.to_dict()
+    body["fields"] = {h: result.fields.get(h, "") for h in HEADERS[2:]}
+    body["stored_upload"] = stored_name
+    body["excel"] = write_excel
+    return jsonify(body)
+
+@bp.route("/api/v1/ocr/stream", methods=["POST"])
+@track_request("api_ocr_stream")
+def api_ocr_stream():
+    """
+    Sama seperti /api/v1/ocr, tetapi progress dikirim sebagai server-sent
+    events: started, stage (loaded/preprocessed/detected/recognized),
+    token, field (begitu nilainya terbaca), lalu done/error/cancelled.
+    Stream dibatalkan jika client memutus koneksi atau memanggil
+    POST /api/v1/ocr/stream/<stream_id>/cancel.
+    """
+    if not SETUP_VALID:
+        return jsonify({"error": "Setup tidak valid"}), 503
+
+    filename, stream = request_image_stream()
+    if stream is None:
+        return jsonify({"error": "Kirim gambar sebagai multipart 'image' atau body image/*"}), 400
+
+    write_files = request_flag("write_files", OCR_CONFIG['save_output_files'])
+    write_excel = request_flag("excel", True)
+    store_upload = request_flag("store_upload", UPLOAD_CONFIG['persist_uploads'])
+
+    # Body dibaca di sini, sebelum response streaming dimulai
+    try:
+        data, digest, stored_name, timings = receive_upload(stream, filename, store_upload)
+    except UploadRejected as e:
+        return jsonify({"error": str(e)}), e.status
+
+    # Slot diambil sebelum response dimulai supaya penolakan tetap berupa 503
+    ticket = admission.admit()
+
+    def run(progress):
+        try:
+            return ocr_processor.process_bytes(data, filename, save_files=write_files, digest=digest,
+                                               timings=timings, progress=progress)
+        finally:
+            ticket.release()
+
+    def on_result(result):
+        if write_excel:
+            save_result_to_excel(result, filename)
+        return {"stored_upload": stored_name, "excel": write_excel}
+
+    progress_stream = OCRProgressStream(run, on_result)
+    response = Response(progress_stream.events(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # Jika stream tidak pernah dimulai, slot tetap dilepas saat response ditutup
+    response.call_on_close(ticket.release)
+    return response
+
+@bp.route("/api/v1/ocr/stream/<stream_id>/cancel", methods=["POST"])
+def api_ocr_stream_cancel(stream_id):
+    if not cancel_ocr_stream(stream_id):
+        return jsonify({"error": "Stream tidak ditemukan"}), 404
+    return jsonify({"stream_id": stream_id, "cancelled": True})
+
+# ----- Route batch (banyak file / ZIP / TAR) -----
+@bp.route("/batch", methods=["POST"])
+@track_request("batch")
+def batch_upload():
+    files = request.files.getlist("images")
+    if not any(f.filename for f in files):
+        if request.form.get("view") == "html":
+            flash("Tidak ada file yang dipilih!")
+            return redirect(url_for("web.index"))
+        return jsonify({"error": "Tidak ada file yang dipilih"}), 400
+
+    # Satu batch memegang satu slot admission (503 + Retry-After jika penuh)
+    with admission.admit():
+        results = process_batch(iter_upload_entries(files),
+                                ocr=ocr_processor if batch_inline else None)
+
+    # Semua baris ditulis ke Excel dengan satu kali simpan
+    rows = [(r['fields'], r['source_file']) for r in results if 'fields' in r]
+    if rows:
+        save_rows_to_excel(rows)
+    logger.info(f"Batch selesai: {len(rows)}/{len(results)} berhasil")
+
+    if request.form.get("view") == "html":
+        return render_template("index.html", batch_results=results)
+    return jsonify({
+        "processed": len(rows),
+        "failed": len(results) - len(rows),
+        "results": results,
+    })
 
 # ----- Routes utama -----
-@app.route("/", methods=["GET", "POST"])
+@bp.route("/", methods=["GET", "POST"])
+@track_request("index")
 def index():
     result_text = None
     result_filename = None
+    image_name = None
 
     if request.method == "POST":
         if "image" not in request.files:
@@ -84,35 +558,33 @@ def index():
 
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file_path = app.config['UPLOAD_FOLDER'] / filename
-            file.save(file_path)
-            logger.info(f"File diupload: {file_path}")
 
             try:
-                if not validate_setup():
+                if not SETUP_VALID:
                     flash("Setup tidak valid. Cek konfigurasi!")
                     return redirect(request.url)
 
-                # Jalankan OCR
-                ocr = OCRProcessor()
-                ocr.process_image(str(file_path))
+                # Jalankan OCR (hasil terstruktur langsung di memori)
+                result, image_name = ocr_upload(file, filename)
+                if result is None:
+                    flash("OCR gagal memproses gambar.")
+                    return redirect(request.url)
                 logger.info(f"OCR selesai untuk {filename}")
 
-                # Ambil file detail terbaru
-                detail_files = list(OUTPUT_FOLDER.glob("*_detail.txt"))
-                if detail_files:
-                    latest_detail = max(detail_files, key=lambda f: f.stat().st_mtime)
-                    result_filename = latest_detail.name
+                result_filename = filename
+                result_text = result.render_detail()
 
-                    # Baca isi file detail untuk ditampilkan
-                    result_text = read_ocr_result(latest_detail)
-
-                    # Simpan ke Excel dalam format terstruktur
-                    save_to_excel_structured(latest_detail, result_filename)
-                else:
-                    result_text = "Hasil OCR tidak ditemukan."
-                    result_filename = ""
+                # Simpan ke Excel dalam format terstruktur
+                save_result_to_excel(result, filename)
 
+            except UploadRejected as e:
+                logger.warning(f"Upload ditolak: {filename} - {str(e)}")
+                flash(f"Upload ditolak: {str(e)}")
+                return redirect(request.url)
+            except AdmissionRejected as e:
+                logger.warning(f"OCR ditolak (server sibuk): {filename}")
+                flash(f"Server sedang sibuk, coba lagi dalam {e.retry_after} detik.")
+                return render_template("index.html"), 503, {"Retry-After": str(e.retry_after)}
             except Exception as e:
                 logger.error(f"Error saat OCR: {str(e)}")
                 flash(f"Terjadi error saat OCR: {str(e)}")
@@ -121,9 +593,12 @@ def index():
             flash("Format file tidak didukung!")
             return redirect(request.url)
 
-    return render_template("index.html", result=result_text, filename=result_filename)
+    return render_template("index.html", result=result_text, filename=result_filename,
+                           image_name=image_name)
 
 
 if __name__ == "__main__":
+    # Server development; untuk produksi pakai serve.py (prefork, model dimuat sekali)
     print("Memulai EasyOCR Web App...")
-    app.run(debug=True)
+    # Tanpa reloader: reloader menjalankan proses kedua yang memuat model lagi
+    create_app().run(debug=True, use_reloader=False)
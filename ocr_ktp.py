@@ -10,6 +10,8 @@ import base64
 from datetime import datetime
 import os
 
+from src.engines import TesseractEngine, create_engine, engine_stats, has_nik, tokens_to_lines
+
 # Set page config
 st.set_page_config(
     page_title="KTP OCR Dashboard",
@@ -342,7 +344,15 @@ class EnhancedKTPPreprocessor:
 
 class KTPExtractor:
     
-    def __init__(self):
+    def __init__(self, engine=None):
+        """
+        Args:
+            engine (str, optional): None = pipeline Tesseract multi-konfigurasi bawaan;
+                'easyocr', 'tesseract' atau 'auto' = engine dari src/engines
+        """
+        self.engine = create_engine(engine) if engine else None
+        self.tesseract = TesseractEngine()
+        
         # Konfigurasi Tesseract (sesuaikan path jika diperlukan)
         if os.name == 'nt':  # Windows
             try:
@@ -647,19 +657,19 @@ class KTPExtractor:
             
             all_texts = []
             
+            # Setiap gambar ditulis sekali, satu proses Tesseract per config untuk semua gambar
+            outputs = self.tesseract.image_to_string_batch(processed_images, ocr_configs)
+            
             # Try each processed image dengan prioritas pada top region
-            for i, img in enumerate(processed_images):
+            for i in range(len(processed_images)):
                 for config in ocr_configs:
-                    try:
-                        text = pytesseract.image_to_string(img, config=config)
-                        if text and len(text.strip()) > 10:  # Minimum length untuk text yang bermakna
-                            cleaned = self.clean_text_advanced(text)
-                            if cleaned:
-                                # Berikan priority score untuk top region images
-                                priority = 2 if i < len(processed_images)//2 else 1
-                                all_texts.append((cleaned, priority))
-                    except Exception as e:
-                        continue
+                    text = outputs.get((i, config))
+                    if text and len(text.strip()) > 10:  # Minimum length untuk text yang bermakna
+                        cleaned = self.clean_text_advanced(text)
+                        if cleaned:
+                            # Berikan priority score untuk top region images
+                            priority = 2 if i < len(processed_images)//2 else 1
+                            all_texts.append((cleaned, priority))
             
             if not all_texts:
                 return ""
@@ -689,6 +699,15 @@ class KTPExtractor:
             st.error(f"Error dalam OCR: {str(e)}")
             return ""
 
+    def extract_text_with_engine(self, image):
+        """OCR lewat engine src/engines, token disusun per baris untuk regex field"""
+        try:
+            tokens = self.engine.readtext(np.array(image.convert('RGB')), validate=has_nik)
+            return self.clean_text_advanced(tokens_to_lines(tokens))
+        except Exception as e:
+            st.error(f"Error dalam OCR ({self.engine.name}): {str(e)}")
+            return ""
+
     def extract_rt_rw(self, text):
         """Ekstraksi khusus untuk RT/RW dengan deteksi garis pemisah yang diperbaiki"""
         rt_rw_patterns = [
@@ -937,11 +956,15 @@ class KTPExtractor:
     def extract_ktp_data(self, image):
         """Ekstrak data KTP dengan akurasi tinggi dan output yang lebih baik"""
         try:
-            # Preprocessing dengan fokus pada bagian atas
-            processed_images = self.preprocess_image(image)
-            
-            # OCR dengan konfigurasi optimal
-            full_text = self.extract_text_from_image(processed_images)
+            if self.engine is not None:
+                # Engine bersama (router: engine termurah dulu, eskalasi jika NIK tidak terbaca)
+                full_text = self.extract_text_with_engine(image)
+            else:
+                # Preprocessing dengan fokus pada bagian atas
+                processed_images = self.preprocess_image(image)
+                
+                # OCR dengan konfigurasi optimal
+                full_text = self.extract_text_from_image(processed_images)
             
             if not full_text.strip():
                 # Last resort: OCR simple pada gambar asli
@@ -993,7 +1016,7 @@ class KTPExtractor:
                 'fields_detected': f"{fields_found}/{len(field_order)}",
                 'quality_indicator': quality_indicator,
                 'confidence_scores': confidence_scores,
-                'extraction_method': 'Enhanced OCR with Validation',
+                'extraction_method': f'Engine {self.engine.name}' if self.engine is not None else 'Enhanced OCR with Validation',
                 'text_length': len(full_text),
                 'processing_status': 'Success' if fields_found > 5 else 'Partial'
             }
@@ -1201,6 +1224,8 @@ def main():
         st.session_state.cropped_image = None
     if 'crop_mode' not in st.session_state:
         st.session_state.crop_mode = False
+    if 'ocr_engine' not in st.session_state:
+        st.session_state.ocr_engine = None
     
     # Sidebar
     with st.sidebar:
@@ -1251,6 +1276,29 @@ def main():
         
         st.markdown("---")
         
+        # Engine OCR
+        engine_options = {
+            "Tesseract (multi-konfigurasi)": None,
+            "Otomatis (termurah dulu)": "auto",
+            "EasyOCR": "easyocr",
+        }
+        engine_label = st.selectbox(
+            "⚙ Engine OCR",
+            list(engine_options),
+            help="Otomatis: engine termurah dicoba dulu, eskalasi ke engine lain jika NIK tidak terbaca"
+        )
+        st.session_state.ocr_engine = engine_options[engine_label]
+        
+        stats = engine_stats()
+        if stats:
+            with st.expander("📈 Statistik Engine"):
+                for name, ops in stats.items():
+                    for op, entry in ops.items():
+                        st.caption(f"{name} / {op}: {entry['calls']}x, "
+                                   f"{entry['mean_seconds']:.2f}s rata-rata, hit {entry['hit_rate']:.0%}")
+        
+        st.markdown("---")
+        
         # Clear all data button
         if st.button("🗑 Clear All Data", type="secondary", use_container_width=True):
             st.session_state.extracted_records = []
@@ -1341,7 +1389,7 @@ def main():
                 with st.spinner('🔄 Memproses gambar dan mengekstrak data...'):
                     try:
                         # Initialize extractor
-                        extractor = KTPExtractor()
+                        extractor = KTPExtractor(engine=st.session_state.ocr_engine)
                         
                         # Extract data
                         extracted_data, full_text = extractor.extract_ktp_data(image_to_extract)
@@ -0,0 +1,153 @@
+"""
+Server produksi prefork untuk web OCR
+
+Proses master membuat app, memuat bobot EasyOCR satu kali, membuka socket,
+lalu fork beberapa worker yang berbagi socket itu. Halaman memori bobot
+model hanya dibaca, sehingga dibagi copy-on-write antar worker: menambah
+worker tidak menggandakan memori model. Worker yang mati dijalankan ulang.
+
+Hanya untuk Linux/macOS (butuh os.fork); di Windows pakai `python main.py`.
+
+Contoh:
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+
+from werkzeug.serving import make_server
+
+from config import ADMISSION_CONFIG, SERVER_CONFIG, SUPERVISOR_CONFIG
+from utils import resources
+from utils.admission import default_max_concurrent
+from utils.upload_utils import wait_pending_uploads
+
+logger = logging.getLogger(__name__)
+
+
+def _run_worker(server, resource_plan, index):
+    """Loop proses worker hasil fork (tidak kembali ke loop master)"""
+    import main as web
+
+    def _stop(signum, frame):
+        # Sekali saja: SIGTERM berikutnya tidak boleh memotong shutdown
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Thread pool dibuat di sini, setelah fork: pool milik master tidak fork-safe
+    resources.apply_worker(resource_plan, index)
+    # Slot admission: angka config dibagi rata antar worker, default dari jatah worker ini
+    if ADMISSION_CONFIG['max_concurrent']:
+        web.admission.max_concurrent = max(1, ADMISSION_CONFIG['max_concurrent'] // resource_plan.workers)
+    elif ADMISSION_CONFIG['enabled']:
+        web.admission.max_concurrent = default_max_concurrent()
+    # Batch memakai reader worker ini (copy-on-write), bukan process pool per worker
+    web.batch_inline = True
+    web.ocr_processor.warmup()
+    logger.info(f"Worker {os.getpid()} siap ({resource_plan.threads_per_worker} thread)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def _spawn(server, resource_plan, index):
+    pid = os.fork()
+    if pid == 0:
+        # Anak tidak boleh kembali ke loop master dan tidak boleh menjalankan
+        # handler atexit milik master (shutdown supervisor / pool batch): bereskan
+        # milik sendiri lalu os._exit
+        code = 0
+        try:
+            _run_worker(server, resource_plan, index)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 0 if e.code is None else 1
+        except Exception:
+            logger.exception(f"Worker {os.getpid()} gagal")
+            code = 1
+        try:
+            wait_pending_uploads()
+            logging.shutdown()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server web OCR prefork")
+    parser.add_argument("--host", default=SERVER_CONFIG['host'])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG['port'])
+    parser.add_argument("--workers", type=int, default=SERVER_CONFIG['workers'],
+                        help="Jumlah proses worker (default RESOURCE_CONFIG / kalibrasi)")
+    parser.add_argument("--threads", type=int, default=SERVER_CONFIG['threads_per_worker'],
+                        help="Thread torch/OpenCV per worker (default RESOURCE_CONFIG / kalibrasi)")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py membutuhkan os.fork (Linux/macOS). Di Windows jalankan: python main.py")
+
+    resource_plan = resources.plan(args.workers, args.threads)
+    workers = resource_plan.workers
+
+    from main import create_app
+    from src.ocr_processor import get_reader_pool
+
+    # Master tetap single-thread: thread pool OpenMP/OpenCV yang sudah jalan
+    # sebelum fork bisa membuat worker hang
+    resources.apply(1)
+    app = create_app(warmup=False)
+    if not SUPERVISOR_CONFIG['enabled']:
+        get_reader_pool().load()
+    server = make_server(args.host, args.port, app, threaded=True)
+
+    # Objek yang sudah ada dipindah ke generasi permanen supaya GC di worker
+    # tidak menulis header objek (memicu copy halaman memori bersama)
+    gc.freeze()
+
+    master_pid = os.getpid()
+    children = {}
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for index in range(workers):
+        children[_spawn(server, resource_plan, index)] = index
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    logger.info(f"Server berjalan di http://{args.host}:{args.port} ({workers} worker x "
+                f"{resource_plan.threads_per_worker} thread, {resource_plan.source}, master {master_pid})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if stopping or index is None:
+            continue
+        logger.warning(f"Worker {pid} berhenti (status {status}), dijalankan ulang")
+        time.sleep(SERVER_CONFIG['respawn_delay'])
+        children[_spawn(server, resource_plan, index)] = index
+
+    server.server_close()
+    logger.info("Server dihentikan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Batch Processor - OCR banyak gambar KTP sekaligus (multi-file, ZIP, TAR)
+
+Entri arsip dibaca satu per satu langsung dari stream upload (tidak
+diekstrak ke disk), lalu dibagi ke beberapa proses OCR agar semua core CPU
+terpakai. Setiap proses memuat reader EasyOCR sendiri satu kali saja. Di
+worker prefork (serve.py) entri diproses dengan OCR milik worker itu, tanpa
+process pool tambahan per worker. Arsip rusak / terpotong menjadi baris error.
+"""
+import atexit
+import logging
+import multiprocessing
+import tarfile
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path, PurePosixPath
+
+from config import ARCHIVE_EXTENSIONS, BATCH_CONFIG, SUPPORTED_FORMATS
+from utils import resources
+from utils.metrics import gauge
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_workers = 1
+_executor_lock = threading.Lock()
+
+# OCRProcessor milik proses worker (diisi oleh _init_worker)
+_worker_ocr = None
+
+# Error baca arsip rusak / terpotong (gzip.BadGzipFile turunan OSError)
+_ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error, OSError)
+
+BATCH_PENDING = gauge("ocr_batch_pending_entries", "Entri batch yang sedang menunggu/diproses di pool")
+
+
+class BatchEntryError(Exception):
+    """Entri batch tidak bisa diproses (format/ukuran tidak valid)"""
+
+
+def is_archive(filename):
+    """Cek apakah nama file adalah arsip yang didukung"""
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _is_supported_image(name):
+    return PurePosixPath(name).suffix.lower() in SUPPORTED_FORMATS
+
+
+def _read_limited(fileobj, name):
+    """Baca isi entri dengan batas ukuran BATCH_CONFIG['max_entry_mb']"""
+    limit = BATCH_CONFIG['max_entry_mb'] * 1024 * 1024
+    data = fileobj.read(limit + 1)
+    if len(data) > limit:
+        raise BatchEntryError(f"{name}: file terlalu besar (max {BATCH_CONFIG['max_entry_mb']}MB)")
+    return data
+
+
+def iter_upload_entries(files):
+    """
+    Urai upload menjadi entri gambar satu per satu
+
+    Args:
+        files (list): FileStorage dari request.files.getlist(...)
+
+    Yields:
+        tuple: (nama_sumber, bytes) atau (nama_sumber, BatchEntryError)
+    """
+    count = 0
+    for storage in files:
+        if not storage or not storage.filename:
+            continue
+        filename = storage.filename
+        if is_archive(filename):
+            entries = _iter_archive(storage.stream, filename)
+        elif _is_supported_image(filename):
+            entries = [(filename, storage.stream)]
+        else:
+            yield filename, BatchEntryError(f"{filename}: format tidak didukung")
+            continue
+
+        for name, fileobj in entries:
+            count += 1
+            if count > BATCH_CONFIG['max_entries']:
+                yield name, BatchEntryError(f"Batas {BATCH_CONFIG['max_entries']} gambar per batch terlampaui")
+                return
+            if isinstance(fileobj, BatchEntryError):
+                yield name, fileobj
+                continue
+            try:
+                data = _read_limited(fileobj, name)
+            except BatchEntryError as e:
+                data = e
+            except _ARCHIVE_ERRORS as e:
+                data = BatchEntryError(f"{name}: isi entri rusak / terpotong ({str(e)})")
+            yield name, data
+
+
+def _iter_archive(stream, archive_name):
+    """
+    Iterasi (nama, fileobj) gambar di dalam ZIP/TAR tanpa ekstrak ke disk
+
+    Arsip yang rusak / terpotong menghentikan iterasi dengan satu entri
+    (nama arsip, BatchEntryError); entri sebelumnya tetap diproses.
+    """
+    try:
+        if archive_name.lower().endswith('.zip'):
+            with zipfile.ZipFile(stream) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or not _is_supported_image(info.filename):
+                        continue
+                    with zf.open(info) as member:
+                        yield f"{archive_name}/{info.filename}", member
+        else:
+            # Mode "r|*" membaca TAR secara sekuensial (stream), termasuk .tar.gz
+            with tarfile.open(fileobj=stream, mode="r|*") as tf:
+                for member in tf:
+                    if not member.isfile() or not _is_supported_image(member.name):
+                        continue
+                    yield f"{archive_name}/{member.name}", tf.extractfile(member)
+    except _ARCHIVE_ERRORS as e:
+        logger.warning(f"Arsip {archive_name} rusak: {str(e)}")
+        yield archive_name, BatchEntryError(f"{archive_name}: arsip rusak / terpotong ({str(e)})")
+
+
+def _init_worker(resource_plan, counter):
+    """Initializer proses pool: batasi thread, lalu muat reader EasyOCR sekali per proses"""
+    global _worker_ocr
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    resources.apply_worker(resource_plan, index % resource_plan.workers)
+    from src.ocr_processor import OCRProcessor, warmup_readers
+    _worker_ocr = OCRProcessor(batching=False)
+    warmup_readers()
+
+
+def _process_entry(source_name, data, ocr=None):
+    """Jalankan OCR untuk satu entri (default OCR milik proses worker pool)"""
+    result = (ocr or _worker_ocr).process_bytes(data, Path(source_name).name)
+    if result is None:
+        return {'source_file': source_name, 'error': "Gambar tidak bisa dibaca / OCR gagal"}
+
+    return {
+        'source_file': source_name,
+        'fields': result.fields,
+        'text': result.text,
+    }
+
+
+def get_executor():
+    """Process pool bersama untuk batch (dibuat saat batch pertama)"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None:
+            # spawn: jangan fork proses web yang sudah memuat torch
+            context = multiprocessing.get_context("spawn")
+            resource_plan = resources.child_plan(BATCH_CONFIG['workers'])
+            _executor = ProcessPoolExecutor(
+                max_workers=resource_plan.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(resource_plan, context.Value('i', 0)),
+            )
+            _executor_workers = resource_plan.workers
+            atexit.register(shutdown_executor)
+        return _executor
+
+
+def shutdown_executor():
+    """Hentikan process pool batch"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _discard_executor(broken):
+    """Lepas pool yang rusak (worker mati) supaya get_executor membuat pool baru"""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def process_batch(entries, ocr=None):
+    """
+    Proses entri batch secara paralel
+
+    Jumlah entri yang sedang diproses dibatasi (2x jumlah worker) supaya
+    bytes gambar dari arsip besar tidak menumpuk di memori.
+
+    Args:
+        entries (iterable): Hasil iter_upload_entries
+        ocr (OCRProcessor, optional): Jika diisi, entri diproses berurutan di
+            proses ini dengan OCR tersebut (reader bersama) dan process pool
+            tidak dibuat; dipakai worker prefork supaya reader tidak berlipat
+
+    Returns:
+        list: dict per entri ('source_file' + 'fields'/'text' atau 'error'),
+              urut sesuai urutan di upload
+    """
+    if ocr is not None:
+        results = []
+        for source_name, payload in entries:
+            if isinstance(payload, Exception):
+                results.append({'source_file': source_name, 'error': str(payload)})
+                continue
+            try:
+                results.append(_process_entry(source_name, payload, ocr))
+            except Exception as e:
+                logger.error(f"Batch {source_name} gagal: {str(e)}")
+                results.append({'source_file': source_name, 'error': str(e)})
+        logger.info(f"Batch selesai: {len(results)} entri")
+        return results
+
+    executor = get_executor()
+    max_pending = _executor_workers * 2
+    restarts = 1  # Pool yang rusak di tengah batch dibuat ulang sekali
+    results = []
+    pending = {}
+
+    def _collect(done):
+        """Isi hasil future yang selesai; True jika pool rusak"""
+        broken = False
+        for future in done:
+            index, source_name = pending.pop(future)
+            BATCH_PENDING.dec()
+            try:
+                results[index] = future.result()
+            except BrokenProcessPool as e:
+                broken = True
+                logger.error(f"Worker batch mati saat memproses {source_name}: {str(e)}")
+                results[index] = {'source_file': source_name,
+                                  'error': "Worker batch mati saat memproses entri ini"}
+            except Exception as e:
+                logger.error(f"Batch {source_name} gagal: {str(e)}")
+                results[index] = {'source_file': source_name, 'error': str(e)}
+        return broken
+
+    def _recover():
+        """Pool rusak: entri yang sedang jalan dilaporkan gagal, pool diganti"""
+        nonlocal executor, restarts
+        if pending:
+            _collect(wait(pending)[0])
+        _discard_executor(executor)
+        executor = None
+        if restarts > 0:
+            restarts -= 1
+            executor = get_executor()
+
+    for source_name, payload in entries:
+        index = len(results)
+        if isinstance(payload, Exception):
+            results.append({'source_file': source_name, 'error': str(payload)})
+            continue
+        results.append({'source_file': source_name, 'error': "Worker batch mati, entri tidak diproses"})
+        while executor is not None:
+            try:
+                future = executor.submit(_process_entry, source_name, payload)
+            except BrokenProcessPool:
+                _recover()
+                continue
+            pending[future] = (index, source_name)
+            BATCH_PENDING.inc()
+            break
+        if len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            if _collect(done):
+                _recover()
+
+    if pending:
+        done, _ = wait(pending)
+        if _collect(done):
+            _discard_executor(executor)
+
+    logger.info(f"Batch selesai: {len(results)} entri")
+    return results
@@ -0,0 +1,260 @@
+"""
+Batching - Gabungkan request OCR yang datang bersamaan menjadi satu inferensi
+
+Request yang masuk dalam satu window (BATCHING_CONFIG['window_ms']) atau
+sampai max_batch dikumpulkan, lalu dijalankan bersama:
+- deteksi CRAFT: gambar dengan ukuran sama dijadikan satu batch tensor
+- rekognisi: crop text dari semua gambar diurutkan menurut lebar dan
+  dijalankan per batch (padding antar crop jadi kecil)
+Hasil dikembalikan ke masing-masing request dalam format reader.readtext.
+"""
+import importlib
+import logging
+import math
+import queue
+import threading
+import time
+
+from config import BATCHING_CONFIG, OCR_CONFIG, RESOLUTION_CONFIG
+from utils.metrics import histogram
+from . import resolution
+
+BATCH_SIZE = histogram(
+    "ocr_batch_size", "Jumlah gambar per batch inferensi",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32))
+BATCH_FILL = histogram(
+    "ocr_batch_fill_ratio", "Ukuran batch dibanding max_batch",
+    buckets=(0.125, 0.25, 0.375, 0.5, 0.625, 0.75, 0.875, 1.0))
+BATCH_WAIT = histogram(
+    "ocr_batch_wait_seconds", "Waktu request menunggu batch dimulai")
+
+
+class _Request:
+    __slots__ = ("image", "submitted", "done", "result", "error")
+
+    def __init__(self, image):
+        self.image = image
+        self.submitted = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def recognize_boxes(reader, greys, boxes, recognize_batch=None):
+    """
+    Rekognisi box yang sudah diketahui di beberapa gambar sekaligus
+
+    Crop dari semua gambar diurutkan menurut rasio lebar/tinggi lalu
+    dikenali per batch recognizer (bukan satu crop per forward pass seperti
+    reader.recognize di CPU).
+
+    Args:
+        reader (easyocr.Reader): Reader yang sedang dipinjam
+        greys (list): Gambar grayscale
+        boxes (list): Per gambar, list pasangan (horizontal_list, free_list)
+            berisi satu box (urutan hasil mengikuti urutan ini)
+        recognize_batch (int, optional): Jumlah crop per batch recognizer
+
+    Returns:
+        list: Per gambar, token (box, text, confidence)
+    """
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list
+
+    recognize_batch = recognize_batch or BATCHING_CONFIG['recognize_batch']
+    img_h = importlib.import_module("easyocr.easyocr").imgH
+
+    # Crop semua box (urutan per gambar sama dengan readtext)
+    crops = []
+    for index, grey in enumerate(greys):
+        for position, (h_list, f_list) in enumerate(boxes[index]):
+            image_list, _ = get_image_list(h_list, f_list, grey, model_height=img_h)
+            for item in image_list:
+                crops.append((index, position, item))
+
+    # Rekognisi: crop dengan lebar mirip dijadikan satu batch
+    ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+    crops.sort(key=lambda crop: crop[2][1].shape[1] / max(1, crop[2][1].shape[0]))
+    recognized = []
+    for start in range(0, len(crops), recognize_batch):
+        chunk = crops[start:start + recognize_batch]
+        max_ratio = max(item[1].shape[1] / max(1, item[1].shape[0]) for _, _, item in chunk)
+        texts = get_text(
+            reader.character, img_h, int(math.ceil(max_ratio) * img_h),
+            reader.recognizer, reader.converter, [item for _, _, item in chunk],
+            ignore_char, 'greedy', 5, len(chunk), 0.1, 0.5, 0.003, 0, reader.device
+        )
+        recognized += [(index, position, text) for (index, position, _), text in zip(chunk, texts)]
+
+    results = [[] for _ in greys]
+    for index, _, item in sorted(recognized, key=lambda r: (r[0], r[1])):
+        results[index].append(item)
+    return results
+
+
+def readtext_batch(reader, images, recognize_batch=None, detect_scale=None):
+    """
+    Jalankan deteksi + rekognisi untuk beberapa gambar sekaligus
+
+    Args:
+        reader (easyocr.Reader): Reader yang sedang dipinjam
+        images (list): Gambar (grayscale/RGB numpy array) hasil preprocessing
+        recognize_batch (int, optional): Jumlah crop per batch recognizer
+        detect_scale (float, optional): Skala deteksi yang sama untuk semua
+            gambar (default per gambar dari kebijakan resolusi jika aktif)
+
+    Returns:
+        list: Hasil per gambar, format sama dengan reader.readtext
+              (detail/paragraph sesuai OCR_CONFIG, paragraph tidak didukung)
+    """
+    import numpy as np
+    from easyocr.utils import reformat_input
+
+    formatted = [reformat_input(image) for image in images]
+
+    # Input deteksi per gambar: (gambar, parameter resize CRAFT, skala balik box)
+    detect_inputs = []
+    for color, grey in formatted:
+        if not RESOLUTION_CONFIG['enabled']:
+            detect_inputs.append((color, {}, 1.0))
+            continue
+        scale = detect_scale or resolution.detection_scale(grey)[0]
+        if scale < 1.0 and RESOLUTION_CONFIG['detect_on_downscaled']:
+            small = resolution.downscale(color, scale)
+            detect_inputs.append((small, {'canvas_size': max(small.shape[:2]) + 1, 'mag_ratio': 1.0,
+                                          'min_size': max(1, int(20 * scale))}, scale))
+        else:
+            detect_inputs.append((color, resolution.detect_kwargs(color.shape, scale), 1.0))
+
+    # Deteksi: gambar berukuran + berparameter sama dijalankan sebagai satu batch
+    boxes = [None] * len(images)
+    groups = {}
+    for index, (image, params, _) in enumerate(detect_inputs):
+        groups.setdefault((image.shape, tuple(sorted(params.items()))), []).append(index)
+    for indices in groups.values():
+        batch = detect_inputs[indices[0]][0] if len(indices) == 1 else np.stack(
+            [detect_inputs[i][0] for i in indices])
+        horizontal, free = reader.detect(
+            batch,
+            width_ths=OCR_CONFIG['width_ths'],
+            height_ths=OCR_CONFIG['height_ths'],
+            reformat=False,
+            **detect_inputs[indices[0]][1]
+        )
+        for index, h_list, f_list in zip(indices, horizontal, free):
+            h_list, f_list = resolution.scale_boxes(h_list, f_list, detect_inputs[index][2])
+            boxes[index] = [([box], []) for box in h_list] + [([], [box]) for box in f_list]
+
+    recognized = recognize_boxes(reader, [grey for _, grey in formatted], boxes, recognize_batch)
+    if OCR_CONFIG['detail'] == 1:
+        return recognized
+    return [[item[1] for item in items] for items in recognized]
+
+
+class BatchScheduler:
+    """
+    Antrian request readtext yang dilayani thread batch
+
+    Satu thread per reader di pool; setiap thread mengambil batch dari
+    antrian, meminjam reader, dan menjalankan readtext_batch.
+    """
+
+    def __init__(self, reader_pool, window_ms=None, max_batch=None):
+        self.logger = logging.getLogger(__name__)
+        self.reader_pool = reader_pool
+        self.window = (window_ms if window_ms is not None else BATCHING_CONFIG['window_ms']) / 1000
+        self.max_batch = max(1, max_batch or BATCHING_CONFIG['max_batch'])
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.reader_pool.size):
+                thread = threading.Thread(target=self._loop, name=f"ocr-batch-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def readtext(self, image):
+        """
+        OCR satu gambar lewat batch (blocking sampai batch selesai)
+
+        Returns:
+            list: Hasil format reader.readtext
+        """
+        self._start()
+        request = _Request(image)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self):
+        """Ambil satu batch: request pertama, lalu tunggu sampai window habis / batch penuh"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            BATCH_SIZE.observe(len(batch))
+            BATCH_FILL.observe(len(batch) / self.max_batch)
+            for request in batch:
+                BATCH_WAIT.observe(started - request.submitted)
+            try:
+                with self.reader_pool.acquire() as reader:
+                    results = readtext_batch(reader, [r.image for r in batch])
+                for request, result in zip(batch, results):
+                    request.result = result
+            except Exception as e:
+                self.logger.error(f"Batch OCR ({len(batch)} gambar) gagal: {str(e)}")
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.done.set()
+
+    def shutdown(self):
+        """Hentikan thread batch (request yang sudah di antrian tetap diproses)"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=5)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_batch_scheduler():
+    """BatchScheduler bersama untuk proses ini (di depan reader pool bersama)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from .ocr_processor import get_reader_pool
+            _scheduler = BatchScheduler(get_reader_pool())
+        return _scheduler
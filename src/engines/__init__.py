@@ -0,0 +1,6 @@
+"""
+Engines - Antarmuka OCR bersama (EasyOCR / Tesseract) dan router berbasis biaya
+"""
+from .base import EngineUnavailable, OCREngine, has_nik, quad_from_rect, tokens_to_lines
+from .router import EngineRouter, create_engine, engine_stats
+from .tesseract_engine import TesseractEngine
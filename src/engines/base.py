@@ -0,0 +1,101 @@
+"""
+Base - Antarmuka bersama engine OCR
+
+Setiap engine mengembalikan bentuk data yang sama dengan reader.readtext
+EasyOCR (detail=1): list token (box 4 titik, text, confidence 0..1), dan
+box deteksi selalu berupa 4 titik [[x, y], ...] (kiri-atas, kanan-atas,
+kanan-bawah, kiri-bawah). Dengan begitu front-end mana pun (web Flask,
+Streamlit, mode template) bisa memakai engine mana pun.
+"""
+import re
+
+
+class EngineUnavailable(Exception):
+    """Engine OCR tidak terpasang / tidak bisa dijalankan di mesin ini"""
+
+
+class OCREngine:
+    """
+    Engine OCR. Subclass minimal mengimplementasikan detect dan recognize;
+    readtext default = detect lalu recognize semua box.
+    """
+    name = "base"
+
+    def available(self):
+        """True jika engine bisa dipakai (library dan binary ada)"""
+        return True
+
+    def detect(self, image):
+        """
+        Cari box baris text
+
+        Args:
+            image (numpy.ndarray): Gambar RGB / grayscale
+
+        Returns:
+            list: Box 4 titik [[x, y], ...] dalam koordinat gambar
+        """
+        raise NotImplementedError
+
+    def recognize(self, image, boxes, allowlist=None, validate=None):
+        """
+        Baca text di box yang sudah diketahui
+
+        Args:
+            image (numpy.ndarray): Gambar RGB / grayscale
+            boxes (list): Box 4 titik (hasil detect atau posisi tetap template)
+            allowlist (str, optional): Karakter yang boleh muncul (mis. digit NIK)
+            validate (callable, optional): Hanya dipakai EngineRouter untuk
+                memutuskan eskalasi; engine tunggal mengabaikannya
+
+        Returns:
+            list: Token (box, text, confidence) urut sesuai boxes
+        """
+        raise NotImplementedError
+
+    def readtext(self, image, allowlist=None, validate=None):
+        """Deteksi + rekognisi seluruh gambar (lihat recognize untuk argumen)"""
+        return self.recognize(image, self.detect(image), allowlist=allowlist)
+
+
+def quad_from_rect(x0, y0, x1, y1):
+    """Box 4 titik dari persegi sejajar sumbu"""
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def box_bounds(box):
+    """(x0, y0, x1, y1) persegi yang melingkupi box 4 titik"""
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def tokens_to_lines(tokens):
+    """
+    Susun token menjadi text per baris (atas ke bawah, kiri ke kanan)
+
+    Token yang pusat vertikalnya berjarak kurang dari setengah tinggi token
+    dianggap satu baris. Dipakai front-end yang mem-parsing text per baris
+    (regex field KTP di Streamlit).
+
+    Returns:
+        str: Baris dipisah newline
+    """
+    items = []
+    for box, text, _ in tokens:
+        x0, y0, x1, y1 = box_bounds(box)
+        items.append(((y0 + y1) / 2, max(y1 - y0, 1), x0, text))
+
+    lines = []
+    for center, height, x0, text in sorted(items):
+        if lines and abs(center - lines[-1]['center']) < height / 2:
+            lines[-1]['words'].append((x0, text))
+        else:
+            lines.append({'center': center, 'words': [(x0, text)]})
+    return "\n".join(" ".join(text for _, text in sorted(line['words'])) for line in lines)
+
+
+def has_nik(tokens, min_digits=16):
+    """Validasi kartu penuh: ada token dengan NIK (min_digits digit berurutan)"""
+    pattern = re.compile(r"\d{%d,}" % min_digits)
+    return any(pattern.search(re.sub(r"\s", "", text)) for _, text, _ in tokens)
@@ -0,0 +1,59 @@
+"""
+EasyOCR engine - CRAFT + recognizer EasyOCR lewat ReaderPool bersama
+"""
+from config import OCR_CONFIG, RESOLUTION_CONFIG
+from .base import OCREngine, box_bounds, quad_from_rect
+
+
+class EasyOCREngine(OCREngine):
+    name = "easyocr"
+
+    def __init__(self, reader_pool=None):
+        """
+        Args:
+            reader_pool (ReaderPool, optional): Default pool bersama proses
+        """
+        if reader_pool is None:
+            from ..ocr_processor import get_reader_pool
+            reader_pool = get_reader_pool()
+        self.reader_pool = reader_pool
+
+    def detect(self, image):
+        from easyocr.utils import reformat_input
+        from .. import resolution
+
+        image, grey = reformat_input(image)
+        with self.reader_pool.acquire() as reader:
+            if RESOLUTION_CONFIG['enabled']:
+                horizontal_list, free_list = resolution.detect(reader, image, grey)
+            else:
+                horizontal_list, free_list = reader.detect(
+                    image,
+                    width_ths=OCR_CONFIG['width_ths'],
+                    height_ths=OCR_CONFIG['height_ths'],
+                    reformat=False
+                )
+                horizontal_list, free_list = horizontal_list[0], free_list[0]
+        boxes = [quad_from_rect(x0, y0, x1, y1) for x0, x1, y0, y1 in horizontal_list]
+        return boxes + [[[float(x), float(y)] for x, y in box] for box in free_list]
+
+    def recognize(self, image, boxes, allowlist=None, validate=None):
+        import cv2
+
+        grey = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        results = []
+        with self.reader_pool.acquire() as reader:
+            for box in boxes:
+                horizontal_list, free_list = self._split_box(box)
+                results += reader.recognize(grey, horizontal_list, free_list, allowlist=allowlist,
+                                            detail=1, paragraph=False, reformat=False)
+        return results
+
+    @staticmethod
+    def _split_box(box):
+        """Box sejajar sumbu -> horizontal_list EasyOCR, selain itu free_list"""
+        (ax, ay), (bx, by), (cx, cy), (dx, dy) = box
+        if ay == by and cy == dy and ax == dx and bx == cx:
+            x0, y0, x1, y1 = box_bounds(box)
+            return [[int(x0), int(x1), int(y0), int(y1)]], []
+        return [], [box]
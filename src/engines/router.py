@@ -0,0 +1,158 @@
+"""
+Router - Pilih engine OCR termurah dulu, eskalasi hanya jika validasi gagal
+
+Untuk setiap operasi (detect / recognize / readtext) engine diurutkan menurut
+perkiraan biaya per hasil valid: rata-rata detik per panggilan dibagi hit
+rate (porsi hasil yang lolos validasi). Sebelum ada ukuran dipakai
+ENGINE_CONFIG['prior_seconds']. Biaya dan hit rate dicatat per engine di
+/metrics dan lewat stats().
+"""
+import logging
+import threading
+import time
+
+from config import ENGINE_CONFIG
+from utils.metrics import counter, histogram
+from .base import EngineUnavailable, OCREngine
+
+ENGINE_SECONDS = histogram(
+    "ocr_engine_seconds", "Durasi satu panggilan engine OCR", ("engine", "op"))
+ENGINE_CALLS = counter(
+    "ocr_engine_calls_total", "Panggilan engine OCR per hasil validasi (hit/miss/error)",
+    ("engine", "op", "outcome"))
+ENGINE_ESCALATIONS = counter(
+    "ocr_engine_escalations_total", "Eskalasi ke engine berikutnya setelah engine ini gagal",
+    ("engine", "op"))
+
+# Statistik bersama semua router di proses ini: (engine, op) -> dict
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(engine, op, seconds, outcome):
+    ENGINE_SECONDS.observe(seconds, engine=engine, op=op)
+    ENGINE_CALLS.inc(engine=engine, op=op, outcome=outcome)
+    with _stats_lock:
+        entry = _stats.setdefault((engine, op), {'calls': 0, 'seconds': 0.0, 'hits': 0, 'errors': 0})
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        entry['hits'] += outcome == 'hit'
+        entry['errors'] += outcome == 'error'
+
+
+def engine_stats():
+    """
+    Biaya dan hit rate per engine dan operasi
+
+    Returns:
+        dict: {engine: {op: {'calls', 'seconds', 'hits', 'errors', 'mean_seconds', 'hit_rate'}}}
+    """
+    with _stats_lock:
+        items = [(key, dict(entry)) for key, entry in _stats.items()]
+    report = {}
+    for (engine, op), entry in items:
+        entry['mean_seconds'] = entry['seconds'] / entry['calls']
+        entry['hit_rate'] = entry['hits'] / entry['calls']
+        report.setdefault(engine, {})[op] = entry
+    return report
+
+
+class EngineRouter(OCREngine):
+    """
+    Engine gabungan: coba engine termurah, eskalasi ke berikutnya jika hasil
+    tidak lolos validate (atau kosong / error). Jika tidak ada yang lolos,
+    hasil terakhir yang tidak kosong dikembalikan.
+
+    Args:
+        engines (list, optional): Kandidat OCREngine (default ENGINE_CONFIG['engines'])
+    """
+    name = "auto"
+
+    def __init__(self, engines=None, reader_pool=None):
+        self.logger = logging.getLogger(__name__)
+        if engines is None:
+            engines = [create_engine(name, reader_pool=reader_pool) for name in ENGINE_CONFIG['engines']]
+        self.engines = [engine for engine in engines if engine.available()]
+        if not self.engines:
+            raise EngineUnavailable("Tidak ada engine OCR yang tersedia untuk router")
+
+    def expected_cost(self, engine, op):
+        """Perkiraan detik per hasil valid (rata-rata detik / hit rate, di-smoothing prior)"""
+        prior = ENGINE_CONFIG['prior_seconds'].get(engine.name, 1.0)
+        with _stats_lock:
+            entry = _stats.get((engine.name, op), {'calls': 0, 'seconds': 0.0, 'hits': 0})
+            mean_seconds = (entry['seconds'] + prior) / (entry['calls'] + 1)
+            hit_rate = (entry['hits'] + 1) / (entry['calls'] + 2)
+        return mean_seconds / hit_rate
+
+    def order(self, op):
+        """Engine urut dari perkiraan biaya terendah (urutan config jika sama)"""
+        return sorted(self.engines, key=lambda engine: self.expected_cost(engine, op))
+
+    def _route(self, op, call, validate):
+        fallback = []
+        ordered = self.order(op)
+        for i, engine in enumerate(ordered):
+            started = time.perf_counter()
+            try:
+                result = call(engine)
+            except Exception as e:
+                _record(engine.name, op, time.perf_counter() - started, 'error')
+                self.logger.warning(f"Engine {engine.name} gagal ({op}): {str(e)}")
+                continue
+            ok = bool(result) and (validate is None or validate(result))
+            _record(engine.name, op, time.perf_counter() - started, 'hit' if ok else 'miss')
+            if ok:
+                return result
+            if result:
+                fallback = result
+            if i + 1 < len(ordered):
+                ENGINE_ESCALATIONS.inc(engine=engine.name, op=op)
+                self.logger.debug(f"Hasil {engine.name} ({op}) tidak valid, eskalasi ke "
+                                  f"{ordered[i + 1].name}")
+        return fallback
+
+    def detect(self, image):
+        return self._route('detect', lambda engine: engine.detect(image), None)
+
+    def recognize(self, image, boxes, allowlist=None, validate=None):
+        return self._route('recognize',
+                           lambda engine: engine.recognize(image, boxes, allowlist=allowlist),
+                           validate)
+
+    def readtext(self, image, allowlist=None, validate=None):
+        return self._route('readtext',
+                           lambda engine: engine.readtext(image, allowlist=allowlist),
+                           validate)
+
+    @staticmethod
+    def stats():
+        """Lihat engine_stats"""
+        return engine_stats()
+
+
+def create_engine(name=None, reader_pool=None):
+    """
+    Buat engine menurut nama
+
+    Args:
+        name (str, optional): 'easyocr', 'tesseract' atau 'auto' (router);
+            default ENGINE_CONFIG['engine']
+        reader_pool (ReaderPool, optional): Pool untuk EasyOCR (default pool bersama)
+
+    Returns:
+        OCREngine: Engine siap pakai
+
+    Raises:
+        ValueError: Nama engine tidak dikenal
+    """
+    name = name or ENGINE_CONFIG['engine']
+    if name == 'easyocr':
+        from .easyocr_engine import EasyOCREngine
+        return EasyOCREngine(reader_pool)
+    if name == 'tesseract':
+        from .tesseract_engine import TesseractEngine
+        return TesseractEngine()
+    if name == 'auto':
+        return EngineRouter(reader_pool=reader_pool)
+    raise ValueError(f"Engine OCR tidak dikenal: {name}")
@@ -0,0 +1,221 @@
+"""
+Tesseract engine - pytesseract (LSTM, --oem 3)
+
+Jauh lebih murah dari EasyOCR di CPU untuk text cetak yang bersih (mis.
+baris NIK dengan whitelist digit), tapi lebih rapuh untuk foto miring /
+background bermotif. Kata digabung menjadi segmen seperti EasyOCR (jarak
+antar kata <= OCR_CONFIG['width_ths'] x tinggi huruf), sehingga label dan
+nilai field KTP tetap jadi token terpisah. Confidence Tesseract (0..100 per
+kata) dirata-rata per segmen lalu dibagi 100 supaya setara dengan EasyOCR.
+
+image_to_string_batch untuk grid varian x config: setiap gambar ditulis
+sekali (PGM/PPM tanpa kompresi di tmpfs) dan satu proses Tesseract per config
+membaca semua gambar lewat list-file, sehingga traineddata dimuat sekali per
+config, bukan sekali per pasangan.
+"""
+import logging
+import os
+import shlex
+import tempfile
+
+from config import ENGINE_CONFIG, OCR_CONFIG
+from .base import EngineUnavailable, OCREngine, box_bounds, quad_from_rect
+
+# Layout KTP: satu blok text seragam untuk seluruh kartu, satu baris per box field
+_PAGE_PSM = 6
+_LINE_PSM = 7
+_CROP_PADDING = 4
+
+
+def _to_pnm_array(image):
+    """
+    Array uint8 L / RGB untuk ditulis sebagai PGM / PPM: float 0..1 diskalakan
+    ke 0..255, nilai di luar rentang dipotong, alpha dibuang
+
+    Raises:
+        ValueError: Bentuk array bukan gambar
+    """
+    import numpy as np
+
+    array = np.asarray(image)
+    if array.ndim == 3 and array.shape[2] in (1, 2):
+        array = array[:, :, 0]
+    elif array.ndim == 3 and array.shape[2] == 4:
+        array = array[:, :, :3]
+    if array.ndim not in (2, 3) or (array.ndim == 3 and array.shape[2] != 3):
+        raise ValueError(f"Bentuk gambar tidak didukung: {array.shape}")
+    if array.dtype == np.uint8:
+        return np.ascontiguousarray(array)
+    if array.dtype == bool:
+        return array.astype(np.uint8) * 255
+    if np.issubdtype(array.dtype, np.floating) and array.size and np.nanmax(array) <= 1.0:
+        array = array * 255.0
+    return np.clip(np.nan_to_num(array), 0, 255).astype(np.uint8)
+
+
+class TesseractEngine(OCREngine):
+    name = "tesseract"
+
+    def __init__(self, lang=None):
+        """
+        Args:
+            lang (str, optional): Bahasa Tesseract (default ENGINE_CONFIG['tesseract_lang'])
+        """
+        self.logger = logging.getLogger(__name__)
+        self.lang = lang or ENGINE_CONFIG['tesseract_lang']
+        self._available = None
+
+    def _pytesseract(self):
+        try:
+            import pytesseract
+        except ImportError:
+            raise EngineUnavailable("pytesseract belum terpasang (pip install pytesseract)")
+        if ENGINE_CONFIG['tesseract_cmd']:
+            pytesseract.pytesseract.tesseract_cmd = str(ENGINE_CONFIG['tesseract_cmd'])
+        return pytesseract
+
+    def available(self):
+        if self._available is None:
+            try:
+                self._pytesseract().get_tesseract_version()
+                self._available = True
+            except Exception as e:
+                self.logger.warning(f"Tesseract tidak tersedia: {str(e)}")
+                self._available = False
+        return self._available
+
+    def _config(self, psm, allowlist=None):
+        config = f"--oem 3 --psm {psm} -l {self.lang}"
+        if allowlist:
+            # Spasi antar kata tetap dikeluarkan Tesseract, tidak perlu di whitelist
+            chars = "".join(sorted(set(allowlist) - {" "}))
+            config += " -c " + shlex.quote(f"tessedit_char_whitelist={chars}")
+        return config
+
+    def _lines(self, image, psm, allowlist=None):
+        """Kata image_to_data digabung per segmen baris -> token (box, text, confidence)"""
+        pytesseract = self._pytesseract()
+        data = pytesseract.image_to_data(image, config=self._config(psm, allowlist),
+                                         output_type=pytesseract.Output.DICT)
+        lines = {}
+        for i, text in enumerate(data['text']):
+            confidence = float(data['conf'][i])
+            if not text.strip() or confidence < 0:
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            x0, y0 = data['left'][i], data['top'][i]
+            lines.setdefault(key, []).append(
+                (x0, y0, x0 + data['width'][i], y0 + data['height'][i], text.strip(), confidence))
+
+        segments = []
+        for words in lines.values():
+            words.sort()
+            current = [words[0]]
+            for word in words[1:]:
+                previous = current[-1]
+                if word[0] - previous[2] > OCR_CONFIG['width_ths'] * max(previous[3] - previous[1], 1):
+                    segments.append(current)
+                    current = []
+                current.append(word)
+            segments.append(current)
+
+        return [
+            (quad_from_rect(min(w[0] for w in words), min(w[1] for w in words),
+                            max(w[2] for w in words), max(w[3] for w in words)),
+             " ".join(w[4] for w in words),
+             sum(w[5] for w in words) / len(words) / 100)
+            for words in segments
+        ]
+
+    def image_to_string_batch(self, images, configs):
+        """
+        pytesseract.image_to_string untuk setiap pasangan (gambar, config)
+
+        Output list-file dipisah per halaman dengan page separator Tesseract
+        (\\f). Jika jumlah halaman tidak cocok atau proses gagal, config itu
+        diulang per gambar dari file yang sama (tanpa encode ulang).
+
+        Args:
+            images (list): numpy.ndarray grayscale / RGB / RGBA (uint8, float
+                0..1 atau tipe lain dikonversi ke uint8 sebelum ditulis)
+            configs (list): String config Tesseract (dipakai apa adanya)
+
+        Returns:
+            dict: {(index gambar, config): text}; pasangan yang gagal tidak ada
+        """
+        from PIL import Image
+
+        pytesseract = self._pytesseract()
+        tmp_dir = ENGINE_CONFIG['tesseract_tmp_dir']
+        if tmp_dir and not os.path.isdir(tmp_dir):
+            tmp_dir = None
+        texts = {}
+        with tempfile.TemporaryDirectory(prefix="tess_batch_", dir=tmp_dir) as workdir:
+            # Gambar yang tidak bisa ditulis sebagai PGM/PPM dikenali sendiri-sendiri
+            # (pytesseract menerima array apa pun yang bisa dibuka PIL)
+            written, single = [], []
+            for i, image in enumerate(images):
+                try:
+                    array = _to_pnm_array(image)
+                    path = os.path.join(workdir, f"{i}.{'pgm' if array.ndim == 2 else 'ppm'}")
+                    Image.fromarray(array).save(path)
+                    written.append((i, path))
+                except Exception as e:
+                    self.logger.warning(f"Gambar {i} tidak bisa ditulis untuk list-file: {str(e)}")
+                    single.append(i)
+            list_path = os.path.join(workdir, "images.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(path for _, path in written) + "\n")
+
+            for config in configs:
+                pages = []
+                if written:
+                    try:
+                        pages = pytesseract.image_to_string(list_path, config=config).split("\f")
+                        if len(pages) == len(written) + 1 and not pages[-1].strip():
+                            pages.pop()
+                        if len(pages) != len(written):
+                            raise ValueError(f"{len(pages)} halaman untuk {len(written)} gambar")
+                    except Exception as e:
+                        self.logger.warning(f"List-file Tesseract gagal ({config}): {str(e)}, "
+                                            f"fallback per gambar")
+                        pages = [self._image_to_string(pytesseract, path, config) for _, path in written]
+                for (i, _), text in zip(written, pages):
+                    if text is not None:
+                        texts[(i, config)] = text
+                for i in single:
+                    text = self._image_to_string(pytesseract, images[i], config)
+                    if text is not None:
+                        texts[(i, config)] = text
+        return texts
+
+    @staticmethod
+    def _image_to_string(pytesseract, path, config):
+        try:
+            return pytesseract.image_to_string(path, config=config)
+        except Exception:
+            return None
+
+    def detect(self, image):
+        return [box for box, _, _ in self._lines(image, _PAGE_PSM)]
+
+    def recognize(self, image, boxes, allowlist=None, validate=None):
+        height, width = image.shape[:2]
+        results = []
+        for box in boxes:
+            x0, y0, x1, y1 = box_bounds(box)
+            x0, y0 = max(0, int(x0) - _CROP_PADDING), max(0, int(y0) - _CROP_PADDING)
+            x1, y1 = min(width, int(x1) + _CROP_PADDING), min(height, int(y1) + _CROP_PADDING)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            lines = self._lines(image[y0:y1, x0:x1], _LINE_PSM, allowlist)
+            if not lines:
+                continue
+            text = " ".join(text for _, text, _ in lines)
+            confidence = min(confidence for _, _, confidence in lines)
+            results.append((box, text, confidence))
+        return results
+
+    def readtext(self, image, allowlist=None, validate=None):
+        # Satu panggilan image_to_data sudah memberi box + text per baris
+        return self._lines(image, _PAGE_PSM, allowlist)
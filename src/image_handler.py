@@ -2,13 +2,14 @@
 Enhanced Image Handler - Menangani loading dan preprocessing gambar untuk OCR yang lebih akurat
 Versi sederhana yang fokus pada perbaikan masalah OCR dengan penyempurnaan kecil
 """
+import io
 import logging
 import cv2
 import numpy as np
 from PIL import Image
 from pathlib import Path
 
-from config import SUPPORTED_FORMATS
+from config import OCR_CONFIG, RESOLUTION_CONFIG, SUPPORTED_FORMATS
 
 class ImageHandler:
     def __init__(self):
@@ -92,51 +93,182 @@ class ImageHandler:
             self.logger.error(f"Error loading gambar: {str(e)}")
             return None
 
-    def detect_orientation(self, image):
+    def decode_image(self, data, source_name=""):
         """
-        Deteksi orientasi gambar dengan pendekatan yang lebih reliabel
+        Decode gambar langsung dari bytes (tanpa menulis ke disk)
         
         Args:
-            image (numpy.ndarray): Image array
+            data (bytes): Isi file gambar
+            source_name (str): Nama file untuk logging
             
         Returns:
-            numpy.ndarray: Gambar yang sudah di-rotate
+            numpy.ndarray: Image array RGB atau None jika gagal
         """
         try:
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            if image is None:
+                self.logger.warning(f"OpenCV gagal decode, mencoba PIL: {source_name}")
+                try:
+                    with Image.open(io.BytesIO(data)) as pil_image:
+                        image = np.array(pil_image.convert("RGB"))
+                except Exception as pil_error:
+                    self.logger.error(f"PIL juga gagal: {str(pil_error)}")
+                    return None
             else:
-                gray = image
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            
+            self.logger.info(f"Gambar dimuat: {image.shape[1]}x{image.shape[0]} pixels")
+            return image
+        except Exception as e:
+            self.logger.error(f"Error decode gambar {source_name}: {str(e)}")
+            return None
 
-            # Deteksi tepi dengan Canny untuk orientasi yang lebih presisi
-            edges = cv2.Canny(gray, 50, 150)
-            lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=100)
-            
-            if lines is not None:
-                angles = [np.degrees(theta) for rho, theta in lines[:, 0]]
-                median_angle = np.median(angles)
-                
-                if abs(median_angle) > 5:
-                    self.logger.info(f"Rotasi gambar sebesar {median_angle:.1f} derajat")
-                    return self.rotate_image(image, -median_angle)
+    def estimate_skew(self, image, max_angle=15.0, step=0.5):
+        """
+        Perkirakan kemiringan baris teks dengan projection profile
+        
+        Gambar (diperkecil, dibinarisasi) diputar di rentang -max_angle..max_angle;
+        sudut yang membuat profil proyeksi horizontal paling tajam (baris teks
+        sejajar sumbu) dianggap koreksinya. Garis pola pengaman KTP tidak
+        mendominasi seperti pada median Hough.
+        
+        Args:
+            image (numpy.ndarray): Image array
+            max_angle (float): Batas pencarian (derajat)
+            step (float): Resolusi pencarian (derajat)
+            
+        Returns:
+            float: Kemiringan (derajat, berlawanan arah jarum jam); rotate_image
+                dengan nilai negatifnya meluruskan gambar
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
+        scale = 600 / max(gray.shape)
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY_INV, 31, 15)
+        height, width = binary.shape
+        best_angle, best_score = 0.0, -1.0
+        for angle in np.arange(-max_angle, max_angle + step / 2, step):
+            matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+            rotated = cv2.warpAffine(binary, matrix, (width, height), flags=cv2.INTER_NEAREST)
+            profile = rotated.sum(axis=1, dtype=np.float64)
+            score = np.sum(np.diff(profile) ** 2)
+            if score > best_score:
+                best_angle, best_score = angle, score
+        return -float(best_angle)
+    
+    def detect_orientation(self, image):
+        """
+        Deteksi kemiringan gambar dan luruskan jika lebih dari 5 derajat
+        
+        Args:
+            image (numpy.ndarray): Image array
             
+        Returns:
+            numpy.ndarray: Gambar yang sudah di-rotate
+        """
+        try:
+            skew = self.estimate_skew(image)
+            if abs(skew) > 5:
+                self.logger.info(f"Rotasi gambar sebesar {-skew:.1f} derajat")
+                return self.rotate_image(image, -skew)
             return image
         except Exception as e:
             self.logger.error(f"Error deteksi orientasi: {str(e)}")
             return image
     
-    def preprocess_image(self, image, enhance_text=True, auto_rotate=True):
+    def rotate_image(self, image, angle):
         """
-        Preprocessing untuk OCR yang lebih akurat dengan peningkatan kontras dan rotasi otomatis
+        Rotasi gambar (derajat, berlawanan arah jarum jam) tanpa memotong sudut
         
         Args:
             image (numpy.ndarray): Image array
-            enhance_text (bool): Apakah menggunakan enhancement teks
-            auto_rotate (bool): Apakah menggunakan rotasi otomatis
+            angle (float): Sudut rotasi
+            
+        Returns:
+            numpy.ndarray: Gambar hasil rotasi
+        """
+        height, width = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+        new_width = int(height * sin + width * cos)
+        new_height = int(height * cos + width * sin)
+        matrix[0, 2] += new_width / 2 - width / 2
+        matrix[1, 2] += new_height / 2 - height / 2
+        return cv2.warpAffine(image, matrix, (new_width, new_height), flags=cv2.INTER_CUBIC,
+                              borderMode=cv2.BORDER_REPLICATE)
+    
+    def reduce_noise_advanced(self, gray):
+        """Kurangi noise (pola pengaman KTP, grain kamera) dengan tetap menjaga tepi huruf"""
+        return cv2.bilateralFilter(gray, 7, 50, 50)
+    
+    def enhance_contrast_adaptive(self, gray):
+        """Kontras lokal dengan CLAHE"""
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        return clahe.apply(gray)
+    
+    def sharpen_text(self, gray):
+        """Unsharp mask ringan untuk mempertegas tepi huruf"""
+        blurred = cv2.GaussianBlur(gray, (0, 0), 1.0)
+        return cv2.addWeighted(gray, 1.5, blurred, -0.5, 0)
+    
+    def recognition_variants(self, gray, names):
+        """
+        Varian enhancement untuk rekognisi ulang box yang sama
+        
+        Semua varian berukuran sama dengan gray, jadi box hasil deteksi pada
+        gambar dasar bisa langsung dipakai.
+        
+        Args:
+            gray (numpy.ndarray): Gambar grayscale dasar
+            names (iterable): Nama varian: 'clahe', 'otsu', 'adaptive', 'sharpen', 'equalize'
+            
+        Returns:
+            list: (nama, gambar grayscale) untuk varian yang dikenal
+        """
+        builders = {
+            'clahe': self.enhance_contrast_adaptive,
+            'otsu': lambda g: cv2.threshold(g, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
+            'adaptive': lambda g: cv2.adaptiveThreshold(
+                g, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10),
+            'sharpen': self.sharpen_text,
+            'equalize': cv2.equalizeHist,
+        }
+        variants = []
+        for name in names:
+            if name not in builders:
+                self.logger.warning(f"Varian rekognisi tidak dikenal: {name}")
+                continue
+            variants.append((name, builders[name](gray)))
+        return variants
+    
+    def preprocess_image(self, image, enhance_text=None, auto_rotate=None, measurements=None):
+        """
+        Preprocessing untuk OCR: rotasi otomatis, upscale huruf kecil dan enhancement teks
+        
+        Tanpa rotasi dan enhancement (default, lihat OCR_CONFIG) gambar hanya
+        di-upscale: jika huruf terlalu kecil (RESOLUTION_CONFIG aktif) atau,
+        dengan kebijakan resolusi mati, jika sisinya di bawah 900 px.
+        
+        Args:
+            image (numpy.ndarray): Image array
+            enhance_text (bool, optional): Bilateral + CLAHE + sharpen
+                (default OCR_CONFIG['enhance_text'])
+            auto_rotate (bool, optional): Luruskan kemiringan
+                (default OCR_CONFIG['auto_rotate'])
+            measurements (dict, optional): Diisi 'text_height' (tinggi huruf
+                di gambar hasil) jika RESOLUTION_CONFIG aktif, supaya skala
+                deteksi tidak mengukur ulang
             
         Returns:
             numpy.ndarray: Gambar yang telah diproses
         """
+        if enhance_text is None:
+            enhance_text = OCR_CONFIG.get('enhance_text', False)
+        if auto_rotate is None:
+            auto_rotate = OCR_CONFIG.get('auto_rotate', False)
         try:
             original_image = image.copy()
             
@@ -144,28 +276,41 @@ class ImageHandler:
             if auto_rotate:
                 image = self.detect_orientation(image)
             
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
+            if enhance_text:
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
             
             # Ukuran gambar untuk OCR optimal
-            height, width = gray.shape
-            if height < 900 or width < 900:
+            height, width = image.shape[:2]
+            if RESOLUTION_CONFIG['enabled']:
+                # Hanya perbesar jika huruf memang terlalu kecil untuk recognizer;
+                # skala deteksi diatur terpisah (src/resolution.py)
+                from .resolution import estimate_text_height, upscale_factor
+                gray = image if len(image.shape) == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+                text_height = estimate_text_height(gray)
+                scale = upscale_factor(gray, text_height)
+                if measurements is not None:
+                    measurements['text_height'] = text_height * scale
+                if scale > 1.0:
+                    new_width = int(width * scale)
+                    new_height = int(height * scale)
+                    image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+                    self.logger.info(f"Huruf kecil, gambar di-resize ke: {new_width}x{new_height}")
+            elif height < 900 or width < 900:
+                # Aturan lama jika kebijakan resolusi dimatikan
                 scale = max(900 / height, 900 / width)
                 scale = min(scale, 1.8)  # Sesuaikan scale agar hasil optimal
                 new_width = int(width * scale)
                 new_height = int(height * scale)
-                gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+                image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
                 self.logger.info(f"Gambar di-resize ke: {new_width}x{new_height}")
             
             if enhance_text:
-                gray = self.reduce_noise_advanced(gray)
-                gray = self.enhance_contrast_adaptive(gray)
-                gray = self.sharpen_text(gray)
-            else:
-                gray = cv2.medianBlur(gray, 3)
-            
-            gray = np.clip(gray, 0, 255).astype(np.uint8)
-            self.logger.info("Preprocessing selesai dengan enhancement")
-            return gray
+                image = self.reduce_noise_advanced(image)
+                image = self.enhance_contrast_adaptive(image)
+                image = self.sharpen_text(image)
+                image = np.clip(image, 0, 255).astype(np.uint8)
+                self.logger.info("Preprocessing selesai dengan enhancement")
+            return image
         except Exception as e:
             self.logger.error(f"Error preprocessing gambar: {str(e)}")
-            return original_image if 'original_image' in locals() else image
\ No newline at end of file
+            return original_image if 'original_image' in locals() else image
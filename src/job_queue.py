@@ -0,0 +1,287 @@
+"""
+Job Queue - Antrian job OCR yang tahan restart berbasis SQLite
+
+Web hanya menyimpan upload dan memasukkan job ke antrian; proses worker
+(lihat worker.py) mengambil job, menjalankan OCRProcessor, lalu menyimpan
+hasil terstruktur kembali ke database. Karena antrian berupa file SQLite,
+beberapa proses worker (atau beberapa host di filesystem yang sama) bisa
+menguras antrian yang sama.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import JOB_CONFIG
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    image_path  TEXT NOT NULL,
+    source_name TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobQueue:
+    def __init__(self, db_path=None):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = str(db_path or JOB_CONFIG['db_path'])
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Journal mode default (rollback) dipakai supaya tetap aman di
+        # filesystem bersama; WAL butuh shared memory di host yang sama.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, image_path, source_name):
+        """
+        Masukkan job baru ke antrian
+
+        Args:
+            image_path (Path): Lokasi upload yang sudah disimpan
+            source_name (str): Nama file asli dari user
+
+        Returns:
+            str: ID job
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, image_path, source_name, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, str(image_path), source_name, time.time()),
+            )
+        self.logger.info(f"Job {job_id} masuk antrian: {source_name}")
+        return job_id
+
+    def claim(self, worker_id):
+        """
+        Ambil satu job tertua secara atomik (BEGIN IMMEDIATE mengunci
+        database untuk penulis lain selama klaim berlangsung).
+
+        Returns:
+            dict: Data job, atau None jika antrian kosong
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_expired(conn)
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (STATUS_QUEUED,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, started_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (STATUS_RUNNING, worker_id, time.time(), row['id']),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def _requeue_expired(self, conn):
+        """Kembalikan job yang worker-nya mati (lease habis) ke antrian"""
+        cutoff = time.time() - JOB_CONFIG['lease_timeout']
+        conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = 'Lease worker habis' WHERE status = ? AND started_at < ?",
+            (JOB_CONFIG['max_attempts'], STATUS_FAILED, STATUS_QUEUED,
+             STATUS_RUNNING, cutoff),
+        )
+
+    def complete(self, job_id, result, worker_id):
+        """
+        Tandai job selesai dan simpan hasil terstruktur (dict JSON-able)
+
+        Hanya berlaku jika job masih dipegang worker_id: setelah lease habis
+        job bisa sudah diklaim worker lain, dan hasilnya tidak boleh ditimpa.
+
+        Returns:
+            bool: True jika job diperbarui
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND status = ? AND worker = ?",
+                (STATUS_DONE, json.dumps(result, ensure_ascii=False), time.time(), job_id,
+                 STATUS_RUNNING, worker_id),
+            )
+        return self._owned(cursor, job_id, worker_id, "hasil")
+
+    def fail(self, job_id, error, worker_id, retry=True):
+        """
+        Catat kegagalan; job diulang sampai max_attempts lalu ditandai gagal
+
+        Args:
+            worker_id (str): Worker yang mengklaim job (lihat complete)
+            retry (bool): False untuk langsung gagal (mis. deadline terlewati,
+                gambar yang sama kemungkinan besar macet lagi)
+
+        Returns:
+            bool: True jika job diperbarui
+        """
+        max_attempts = JOB_CONFIG['max_attempts'] if retry else 0
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, finished_at = ? WHERE id = ? AND status = ? AND worker = ?",
+                (max_attempts, STATUS_FAILED, STATUS_QUEUED,
+                 str(error), time.time(), job_id, STATUS_RUNNING, worker_id),
+            )
+        return self._owned(cursor, job_id, worker_id, "kegagalan")
+
+    def _owned(self, cursor, job_id, worker_id, what):
+        if cursor.rowcount > 0:
+            return True
+        self.logger.warning(f"Job {job_id} tidak lagi dipegang {worker_id} (lease habis / "
+                            f"dibatalkan), {what} dibuang")
+        return False
+
+    def cancel(self, job_id):
+        """
+        Batalkan job yang belum selesai. Job yang sedang berjalan berhenti
+        di checkpoint tahap berikutnya (lihat run_worker).
+
+        Returns:
+            bool: True jika job dibatalkan
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (STATUS_CANCELLED, time.time(), job_id, STATUS_QUEUED, STATUS_RUNNING),
+            )
+        return cursor.rowcount > 0
+
+    def is_cancelled(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row is not None and row['status'] == STATUS_CANCELLED
+
+    def cancel_checker(self, job_id, interval=None):
+        """
+        is_cancelled untuk checkpoint OCR yang paling sering membuka koneksi
+        ke database sekali per interval detik (checkpoint token bisa ratusan
+        per gambar)
+
+        Args:
+            job_id (str): Job yang dicek
+            interval (float, optional): Default JOB_CONFIG['cancel_check_interval']
+
+        Returns:
+            callable: Tanpa argumen, True jika job sudah dibatalkan
+        """
+        interval = JOB_CONFIG['cancel_check_interval'] if interval is None else interval
+        state = {'checked_at': None, 'cancelled': False}
+
+        def check():
+            now = time.monotonic()
+            if not state['cancelled'] and (state['checked_at'] is None
+                                           or now - state['checked_at'] >= interval):
+                state['checked_at'] = now
+                state['cancelled'] = self.is_cancelled(job_id)
+            return state['cancelled']
+
+        return check
+
+    def get(self, job_id):
+        """
+        Ambil status job
+
+        Returns:
+            dict: Data job (result sudah di-decode), atau None jika tidak ada
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        for key in ('created_at', 'started_at', 'finished_at'):
+            if job[key]:
+                job[key] = datetime.fromtimestamp(job[key]).strftime('%Y-%m-%d %H:%M:%S')
+        return job
+
+    def counts(self):
+        """Jumlah job per status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+
+def run_worker(worker_id=None, stop_event=None):
+    """
+    Loop worker: ambil job dari antrian dan jalankan OCR sampai dihentikan
+
+    Args:
+        worker_id (str, optional): Nama worker (default host:pid)
+        stop_event (multiprocessing.Event, optional): Sinyal berhenti
+    """
+    # Import di sini supaya proses web yang hanya submit job tidak ikut memuat model
+    from src.ocr_processor import OCRCancelled, OCRTimeout, deadline_checkpoint
+    from src.supervisor import create_ocr_processor
+    from utils.excel_utils import save_result_to_excel
+
+    logger = logging.getLogger(__name__)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    job_queue = JobQueue()
+    ocr = create_ocr_processor(batching=False)
+    ocr.warmup()
+    logger.info(f"Worker {worker_id} siap")
+
+    while stop_event is None or not stop_event.is_set():
+        job = job_queue.claim(worker_id)
+        if job is None:
+            time.sleep(JOB_CONFIG['poll_interval'])
+            continue
+
+        logger.info(f"Worker {worker_id} memproses job {job['id']}")
+        checkpoint = deadline_checkpoint(
+            JOB_CONFIG['deadline'], is_cancelled=job_queue.cancel_checker(job['id']))
+        try:
+            result = ocr.process_image(job['image_path'], source_name=job['source_name'],
+                                       progress=checkpoint)
+            if result is None:
+                job_queue.fail(job['id'], "OCR gagal memproses gambar", worker_id)
+                continue
+
+            save_result_to_excel(result, job['source_name'])
+            job_queue.complete(job['id'], result.to_dict(), worker_id)
+        except OCRTimeout as e:
+            logger.warning(f"Job {job['id']} melewati deadline: {str(e)}")
+            job_queue.fail(job['id'], str(e), worker_id, retry=False)
+        except OCRCancelled:
+            logger.info(f"Job {job['id']} dibatalkan")
+        except Exception as e:
+            logger.error(f"Job {job['id']} gagal: {str(e)}")
+            job_queue.fail(job['id'], str(e), worker_id)
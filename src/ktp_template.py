@@ -0,0 +1,155 @@
+"""
+KTP Template - Rekognisi per field tanpa deteksi CRAFT
+
+Layout e-KTP tetap, jadi posisi setiap field relatif terhadap kartu sudah
+diketahui. Kartu diluruskan ke kanvas referensi (kontur 4 titik terbesar,
+atau seluruh gambar jika rasionya sudah sama dengan kartu), lalu box nilai
+setiap field langsung diberikan ke recognizer dengan allowlist masing-masing
+(mis. hanya digit untuk NIK). Rekognisi lewat engine OCR (src/engines); dengan
+router, setiap field punya validasi sendiri sehingga engine murah dipakai
+dulu dan eskalasi hanya untuk field yang gagal. Jika kartu tidak ditemukan
+atau NIK tidak terbaca utuh, pemanggil kembali ke readtext biasa.
+"""
+import logging
+
+from config import ENGINE_CONFIG, KTP_TEMPLATE_CONFIG, OCR_CONFIG
+from .engines import quad_from_rect
+from .ocr_result import OCRToken
+
+
+class KTPTemplate:
+    def __init__(self, config=None):
+        self.logger = logging.getLogger(__name__)
+        self.config = config or KTP_TEMPLATE_CONFIG
+        self.width = int(self.config['canvas_width'])
+        self.height = int(round(self.width / self.config['card_aspect']))
+
+    def register(self, image):
+        """
+        Cari kartu di gambar dan luruskan ke kanvas referensi
+
+        Args:
+            image (numpy.ndarray): Gambar RGB / grayscale
+
+        Returns:
+            tuple: (kartu grayscale lurus, matriks balik ke koordinat gambar),
+                   atau None jika kartu tidak ditemukan
+        """
+        import cv2
+        import numpy as np
+
+        grey = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        quad = self._find_card(grey)
+        if quad is None:
+            return None
+
+        target = np.float32([[0, 0], [self.width - 1, 0],
+                             [self.width - 1, self.height - 1], [0, self.height - 1]])
+        matrix = cv2.getPerspectiveTransform(quad, target)
+        card = cv2.warpPerspective(grey, matrix, (self.width, self.height), flags=cv2.INTER_CUBIC,
+                                   borderMode=cv2.BORDER_REPLICATE)
+        return card, np.linalg.inv(matrix)
+
+    def _find_card(self, grey):
+        """Sudut kartu (tl, tr, br, bl) float32, atau None"""
+        import cv2
+        import numpy as np
+
+        h, w = grey.shape[:2]
+        aspect = self.config['card_aspect']
+        tolerance = self.config['aspect_tolerance']
+
+        edges = cv2.Canny(cv2.GaussianBlur(grey, (5, 5), 0), 50, 150)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            if cv2.contourArea(contour) < self.config['min_card_area'] * h * w:
+                break
+            approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(approx) != 4:
+                continue
+            quad = self._order_corners(approx.reshape(4, 2).astype(np.float32))
+            top = np.linalg.norm(quad[1] - quad[0])
+            left = np.linalg.norm(quad[3] - quad[0])
+            if left > 0 and abs(top / left - aspect) / aspect <= tolerance:
+                return quad
+
+        # Gambar yang sudah dicrop rapi ke kartu: pakai seluruh gambar
+        if abs(w / h - aspect) / aspect <= tolerance:
+            return np.float32([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]])
+        return None
+
+    @staticmethod
+    def _order_corners(points):
+        import numpy as np
+
+        total = points.sum(axis=1)
+        diff = np.diff(points, axis=1).ravel()
+        return np.float32([points[np.argmin(total)], points[np.argmin(diff)],
+                           points[np.argmax(total)], points[np.argmax(diff)]])
+
+    def validator(self, label):
+        """Validasi hasil satu field untuk router: NIK harus lengkap, field lain cukup yakin"""
+        min_digits = self.config['min_nik_digits']
+        min_confidence = ENGINE_CONFIG['min_confidence']
+        if label == "NIK":
+            return lambda part: sum(c.isdigit() for _, text, _ in part for c in text) >= min_digits
+        return lambda part: min(float(confidence) for _, _, confidence in part) >= min_confidence
+
+    def recognize(self, engine, image, progress=None):
+        """
+        OCR kartu lewat box field tetap (tanpa deteksi)
+
+        Args:
+            engine (OCREngine): Engine / router (lihat src/engines)
+            image (numpy.ndarray): Gambar RGB hasil decode
+            progress (callable, optional): Checkpoint ('detected', 'token')
+
+        Returns:
+            list: Token format reader.readtext (label lalu nilai per field, urut
+                  seperti di kartu), atau None jika harus fallback ke readtext
+        """
+        import cv2
+        import numpy as np
+
+        registered = self.register(image)
+        if registered is None:
+            self.logger.info("Kartu KTP tidak ditemukan, fallback ke deteksi penuh")
+            return None
+        card, inverse = registered
+
+        fields = self.config['fields']
+        if progress is not None:
+            progress('detected', {'boxes': len(fields), 'template': True})
+
+        def to_image(x0, y0, x1, y1):
+            corners = np.float32([[[x0, y0], [x1, y0], [x1, y1], [x0, y1]]])
+            return cv2.perspectiveTransform(corners, inverse)[0].round().astype(int).tolist()
+
+        label_x0, label_x1 = self.config['label_box']
+        results = []
+        for label, (x0, y0, x1, y1), allowlist in fields:
+            box = [int(x0 * self.width), int(x1 * self.width),
+                   int(y0 * self.height), int(y1 * self.height)]
+            part = engine.recognize(card, [quad_from_rect(box[0], box[2], box[1], box[3])],
+                                    allowlist=allowlist, validate=self.validator(label))
+            text = " ".join(item[1] for item in part).strip()
+            confidence = min((float(item[2]) for item in part), default=0.0)
+
+            if label == "NIK" and sum(c.isdigit() for c in text) < self.config['min_nik_digits']:
+                self.logger.info(f"NIK dari template tidak lengkap ('{text}'), fallback ke deteksi penuh")
+                return None
+            if not text:
+                continue
+
+            label_token = (to_image(label_x0 * self.width, box[2], label_x1 * self.width, box[3]),
+                           label, 1.0)
+            value_token = (to_image(box[0], box[2], box[1], box[3]), text, confidence)
+            for token in (label_token, value_token):
+                results.append(token)
+                if progress is not None:
+                    progress('token', dict(index=len(results) - 1, **OCRToken.from_easyocr(token, 1).to_dict()))
+
+        if OCR_CONFIG['detail'] != 1:
+            return [text for _, text, _ in results]
+        return results
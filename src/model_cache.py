@@ -0,0 +1,115 @@
+"""
+Model cache - Reader EasyOCR dengan modul siap pakai yang di-cache ke disk
+
+Di CPU, easyocr.Reader memuat state dict fp32 lalu (jika quantize=True)
+menjalankan torch.quantization.quantize_dynamic pada recognizer setiap kali
+proses start. Modul detector + recognizer + converter hasil akhirnya
+disimpan sekali ke OCR_CONFIG['model_cache_dir'], sehingga startup
+berikutnya cukup unpickle tanpa konversi ulang.
+
+Kuantisasi dinamis hanya mengubah layer LSTM/Linear: recognizer ikut int8,
+detector CRAFT (semua konvolusi) tetap fp32.
+
+File cache berupa pickle torch penuh: hanya muat dari direktori milik aplikasi.
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+from config import OCR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_path(quantize):
+    """Path file cache untuk kombinasi bahasa/kuantisasi/versi library ini"""
+    import easyocr
+    import torch
+
+    cache_dir = OCR_CONFIG.get('model_cache_dir')
+    if not cache_dir:
+        return None
+    key = "|".join([",".join(sorted(OCR_CONFIG['languages'])), f"quantize={bool(quantize)}",
+                    getattr(easyocr, "__version__", "?"), torch.__version__])
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"reader-{'int8' if quantize else 'fp32'}-{digest}.pt"
+
+
+def create_reader(quantize=None, use_cache=True):
+    """
+    Buat easyocr.Reader sesuai OCR_CONFIG, memakai modul dari cache jika ada
+
+    Args:
+        quantize (bool, optional): Kuantisasi int8 dinamis (default OCR_CONFIG['quantize'])
+        use_cache (bool): Baca/tulis cache modul (hanya untuk CPU)
+
+    Returns:
+        easyocr.Reader: Reader siap pakai
+    """
+    import easyocr
+
+    quantize = OCR_CONFIG.get('quantize', True) if quantize is None else quantize
+    languages = OCR_CONFIG['languages']
+    if OCR_CONFIG['gpu'] or not use_cache:
+        return easyocr.Reader(languages, gpu=OCR_CONFIG['gpu'], quantize=quantize)
+
+    path = _cache_path(quantize)
+    if path is not None and path.exists():
+        reader = _load_cached(path, languages, quantize)
+        if reader is not None:
+            return reader
+
+    reader = easyocr.Reader(languages, gpu=False, quantize=quantize)
+    if path is not None:
+        _save_cached(path, reader)
+    return reader
+
+
+def _full_pickle_kwargs(torch):
+    """
+    weights_only=False hanya jika torch.load mengenalnya (torch >= 1.13);
+    sejak torch 2.6 default-nya True dan modul penuh tidak bisa di-unpickle
+    """
+    import inspect
+
+    if 'weights_only' in inspect.signature(torch.load).parameters:
+        return {'weights_only': False}
+    return {}
+
+
+def _load_cached(path, languages, quantize):
+    """Reader tanpa model (hanya metadata bahasa), lalu pasang modul dari cache"""
+    import easyocr
+    import torch
+    from easyocr.detection import get_textbox
+
+    try:
+        modules = torch.load(path, map_location='cpu', **_full_pickle_kwargs(torch))
+        reader = easyocr.Reader(languages, gpu=False, quantize=quantize,
+                                detector=False, recognizer=False)
+        reader.detect_network = 'craft'
+        reader.get_textbox = get_textbox
+        reader.detector = modules['detector']
+        reader.recognizer = modules['recognizer']
+        reader.converter = modules['converter']
+        logger.info(f"Modul reader dimuat dari cache: {path.name}")
+        return reader
+    except Exception as e:
+        logger.warning(f"Cache modul reader tidak bisa dipakai ({path.name}): {str(e)}")
+        return None
+
+
+def _save_cached(path, reader):
+    """Simpan modul reader ke file sementara lalu os.replace (aman antar proses)"""
+    import torch
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        torch.save({'detector': reader.detector, 'recognizer': reader.recognizer,
+                    'converter': reader.converter}, tmp)
+        os.replace(tmp, path)
+        logger.info(f"Modul reader disimpan ke cache: {path.name}")
+    except Exception as e:
+        logger.warning(f"Gagal menyimpan cache modul reader: {str(e)}")
@@ -1,13 +1,24 @@
 """
 OCR Processor - Logic utama untuk processing OCR
+
+easyocr/torch, OpenCV dan numpy baru diimport saat reader dimuat atau gambar
+pertama diproses, supaya proses web bisa melayani route ringan (download,
+upload statis, health check) tanpa menunggu import stack OCR.
 """
 import logging
-import easyocr
-from datetime import datetime
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
-from config import OCR_CONFIG, OUTPUT_DIR
-from .image_handler import ImageHandler
+from config import (BATCHING_CONFIG, ENGINE_CONFIG, KTP_TEMPLATE_CONFIG, OCR_CONFIG, OUTPUT_DIR,
+                    RESOLUTION_CONFIG)
+from utils.content_store import content_digest
+from utils.metrics import STARTUP_DURATION, gauge, stage_timer
+from .engines import create_engine, has_nik
+from .ocr_result import OCRResult, OCRToken
+from .result_cache import get_result_cache
 from .text_processor import TextProcessor
 
 def extract_fields(text):
@@ -64,106 +75,696 @@ def extract_fields(text):
 
     return fields
 
+class OCRCancelled(Exception):
+    """Proses OCR dihentikan di checkpoint (dibatalkan client / deadline)"""
+
+
+class OCRTimeout(OCRCancelled):
+    """Proses OCR melewati deadline per gambar"""
+
+
+def deadline_checkpoint(timeout, progress=None, is_cancelled=None):
+    """
+    Buat progress callback yang menghentikan OCR di checkpoint berikutnya
+    setelah deadline lewat atau saat is_cancelled() bernilai True
+
+    Args:
+        timeout (float): Deadline dalam detik dari sekarang (None = tanpa deadline)
+        progress (callable, optional): Callback progress yang diteruskan
+        is_cancelled (callable, optional): Cek pembatalan dari luar (mis. job dibatalkan)
+
+    Returns:
+        callable: progress(stage, payload)
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def checkpoint(stage, payload):
+        if deadline is not None and time.monotonic() > deadline:
+            raise OCRTimeout(f"Deadline {timeout}s terlewati pada tahap '{stage}'")
+        if is_cancelled is not None and is_cancelled():
+            raise OCRCancelled(f"Dibatalkan pada tahap '{stage}'")
+        if progress is not None:
+            progress(stage, payload)
+
+    return checkpoint
+
+
+class ReaderPool:
+    """
+    Pool reader EasyOCR yang hidup selama proses berjalan.
+
+    Bobot model CRAFT + recognizer hanya dimuat sekali (saat `load()`), lalu
+    dipinjamkan ke thread request lewat `acquire()`. Satu reader hanya dipakai
+    satu thread pada satu waktu, sehingga aman dibagi antar thread Flask.
+    """
+
+    def __init__(self, size=None, quantize=None):
+        self.logger = logging.getLogger(__name__)
+        self.size = max(1, int(size or OCR_CONFIG.get('reader_pool_size', 1)))
+        self.quantize = quantize
+        self._lock = threading.Lock()
+        self._available = queue.Queue()
+        self._generation = 0
+        self.loaded = False
+        self.warm = False
+        self.last_error = None
+        self.in_use = 0
+        self._in_use_lock = threading.Lock()
+
+    def _create_reader(self):
+        """Buat satu instance easyocr.Reader sesuai OCR_CONFIG (modul dari cache jika ada)"""
+        from .model_cache import create_reader
+        return create_reader(quantize=self.quantize)
+
+    def load(self):
+        """
+        Muat semua reader ke dalam pool (idempotent)
+
+        Returns:
+            ReaderPool: pool ini sendiri
+        """
+        with self._lock:
+            if self.loaded:
+                return self
+            self.logger.info(f"Memuat {self.size} EasyOCR reader...")
+            for _ in range(self.size):
+                self._available.put((self._generation, self._create_reader()))
+            self.loaded = True
+            self.logger.info("EasyOCR reader berhasil dimuat!")
+        return self
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Pinjam satu reader dari pool
+
+        Args:
+            timeout (float, optional): Batas waktu menunggu reader kosong (detik)
+
+        Yields:
+            easyocr.Reader: Reader yang siap dipakai
+        """
+        if not self.loaded:
+            self.load()
+        generation, reader = self._available.get(timeout=timeout)
+        with self._in_use_lock:
+            self.in_use += 1
+        try:
+            yield reader
+            # Inferensi pertama yang berhasil juga menghangatkan reader (tanpa warmup di startup)
+            if generation == self._generation:
+                self.warm = True
+        finally:
+            with self._in_use_lock:
+                self.in_use -= 1
+            # Reader dari generasi lama (sebelum reload/shutdown) tidak dikembalikan
+            if generation == self._generation and self.loaded:
+                self._available.put((generation, reader))
+
+    def warmup(self):
+        """
+        Jalankan satu inferensi dummy di setiap reader supaya inisialisasi
+        lazy torch tidak dibayar oleh request pertama.
+        """
+        import cv2
+        import numpy as np
+
+        if not self.loaded:
+            self.load()
+        dummy = np.full((64, 256), 255, dtype=np.uint8)
+        cv2.putText(dummy, "NIK 1234", (8, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+        readers = [self._available.get() for _ in range(self.size)]
+        try:
+            for _, reader in readers:
+                reader.readtext(dummy, detail=0)
+        finally:
+            for item in readers:
+                self._available.put(item)
+        self.warm = True
+        self.logger.info("Warmup EasyOCR reader selesai")
+
+    def reload(self):
+        """
+        Muat ulang semua reader. Reader lama yang sedang dipinjam tetap
+        menyelesaikan pekerjaannya lalu dibuang saat dikembalikan.
+        """
+        new_readers = [self._create_reader() for _ in range(self.size)]
+        with self._lock:
+            self._generation += 1
+            self._drain()
+            for reader in new_readers:
+                self._available.put((self._generation, reader))
+            self.loaded = True
+            self.warm = False
+        self.logger.info("EasyOCR reader dimuat ulang")
+
+    def shutdown(self):
+        """Lepaskan semua reader dari pool"""
+        with self._lock:
+            self._generation += 1
+            self._drain()
+            self.loaded = False
+            self.warm = False
+        self.logger.info("EasyOCR reader pool dimatikan")
+
+    def status(self):
+        """Status pool untuk endpoint readiness"""
+        return {
+            'size': self.size,
+            'in_use': self.in_use,
+            'loaded': self.loaded,
+            'warm': self.warm,
+            'error': self.last_error,
+        }
+
+    def _drain(self):
+        while True:
+            try:
+                self._available.get_nowait()
+            except queue.Empty:
+                break
+
+
+_reader_pool = None
+_reader_pool_lock = threading.Lock()
+
+gauge("ocr_reader_pool_size", "Jumlah reader EasyOCR di pool",
+      fn=lambda: _reader_pool.size if _reader_pool is not None else 0)
+gauge("ocr_reader_pool_in_use", "Reader EasyOCR yang sedang dipinjam",
+      fn=lambda: _reader_pool.in_use if _reader_pool is not None else 0)
+
+
+def get_reader_pool():
+    """Ambil ReaderPool bersama untuk proses ini (dibuat saat pertama dipanggil)"""
+    global _reader_pool
+    with _reader_pool_lock:
+        if _reader_pool is None:
+            _reader_pool = ReaderPool()
+        return _reader_pool
+
+
+def warmup_readers():
+    """
+    Muat dan panaskan reader bersama
+
+    Returns:
+        bool: True jika reader siap dipakai
+    """
+    pool = get_reader_pool()
+    started = time.perf_counter()
+    try:
+        pool.load().warmup()
+        pool.last_error = None
+        STARTUP_DURATION.set(time.perf_counter() - started, phase="reader_warmup")
+        return True
+    except Exception as e:
+        pool.last_error = str(e)
+        logging.getLogger(__name__).error(f"Warmup reader gagal: {str(e)}")
+        return False
+
+
+def reload_readers():
+    """Muat ulang lalu panaskan reader bersama"""
+    pool = get_reader_pool()
+    pool.reload()
+    pool.warmup()
+
+
+def shutdown_readers():
+    """Matikan reader bersama (dipanggil saat aplikasi berhenti)"""
+    if _reader_pool is not None:
+        _reader_pool.shutdown()
+
+
 class OCRProcessor:
-    def __init__(self):
+    def __init__(self, reader_pool=None, result_cache=None, batching=None, template=None,
+                 engine=None):
+        """
+        Args:
+            reader_pool (ReaderPool, optional): Default pool bersama proses
+            result_cache (ResultCache, optional): Default cache bersama proses;
+                False untuk mematikan cache (dipakai proses worker supervisor)
+            batching (bool, optional): Gabungkan readtext request bersamaan lewat
+                BatchScheduler (default BATCHING_CONFIG['enabled']). Matikan untuk
+                pemakai single-thread (worker job/batch) supaya tidak menunggu window.
+            template (bool, optional): Coba mode template KTP (rekognisi per field
+                tanpa deteksi) sebelum readtext (default KTP_TEMPLATE_CONFIG['enabled'])
+            engine (str, optional): 'easyocr', 'tesseract' atau 'auto' (router
+                biaya, lihat src/engines); default ENGINE_CONFIG['engine']
+        """
         self.logger = logging.getLogger(__name__)
-        self.image_handler = ImageHandler()
+        self._image_handler = None
         self.text_processor = TextProcessor()
         
-        # Inisialisasi EasyOCR
-        self.logger.info("Memuat EasyOCR reader...")
-        self.reader = easyocr.Reader(
-            OCR_CONFIG['languages'],
-            gpu=OCR_CONFIG['gpu']
-        )
-        self.logger.info("EasyOCR reader berhasil dimuat!")
+        # Gunakan reader bersama supaya model tidak dimuat ulang per request.
+        # Pemuatan + warmup dilakukan saat startup (warmup_readers), atau
+        # paling lambat saat reader pertama kali dipinjam.
+        self.reader_pool = reader_pool or get_reader_pool()
+        
+        # Cache hasil per hash gambar (None jika CACHE_CONFIG['enabled'] False)
+        self.result_cache = get_result_cache() if result_cache is None else (result_cache or None)
+        
+        if batching is None:
+            batching = BATCHING_CONFIG['enabled']
+        self.batching = batching and not OCR_CONFIG['paragraph']
+        
+        if template is None:
+            template = KTP_TEMPLATE_CONFIG['enabled']
+        self.template = None
+        if template:
+            from .ktp_template import KTPTemplate
+            self.template = KTPTemplate()
+        
+        # Engine untuk mode template dan readtext non-EasyOCR; jalur EasyOCR
+        # biasa (batching, varian, progress per token) tetap lewat _readtext
+        self.engine = create_engine(engine or ENGINE_CONFIG['engine'], reader_pool=self.reader_pool)
+    
+    def warmup(self):
+        """Muat + warmup reader bersama (lihat warmup_readers)"""
+        return warmup_readers()
+    
+    def reader_status(self):
+        """Status reader untuk endpoint readiness"""
+        return self.reader_pool.status()
+    
+    @property
+    def image_handler(self):
+        """ImageHandler dibuat saat pertama dipakai (import OpenCV ditunda)"""
+        if self._image_handler is None:
+            from .image_handler import ImageHandler
+            self._image_handler = ImageHandler()
+        return self._image_handler
     
-    def process_image(self, image_path):
+    def process_image(self, image_path, save_files=None, source_name=None, progress=None):
         """
         Memproses satu gambar dengan OCR
         
         Args:
             image_path (str): Path ke file gambar
+            save_files (bool, optional): Tulis file *_text.txt / *_detail.txt
+                (default OCR_CONFIG['save_output_files'])
+            source_name (str, optional): Nama file asli (default nama file path)
+            progress (callable, optional): Lihat process_array
             
         Returns:
-            bool: True jika berhasil, False jika gagal
+            OCRResult: Hasil terstruktur, atau None jika gagal
         """
         try:
             image_path = Path(image_path)
+            timings = {}
             
             # Validasi file
-            if not self.image_handler.validate_image(image_path):
+            with stage_timer('validate_image', timings):
+                valid = self.image_handler.validate_image(image_path)
+            if not valid:
                 self.logger.error(f"File tidak valid: {image_path}")
-                return False
+                return None
             
-            # Load dan preprocess gambar
-            image = self.image_handler.load_image(image_path)
-            if image is None:
-                return False
+            return self.process_bytes(image_path.read_bytes(), source_name or image_path.name,
+                                      save_files=save_files, timings=timings, progress=progress)
+            
+        except OCRCancelled:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error dalam process_image: {str(e)}")
+            return None
+    
+    def process_bytes(self, data, source_name, save_files=None, digest=None, timings=None,
+                      progress=None):
+        """
+        Jalankan OCR untuk isi file gambar, memakai cache hasil jika ada
+        
+        Args:
+            data (bytes): Isi file gambar
+            source_name (str): Nama file asli
+            save_files (bool, optional): Lihat process_image
+            digest (str, optional): sha256 data jika sudah dihitung
+            timings (dict, optional): Durasi tahap sebelumnya (diteruskan ke hasil)
+            progress (callable, optional): Lihat process_array
+            
+        Returns:
+            OCRResult: Hasil terstruktur, atau None jika gagal
+        """
+        timings = {} if timings is None else timings
+        if self.result_cache is not None:
+            with stage_timer('cache_lookup', timings):
+                digest = digest or content_digest(data)
+                cached = self.result_cache.get(digest, source_name)
+            if cached is not None:
+                self.logger.info(f"Hasil OCR diambil dari cache: {source_name}")
+                cached.timings = timings
+                self._emit(progress, 'cached')
+                return cached
+        
+        with stage_timer('load_image', timings):
+            image = self.image_handler.decode_image(data, source_name)
+        if image is None:
+            return None
+        self._emit(progress, 'loaded', width=int(image.shape[1]), height=int(image.shape[0]))
+        
+        result = self.process_array(image, source_name, save_files=save_files, timings=timings,
+                                    progress=progress)
+        if result is not None and self.result_cache is not None:
+            self.result_cache.put(digest, result)
+        return result
+    
+    def process_array(self, image, source_name, save_files=None, timings=None, progress=None):
+        """
+        Jalankan OCR pada gambar yang sudah di-decode
+        
+        Args:
+            image (numpy.ndarray): Image array RGB
+            source_name (str): Nama file asli (untuk nama file output)
+            save_files (bool, optional): Lihat process_image
+            timings (dict, optional): Diisi durasi per tahap (detik)
+            progress (callable, optional): Dipanggil progress(stage, payload) di
+                setiap checkpoint ('preprocessed', 'detected', 'token',
+                'recognized'); boleh raise OCRCancelled untuk berhenti
+            
+        Returns:
+            OCRResult: Hasil terstruktur, atau None jika gagal
+            
+        Raises:
+            OCRCancelled: Jika progress callback membatalkan proses
+        """
+        if save_files is None:
+            save_files = OCR_CONFIG.get('save_output_files', True)
+        timings = {} if timings is None else timings
+        try:
+            # Kartu yang terbingkai rapi: langsung rekognisi box field, tanpa CRAFT
+            if self.template is not None:
+                with stage_timer('template_ocr', timings):
+                    results = self.template.recognize(self.engine, image, progress)
+                if results is not None:
+                    self._emit(progress, 'recognized', tokens=len(results), template=True)
+                    return self._build_result(results, source_name, save_files, timings)
             
             # Preprocess image untuk OCR yang lebih baik
-            processed_image = self.image_handler.preprocess_image(image)
+            measurements = {}
+            with stage_timer('preprocess_image', timings):
+                processed_image = self.image_handler.preprocess_image(image, measurements=measurements)
+            self._emit(progress, 'preprocessed')
             
             # Lakukan OCR
             self.logger.info("Melakukan OCR...")
-            results = self.reader.readtext(
-                processed_image,
-                detail=OCR_CONFIG['detail'],
-                paragraph=OCR_CONFIG['paragraph'],
-                width_ths=OCR_CONFIG['width_ths'],
-                height_ths=OCR_CONFIG['height_ths']
-            )
-            
-            if not results:
-                self.logger.warning("Tidak ada text terdeteksi dalam gambar")
-                return True
+            with stage_timer('readtext', timings):
+                if self.engine.name != 'easyocr':
+                    results = self._engine_readtext(processed_image, progress)
+                elif self.batching and progress is None and not OCR_CONFIG.get('recognition_variants'):
+                    from .batching import get_batch_scheduler
+                    results = get_batch_scheduler().readtext(processed_image)
+                else:
+                    with self.reader_pool.acquire() as reader:
+                        results = self._readtext(reader, processed_image, progress,
+                                                 text_height=measurements.get('text_height'))
+            self._emit(progress, 'recognized', tokens=len(results))
             
-            # Process hasil OCR
-            processed_text = self.text_processor.process_results(results)
+            return self._build_result(results, source_name, save_files, timings)
             
-            # Simpan hasil
-            self._save_results(image_path, processed_text, results)
+        except OCRCancelled:
+            self.logger.info(f"OCR dibatalkan: {source_name}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error dalam process_array: {str(e)}")
+            return None
+    
+    def process_images(self, images, save_files=None, batch_size=None):
+        """
+        OCR banyak gambar dengan inferensi batch (untuk backfill / batch besar)
+        
+        Gambar dikumpulkan per batch_size, di-preprocess, lalu di-pad ke kanvas
+        yang sama supaya deteksi CRAFT berjalan sebagai satu tensor batch dan
+        crop text dari semua gambar dikenali bersama (lihat batching.readtext_batch).
+        Padding hanya di kanan/bawah, jadi koordinat box tidak berubah.
+        
+        Args:
+            images (iterable): Path file, numpy array, atau tuple (source_name, array)
+            save_files (bool, optional): Lihat process_image
+            batch_size (int, optional): Gambar per inferensi (default BATCHING_CONFIG['max_batch'])
             
-            # Log hasil
-            self.logger.info(f"Text terdeteksi: {len(results)} baris")
-            self.logger.info("Preview text:")
-            preview = processed_text[:100] + "..." if len(processed_text) > 100 else processed_text
-            self.logger.info(f"'{preview}'")
+        Yields:
+            tuple: (source_name, OCRResult atau None jika gagal), urut sesuai input,
+                   begitu batch tempat gambar itu selesai
+        """
+        if save_files is None:
+            save_files = OCR_CONFIG.get('save_output_files', True)
+        batch_size = max(1, batch_size or BATCHING_CONFIG['max_batch'])
+        
+        batch = []
+        for index, item in enumerate(images):
+            batch.append(self._load_batch_item(index, item))
+            if len(batch) >= batch_size:
+                yield from self._process_image_batch(batch, save_files)
+                batch = []
+        if batch:
+            yield from self._process_image_batch(batch, save_files)
+    
+    def _load_batch_item(self, index, item):
+        """Normalisasi satu input process_images -> dict (name, image, digest, timings)"""
+        timings = {}
+        if isinstance(item, tuple):
+            name, image = item
+            return {'name': name, 'image': image, 'digest': None, 'cached': None, 'timings': timings}
+        if not isinstance(item, (str, Path)):
+            return {'name': f"image_{index}", 'image': item, 'digest': None, 'cached': None,
+                    'timings': timings}
+        
+        path = Path(item)
+        entry = {'name': path.name, 'image': None, 'digest': None, 'cached': None, 'timings': timings}
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            self.logger.error(f"Gagal membaca {path}: {str(e)}")
+            return entry
+        if self.result_cache is not None:
+            with stage_timer('cache_lookup', timings):
+                entry['digest'] = content_digest(data)
+                entry['cached'] = self.result_cache.get(entry['digest'], path.name)
+            if entry['cached'] is not None:
+                return entry
+        with stage_timer('load_image', timings):
+            entry['image'] = self.image_handler.decode_image(data, path.name)
+        return entry
+    
+    def _process_image_batch(self, batch, save_files):
+        """Jalankan satu batch process_images; yield (source_name, hasil) urut input"""
+        import numpy as np
+        from .batching import readtext_batch
+        
+        pending = [entry for entry in batch if entry['cached'] is None and entry['image'] is not None]
+        raw = {}
+        if pending:
+            for entry in pending:
+                with stage_timer('preprocess_image', entry['timings']):
+                    entry['image'] = self.image_handler.preprocess_image(entry['image'])
             
-            return True
+            # Kanvas bersama (kelipatan 32, sesuai stride CRAFT); latar putih
+            images = [entry['image'] for entry in pending]
+            if len({image.ndim for image in images}) > 1:
+                images = [np.dstack([image] * 3) if image.ndim == 2 else image for image in images]
+            height = -(-max(image.shape[0] for image in images) // 32) * 32
+            width = -(-max(image.shape[1] for image in images) // 32) * 32
+            images = [
+                np.pad(image, [(0, height - image.shape[0]), (0, width - image.shape[1])]
+                       + [(0, 0)] * (image.ndim - 2), constant_values=255)
+                for image in images
+            ]
             
-        except Exception as e:
-            self.logger.error(f"Error dalam process_image: {str(e)}")
-            return False
+            started = time.perf_counter()
+            try:
+                if self.engine.name != 'easyocr':
+                    # Tesseract / router tidak punya inferensi batch: per gambar
+                    results = [self._engine_readtext(image) for image in images]
+                elif OCR_CONFIG['paragraph']:
+                    # readtext_batch tidak mendukung paragraph: per gambar, reader tetap satu
+                    with self.reader_pool.acquire() as reader:
+                        results = [self._readtext(reader, image) for image in images]
+                else:
+                    # Satu skala deteksi untuk seluruh batch supaya tetap satu tensor
+                    detect_scale = None
+                    if RESOLUTION_CONFIG['enabled']:
+                        import cv2
+                        from .resolution import detection_scale
+                        scales = [detection_scale(image if image.ndim == 2 else
+                                                  cv2.cvtColor(image, cv2.COLOR_RGB2GRAY))[0]
+                                  for image in images]
+                        detect_scale = float(np.median(scales))
+                    with self.reader_pool.acquire() as reader:
+                        results = readtext_batch(reader, images, detect_scale=detect_scale)
+            except Exception as e:
+                self.logger.error(f"Error OCR batch ({len(pending)} gambar): {str(e)}")
+                results = [None] * len(pending)
+            elapsed = time.perf_counter() - started
+            for entry, result in zip(pending, results):
+                entry['timings']['readtext_batch'] = elapsed
+                raw[id(entry)] = result
+            self.logger.info(f"OCR batch {len(pending)} gambar ({width}x{height}) selesai "
+                             f"dalam {elapsed:.2f}s")
+        
+        for entry in batch:
+            if entry['cached'] is not None:
+                entry['cached'].timings = entry['timings']
+                yield entry['name'], entry['cached']
+                continue
+            results = raw.get(id(entry))
+            if results is None:
+                yield entry['name'], None
+                continue
+            try:
+                result = self._build_result(results, entry['name'], save_files, entry['timings'])
+            except Exception as e:
+                self.logger.error(f"Error memproses hasil {entry['name']}: {str(e)}")
+                result = None
+            if result is not None and entry['digest'] and self.result_cache is not None:
+                self.result_cache.put(entry['digest'], result)
+            yield entry['name'], result
+    
+    def _build_result(self, results, source_name, save_files, timings):
+        """Bentuk OCRResult dari hasil readtext (+ simpan file jika diminta)"""
+        result = OCRResult(source_name=source_name, timings=timings)
+        if not results:
+            self.logger.warning("Tidak ada text terdeteksi dalam gambar")
+            return result
+        
+        # Process hasil OCR
+        result.tokens = [OCRToken.from_easyocr(r, OCR_CONFIG['detail']) for r in results]
+        with stage_timer('process_results', timings):
+            result.text = self.text_processor.process_results(results)
+        
+        # Simpan hasil
+        if save_files:
+            with stage_timer('save_results', timings):
+                result.text_file, result.detail_file = self._save_results(result)
+        
+        # Log hasil
+        self.logger.info(f"Text terdeteksi: {len(results)} baris")
+        self.logger.info("Preview text:")
+        preview = result.text[:100] + "..." if len(result.text) > 100 else result.text
+        self.logger.info(f"'{preview}'")
+        
+        return result
+    
+    def _readtext(self, reader, image, progress=None, text_height=None):
+        """
+        Jalankan reader.readtext. Jika ada progress callback atau varian
+        rekognisi (OCR_CONFIG['recognition_variants']), deteksi dan rekognisi
+        dipisah (hasil sama dengan readtext): jumlah box dan setiap token bisa
+        dilaporkan, dan box dari satu kali deteksi dikenali ulang di setiap
+        varian lalu dipilih yang confidence-nya tertinggi. Semua box dari
+        gambar dasar dan semua varian dikenali dalam satu rekognisi batch
+        (batching.recognize_boxes); dengan progress callback per box, supaya
+        token dilaporkan begitu selesai.
+        Dengan RESOLUTION_CONFIG['enabled'], skala deteksi mengikuti tinggi
+        huruf (lihat src/resolution.py) dan rekognisi tetap di resolusi penuh;
+        text_height dari preprocessing dipakai ulang jika diberikan.
+        """
+        from easyocr.utils import reformat_input
+        from . import resolution
+        from .batching import recognize_boxes
+        
+        variant_names = OCR_CONFIG.get('recognition_variants') or []
+        split = progress is not None or variant_names or RESOLUTION_CONFIG['enabled']
+        image, grey = reformat_input(image)
+        scale = None
+        if RESOLUTION_CONFIG['enabled']:
+            scale, text_height = resolution.detection_scale(grey, text_height)
+            self.logger.debug(f"Tinggi huruf ~{text_height:.0f}px, skala deteksi {scale:.2f}")
+        if not split or OCR_CONFIG['paragraph']:
+            detect_kwargs = resolution.detect_kwargs(image.shape, scale) if scale else {}
+            return reader.readtext(
+                image,
+                detail=OCR_CONFIG['detail'],
+                paragraph=OCR_CONFIG['paragraph'],
+                width_ths=OCR_CONFIG['width_ths'],
+                height_ths=OCR_CONFIG['height_ths'],
+                **detect_kwargs
+            )
+        
+        if scale:
+            horizontal_list, free_list = resolution.detect(reader, image, grey, scale)
+        else:
+            horizontal_list, free_list = reader.detect(
+                image,
+                width_ths=OCR_CONFIG['width_ths'],
+                height_ths=OCR_CONFIG['height_ths'],
+                reformat=False
+            )
+            horizontal_list, free_list = horizontal_list[0], free_list[0]
+        self._emit(progress, 'detected', boxes=len(horizontal_list) + len(free_list))
+        
+        # Varian dibuat dari grayscale yang sama, jadi ukurannya sama dan box tetap berlaku
+        variants = self.image_handler.recognition_variants(grey, variant_names) if variant_names else []
+        
+        # Urutan sama dengan readtext: box horizontal dulu, lalu free box
+        boxes = [([box], []) for box in horizontal_list] + [([], [box]) for box in free_list]
+        # Tanpa progress semua box satu rekognisi batch; dengan progress per box
+        # supaya token (dan field KTP) sampai ke client begitu terbaca
+        chunks = [boxes] if progress is None else [[box] for box in boxes]
+        images = [grey] + [variant for _, variant in variants]
+        results = []
+        wins = {}
+        for chunk in chunks:
+            recognized = recognize_boxes(reader, images, [chunk] * len(images))
+            part = recognized[0]
+            for (name, _), candidate in zip(variants, recognized[1:]):
+                if len(candidate) != len(part):
+                    continue
+                for i, item in enumerate(candidate):
+                    if item[2] > part[i][2]:
+                        part[i] = item
+                        wins[name] = wins.get(name, 0) + 1
+            for item in part:
+                if OCR_CONFIG['detail'] != 1:
+                    item = item[1]
+                results.append(item)
+                token = OCRToken.from_easyocr(item, OCR_CONFIG['detail'])
+                self._emit(progress, 'token', index=len(results) - 1, **token.to_dict())
+        if variants:
+            self.logger.info(f"Varian rekognisi ({len(boxes)} box, 1x deteksi), "
+                             f"menang atas gambar dasar: {wins or '-'}")
+        return results
     
-    def _save_results(self, image_path, text, raw_results):
-        """Simpan hasil OCR ke file"""
+    def _engine_readtext(self, image, progress=None):
+        """
+        readtext lewat self.engine (Tesseract / router). Router eskalasi ke
+        engine berikutnya jika tidak ada NIK 16 digit di hasil.
+        """
+        results = self.engine.readtext(image, validate=has_nik)
+        self._emit(progress, 'detected', boxes=len(results), engine=self.engine.name)
+        if OCR_CONFIG['detail'] != 1:
+            results = [text for _, text, _ in results]
+        return results
+    
+    @staticmethod
+    def _emit(progress, stage, **payload):
+        """Checkpoint: laporkan progress (callback boleh raise OCRCancelled)"""
+        if progress is not None:
+            progress(stage, payload)
+    
+    def _save_results(self, result):
+        """
+        Simpan hasil OCR ke file
+        
+        Returns:
+            tuple: (text_file, detail_file), berisi None jika gagal menyimpan
+        """
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            base_name = image_path.stem
+            timestamp = result.processed_at.strftime('%Y%m%d_%H%M%S')
+            base_name = Path(result.source_name).stem
             
             # Simpan text bersih
             text_file = OUTPUT_DIR / f"{base_name}_{timestamp}_text.txt"
             with open(text_file, 'w', encoding='utf-8') as f:
-                f.write(text)
+                f.write(result.text)
             
             # Simpan hasil detail
             detail_file = OUTPUT_DIR / f"{base_name}_{timestamp}_detail.txt"
             with open(detail_file, 'w', encoding='utf-8') as f:
-                f.write(f"OCR Results for: {image_path.name}\n")
-                f.write(f"Processed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for i, result in enumerate(raw_results, 1):
-                    if OCR_CONFIG['detail'] == 1:
-                        bbox, text, confidence = result
-                        f.write(f"[{i}] Text: '{text}'\n")
-                        f.write(f"    Confidence: {confidence:.2f}\n")
-                        f.write(f"    BBox: {bbox}\n\n")
-                    else:
-                        f.write(f"[{i}] {result}\n")
+                f.write(result.render_detail())
             
             self.logger.info(f"Hasil disimpan ke: {text_file.name}")
+            return text_file, detail_file
             
         except Exception as e:
-            self.logger.error(f"Error menyimpan hasil: {str(e)}")
\ No newline at end of file
+            self.logger.error(f"Error menyimpan hasil: {str(e)}")
+            return None, None
@@ -0,0 +1,117 @@
+"""
+OCR Result - Hasil OCR terstruktur yang dikembalikan OCRProcessor
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass
+class OCRToken:
+    """Satu potongan text hasil EasyOCR"""
+    text: str
+    confidence: Optional[float] = None
+    bbox: Optional[list] = None   # 4 titik [[x, y], ...] pada gambar yang di-OCR
+
+    @classmethod
+    def from_easyocr(cls, item, detail=1):
+        """Buat token dari satu elemen hasil reader.readtext"""
+        if detail != 1:
+            return cls(text=str(item).strip())
+        bbox, text, confidence = item
+        return cls(
+            text=text.strip(),
+            confidence=float(confidence),
+            bbox=[[float(x), float(y)] for x, y in bbox],
+        )
+
+    def to_dict(self):
+        return {'text': self.text, 'confidence': self.confidence, 'bbox': self.bbox}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(text=data['text'], confidence=data.get('confidence'), bbox=data.get('bbox'))
+
+
+@dataclass
+class OCRResult:
+    """
+    Hasil OCR satu gambar: token + bbox + confidence, text bersih,
+    dan path file output (None jika penulisan file dimatikan).
+    """
+    source_name: str
+    tokens: List[OCRToken] = field(default_factory=list)
+    text: str = ""
+    processed_at: datetime = field(default_factory=datetime.now)
+    text_file: Optional[Path] = None
+    detail_file: Optional[Path] = None
+    cache_hit: bool = False       # True jika diambil dari ResultCache
+    timings: dict = field(default_factory=dict)   # Durasi per tahap pipeline (detik)
+    _fields: Optional[dict] = field(default=None, repr=False, compare=False)
+
+    @property
+    def texts(self):
+        return [t.text for t in self.tokens]
+
+    @property
+    def confidences(self):
+        return [t.confidence for t in self.tokens]
+
+    @property
+    def boxes(self):
+        return [t.bbox for t in self.tokens]
+
+    @property
+    def fields(self):
+        """Field KTP (kolom HEADERS[2:] di utils/excel_utils.py), dihitung sekali"""
+        if self._fields is None:
+            from utils.excel_utils import extract_ktp_fields
+            self._fields = extract_ktp_fields(self.texts)
+        return self._fields
+
+    def render_detail(self):
+        """Format teks yang sama dengan isi file *_detail.txt"""
+        lines = [
+            f"OCR Results for: {self.source_name}",
+            f"Processed at: {self.processed_at.strftime('%Y-%m-%d %H:%M:%S')}",
+            "=" * 50,
+            "",
+        ]
+        for i, token in enumerate(self.tokens, 1):
+            if token.confidence is not None:
+                lines.append(f"[{i}] Text: '{token.text}'")
+                lines.append(f"    Confidence: {token.confidence:.2f}")
+                lines.append(f"    BBox: {token.bbox}")
+                lines.append("")
+            else:
+                lines.append(f"[{i}] {token.text}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        """Representasi JSON-able"""
+        return {
+            'source_file': self.source_name,
+            'processed_at': self.processed_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'text': self.text,
+            'fields': self.fields,
+            'tokens': [t.to_dict() for t in self.tokens],
+            'text_file': self.text_file.name if self.text_file else None,
+            'detail_file': self.detail_file.name if self.detail_file else None,
+            'cached': self.cache_hit,
+            'timings': {k: round(v, 4) for k, v in self.timings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Kebalikan to_dict (dipakai cache hasil di disk)"""
+        from config import OUTPUT_DIR
+        return cls(
+            source_name=data['source_file'],
+            tokens=[OCRToken.from_dict(t) for t in data.get('tokens', [])],
+            text=data.get('text', ""),
+            processed_at=datetime.strptime(data['processed_at'], '%Y-%m-%d %H:%M:%S'),
+            text_file=OUTPUT_DIR / data['text_file'] if data.get('text_file') else None,
+            detail_file=OUTPUT_DIR / data['detail_file'] if data.get('detail_file') else None,
+            _fields=data.get('fields'),
+        )
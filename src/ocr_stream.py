@@ -0,0 +1,143 @@
+"""
+OCR Stream - Progress OCR sebagai server-sent events (SSE)
+
+OCR dijalankan di thread terpisah; setiap checkpoint OCRProcessor
+(loaded, preprocessed, detected, token, recognized) dikirim ke client
+sebagai event, dan field KTP dikirim begitu nilainya stabil. Jika client
+memutus koneksi atau memanggil cancel(), proses berhenti di checkpoint
+berikutnya (OCRCancelled).
+"""
+import json
+import logging
+import queue
+import threading
+import uuid
+
+from utils.excel_utils import HEADERS, extract_ktp_fields
+from .ocr_processor import OCRCancelled, OCRTimeout
+
+logger = logging.getLogger(__name__)
+
+# Interval event keep-alive (detik); menulis ke socket juga cara mendeteksi client putus
+HEARTBEAT_SECONDS = 5.0
+
+_active = {}
+_active_lock = threading.Lock()
+
+
+def format_event(event, data):
+    """Satu event SSE ('event:' + 'data:' JSON + baris kosong)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def cancel(stream_id):
+    """
+    Batalkan stream OCR yang sedang berjalan
+
+    Returns:
+        bool: True jika stream ditemukan
+    """
+    with _active_lock:
+        stream = _active.get(stream_id)
+    if stream is None:
+        return False
+    stream.cancel_event.set()
+    return True
+
+
+class OCRProgressStream:
+    """
+    Satu run OCR yang hasilnya di-stream sebagai SSE
+
+    Args:
+        run (callable): run(progress) -> OCRResult atau None; progress
+            diteruskan ke OCRProcessor.process_bytes
+        on_result (callable, optional): on_result(result) -> dict tambahan
+            untuk event 'done' (mis. menyimpan ke Excel)
+    """
+
+    def __init__(self, run, on_result=None):
+        self.id = uuid.uuid4().hex
+        self.cancel_event = threading.Event()
+        self._run = run
+        self._on_result = on_result
+        self._events = queue.Queue()
+        self._texts = []
+        self._sent_fields = {}
+        self._stable = {}
+
+    # ----- Sisi thread OCR -----
+    def _progress(self, stage, payload):
+        if self.cancel_event.is_set():
+            raise OCRCancelled(self.id)
+        if stage == 'token':
+            self._events.put(('token', payload))
+            self._texts.append(payload['text'])
+            self._push_stable_fields()
+        else:
+            self._events.put(('stage', dict(payload, stage=stage)))
+
+    def _push_stable_fields(self):
+        """
+        Kirim field yang nilainya tidak berubah setelah satu token tambahan.
+        Parser melihat token berikutnya (label -> nilai), jadi nilai dari
+        token terakhir saja belum pasti.
+        """
+        fields = extract_ktp_fields(self._texts)
+        for name, value in fields.items():
+            if value and self._stable.get(name) == value and self._sent_fields.get(name) != value:
+                self._sent_fields[name] = value
+                self._events.put(('field', {'name': name, 'value': value}))
+        self._stable = fields
+
+    def _worker(self):
+        try:
+            result = self._run(self._progress)
+            if result is None:
+                self._events.put(('error', {'error': "OCR gagal memproses gambar"}))
+                return
+            body = result.to_dict()
+            body['fields'] = {h: result.fields.get(h, "") for h in HEADERS[2:]}
+            # Field final yang belum terkirim (atau berubah) dikirim sebelum 'done'
+            for name, value in body['fields'].items():
+                if value and self._sent_fields.get(name) != value:
+                    self._events.put(('field', {'name': name, 'value': value}))
+            if self._on_result is not None:
+                body.update(self._on_result(result) or {})
+            self._events.put(('done', body))
+        except OCRTimeout as e:
+            self._events.put(('error', {'error': str(e), 'timeout': True}))
+        except OCRCancelled:
+            self._events.put(('cancelled', {'stream_id': self.id}))
+        except Exception as e:
+            logger.error(f"Error stream OCR {self.id}: {str(e)}")
+            self._events.put(('error', {'error': str(e)}))
+        finally:
+            self._events.put(None)
+
+    # ----- Sisi response HTTP -----
+    def events(self):
+        """
+        Generator teks SSE; dipakai langsung sebagai body Response.
+        Menutup generator (client putus) membatalkan OCR.
+        """
+        with _active_lock:
+            _active[self.id] = self
+        thread = threading.Thread(target=self._worker, name=f"ocr-stream-{self.id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield format_event('started', {'stream_id': self.id})
+            while True:
+                try:
+                    item = self._events.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield format_event(*item)
+        finally:
+            # GeneratorExit saat client putus: hentikan OCR di checkpoint berikutnya
+            self.cancel_event.set()
+            with _active_lock:
+                _active.pop(self.id, None)
@@ -0,0 +1,123 @@
+"""
+Resolution - Kebijakan resolusi untuk deteksi text CRAFT
+
+Tinggi huruf diukur dari connected component gambar (fallback: perkiraan
+dari ukuran kartu), lalu dipilih skala deteksi supaya huruf berukuran sekitar
+RESOLUTION_CONFIG['detect_text_height'] px. Foto ponsel besar dideteksi di
+salinan yang diperkecil, kartu kecil tidak lagi diperbesar tanpa alasan.
+Box hasil deteksi dikembalikan ke koordinat gambar penuh, sehingga rekognisi
+tetap memakai crop resolusi penuh.
+"""
+import logging
+
+from config import OCR_CONFIG, RESOLUTION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_text_height(gray):
+    """
+    Perkirakan tinggi huruf (pixel) di gambar grayscale
+
+    Args:
+        gray (numpy.ndarray): Gambar grayscale
+
+    Returns:
+        float: Median tinggi komponen mirip huruf, atau perkiraan dari
+               sisi pendek gambar jika komponen terlalu sedikit
+    """
+    import cv2
+    import numpy as np
+
+    height, width = gray.shape[:2]
+    factor = min(1.0, RESOLUTION_CONFIG['estimate_max_side'] / max(height, width))
+    work = gray if factor == 1.0 else cv2.resize(
+        gray, (max(1, int(width * factor)), max(1, int(height * factor))), interpolation=cv2.INTER_AREA)
+
+    binary = cv2.adaptiveThreshold(work, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                   cv2.THRESH_BINARY_INV, 31, 15)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    w, h = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT]
+    area = stats[1:, cv2.CC_STAT_AREA]
+    glyph = (h >= 4) & (h <= work.shape[0] * 0.2) & (w <= h * 1.5) & (w >= h * 0.15) & (area >= 8)
+    if int(glyph.sum()) >= 10:
+        return float(np.median(h[glyph])) / factor
+    return min(height, width) * RESOLUTION_CONFIG['card_text_ratio']
+
+
+def detection_scale(gray, text_height=None):
+    """
+    Skala deteksi untuk gambar ini
+
+    Args:
+        gray (numpy.ndarray): Gambar grayscale
+        text_height (float, optional): Tinggi huruf yang sudah diukur
+            (mis. saat preprocessing); default diukur dari gray
+
+    Returns:
+        tuple: (skala, tinggi huruf terukur)
+    """
+    if text_height is None:
+        text_height = estimate_text_height(gray)
+    scale = RESOLUTION_CONFIG['detect_text_height'] / max(text_height, 1.0)
+    scale = min(RESOLUTION_CONFIG['max_detect_scale'], max(RESOLUTION_CONFIG['min_detect_scale'], scale))
+    return scale, text_height
+
+
+def upscale_factor(gray, text_height=None):
+    """Faktor upscale preprocessing: >1 hanya jika huruf lebih kecil dari min_text_height"""
+    if text_height is None:
+        text_height = estimate_text_height(gray)
+    if text_height >= RESOLUTION_CONFIG['min_text_height']:
+        return 1.0
+    return min(RESOLUTION_CONFIG['max_upscale'], RESOLUTION_CONFIG['min_text_height'] / max(text_height, 1.0))
+
+
+def detect_kwargs(shape, scale):
+    """canvas_size/mag_ratio untuk reader.detect/readtext supaya CRAFT memakai skala ini"""
+    return {'canvas_size': int(max(shape[:2]) * scale) + 1, 'mag_ratio': scale}
+
+
+def downscale(image, scale):
+    """Salinan gambar yang diperkecil (INTER_AREA) untuk deteksi"""
+    import cv2
+
+    height, width = image.shape[:2]
+    return cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+def scale_boxes(horizontal_list, free_list, scale):
+    """Kembalikan box deteksi dari gambar berskala ke koordinat gambar penuh"""
+    if scale == 1.0:
+        return horizontal_list, free_list
+    horizontal = [[int(round(v / scale)) for v in box] for box in horizontal_list]
+    free = [[[x / scale, y / scale] for x, y in box] for box in free_list]
+    return horizontal, free
+
+
+def detect(reader, image, grey, scale=None):
+    """
+    reader.detect satu gambar dengan kebijakan resolusi
+
+    Args:
+        reader (easyocr.Reader): Reader yang sedang dipinjam
+        image (numpy.ndarray): Gambar hasil easyocr reformat_input
+        grey (numpy.ndarray): Versi grayscale (untuk mengukur tinggi huruf)
+        scale (float, optional): Skala deteksi (default detection_scale(grey))
+
+    Returns:
+        tuple: (horizontal_list, free_list) dalam koordinat gambar penuh
+    """
+    if scale is None:
+        scale, text_height = detection_scale(grey)
+        logger.debug(f"Tinggi huruf ~{text_height:.0f}px, skala deteksi {scale:.2f}")
+    common = dict(width_ths=OCR_CONFIG['width_ths'], height_ths=OCR_CONFIG['height_ths'], reformat=False)
+    if scale < 1.0 and RESOLUTION_CONFIG['detect_on_downscaled']:
+        small = downscale(image, scale)
+        # min_size easyocr berlaku di koordinat gambar yang dideteksi
+        horizontal, free = reader.detect(small, canvas_size=max(small.shape[:2]) + 1, mag_ratio=1.0,
+                                         min_size=max(1, int(20 * scale)), **common)
+        return scale_boxes(horizontal[0], free[0], scale)
+    horizontal, free = reader.detect(image, **detect_kwargs(image.shape, scale), **common)
+    return horizontal[0], free[0]
@@ -0,0 +1,160 @@
+"""
+Result Cache - Cache hasil OCR berdasarkan hash isi gambar
+
+Dua tingkat: LRU di memori per proses, di belakangnya file JSON di disk
+yang dibagi antar proses (web, worker job, batch) dengan eviction
+berdasarkan total ukuran. Key = sha256 gambar + fingerprint (versi pipeline,
+key OCR_CONFIG yang mempengaruhi hasil, engine, RESOLUTION_CONFIG,
+KTP_TEMPLATE_CONFIG), sehingga perubahan konfigurasi atau kode OCR otomatis
+membuat cache lama tidak terpakai.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+
+from config import CACHE_CONFIG, ENGINE_CONFIG, KTP_TEMPLATE_CONFIG, OCR_CONFIG, RESOLUTION_CONFIG
+from utils.upload_utils import write_file_atomic
+from .ocr_result import OCRResult
+
+
+# Naikkan setiap kali kode preprocessing / deteksi / rekognisi berubah
+# sehingga hasil yang sudah tersimpan tidak lagi sama dengan hasil baru
+PIPELINE_VERSION = 3
+
+
+# Key OCR_CONFIG yang mengubah hasil OCR; path, flag simpan file, ukuran pool
+# dan warmup sengaja tidak ikut supaya mengubahnya tidak membuang semua cache
+OCR_RESULT_KEYS = ('languages', 'gpu', 'quantize', 'detail', 'paragraph', 'width_ths', 'height_ths',
+                   'auto_rotate', 'enhance_text', 'recognition_variants')
+
+
+def config_fingerprint(config=None):
+    """Hash pendek dari versi pipeline + konfigurasi yang mempengaruhi hasil OCR"""
+    if config is None:
+        config = {
+            'pipeline': PIPELINE_VERSION,
+            'ocr': {key: OCR_CONFIG.get(key) for key in OCR_RESULT_KEYS},
+            'engine': ENGINE_CONFIG['engine'],
+            'resolution': RESOLUTION_CONFIG,
+            'template': KTP_TEMPLATE_CONFIG,
+        }
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    def __init__(self, memory_items=None, disk_dir=None, disk_max_mb=None):
+        self.logger = logging.getLogger(__name__)
+        self.memory_items = memory_items or CACHE_CONFIG['memory_items']
+        self.disk_dir = Path(disk_dir or CACHE_CONFIG['disk_dir'])
+        self.disk_max_bytes = (disk_max_mb or CACHE_CONFIG['disk_max_mb']) * 1024 * 1024
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = config_fingerprint()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Perkiraan ukuran disk; direktori hanya di-scan ulang saat melewati batas
+        self._disk_bytes = self._disk_entries()[1]
+
+    def key_for(self, digest):
+        return f"{digest}-{self.fingerprint}"
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{key}.json"
+
+    def get(self, digest, source_name=None):
+        """
+        Ambil hasil OCR yang pernah dihitung untuk gambar ini
+
+        Args:
+            digest (str): sha256 isi gambar
+            source_name (str, optional): Nama file submission sekarang
+
+        Returns:
+            OCRResult: Salinan hasil (cache_hit=True), atau None jika belum ada
+        """
+        key = self.key_for(digest)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+
+        if data is None:
+            path = self._disk_path(key)
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                os.utime(path)  # tandai baru dipakai untuk eviction
+            except (FileNotFoundError, ValueError):
+                return None
+            self._remember(key, data)
+
+        result = replace(OCRResult.from_dict(data), cache_hit=True)
+        if source_name:
+            result.source_name = source_name
+        return result
+
+    def put(self, digest, result):
+        """Simpan hasil OCR ke memori dan disk"""
+        key = self.key_for(digest)
+        data = result.to_dict()
+        self._remember(key, data)
+        try:
+            payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            write_file_atomic(payload, self._disk_path(key))
+            self._disk_bytes += len(payload)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+        except OSError as e:
+            self.logger.warning(f"Gagal menulis cache hasil: {str(e)}")
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        """Return (list (mtime, size, path), total bytes) file cache di disk"""
+        entries = []
+        total = 0
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        return entries, total
+
+    def _evict_disk(self):
+        """Hapus file cache paling lama dipakai sampai total di bawah batas"""
+        entries, total = self._disk_entries()
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._disk_bytes = total
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """ResultCache bersama untuk proses ini, atau None jika dimatikan"""
+    global _result_cache
+    if not CACHE_CONFIG['enabled']:
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
@@ -0,0 +1,332 @@
+"""
+Supervisor - OCR di proses worker terpisah dengan deadline per gambar
+
+Setiap worker adalah proses (spawn) yang memuat OCRProcessor sendiri dan
+menerima gambar lewat Pipe. Di setiap checkpoint tahap (loaded,
+preprocessed, detected, token, ...) worker mengecek pesan pembatalan dari
+supervisor, sehingga deadline/cancel biasanya berhenti dengan rapi. Jika
+worker tidak merespons dalam masa tenggang (mis. macet di Hough/CRAFT) atau
+crash di kode native, proses dibunuh dan dijalankan ulang; pemanggil
+mendapat OCRTimeout / OCRWorkerCrashed, bukan thread yang tergantung.
+"""
+import atexit
+import itertools
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from pathlib import Path
+
+from config import SUPERVISOR_CONFIG
+from utils.content_store import content_digest
+from utils import resources
+from utils.metrics import counter, stage_timer
+from .ocr_processor import OCRCancelled, OCRTimeout
+from .ocr_result import OCRResult
+from .result_cache import get_result_cache
+
+WORKER_TIMEOUTS = counter(
+    "ocr_supervisor_timeouts_total", "Gambar yang melewati deadline di worker supervisor")
+WORKER_CRASHES = counter(
+    "ocr_supervisor_crashes_total", "Worker supervisor yang mati saat memproses gambar")
+WORKER_RESTARTS = counter(
+    "ocr_supervisor_restarts_total", "Worker supervisor yang dibunuh/dijalankan ulang")
+
+
+class OCRWorkerCrashed(Exception):
+    """Proses worker OCR mati saat memproses gambar"""
+
+
+def _worker_main(conn, resource_plan, index):
+    """Loop proses worker: terima task, kirim progress/hasil lewat Pipe"""
+    from .ocr_processor import OCRProcessor
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    resources.apply_worker(resource_plan, index)
+    # Cache hasil ditangani supervisor di proses induk
+    ocr = OCRProcessor(result_cache=False, batching=False)
+    ocr.warmup()
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message[0] == "stop":
+            return
+        if message[0] != "task":
+            continue  # pesan cancel untuk task yang sudah selesai
+        _, task_id, data, source_name, save_files, want_progress = message
+
+        def checkpoint(stage, payload):
+            while conn.poll():
+                pending = conn.recv()
+                if pending[0] == "cancel" and pending[1] == task_id:
+                    raise OCRCancelled(task_id)
+            if want_progress:
+                conn.send(("progress", task_id, stage, payload))
+
+        try:
+            result = ocr.process_bytes(data, source_name, save_files=save_files, progress=checkpoint)
+            conn.send(("result", task_id, result.to_dict() if result is not None else None))
+        except OCRCancelled:
+            conn.send(("cancelled", task_id))
+        except Exception as e:
+            conn.send(("error", task_id, str(e)))
+
+
+class _Worker:
+    def __init__(self, context, resource_plan, index):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, resource_plan, index),
+                                       name="ocr-supervised", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self, timeout):
+        """Tunggu worker selesai memuat model (tidak dihitung ke deadline gambar)"""
+        if self.ready:
+            return True
+        if self.conn.poll(timeout):
+            try:
+                self.ready = self.conn.recv()[0] == "ready"
+            except EOFError:
+                return False
+        return self.ready
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class OCRSupervisor:
+    """
+    Pengganti OCRProcessor (process_bytes/process_image) yang menjalankan
+    OCR di proses worker terawasi
+
+    Args:
+        workers (int, optional): Jumlah proses worker
+        deadline (float, optional): Deadline default per gambar (detik)
+        result_cache (ResultCache, optional): Default cache bersama proses
+    """
+
+    def __init__(self, workers=None, deadline=None, result_cache=None):
+        self.logger = logging.getLogger(__name__)
+        # Rencana dibuat saat start (setelah fork worker prefork menerima jatahnya)
+        self._requested_workers = workers or SUPERVISOR_CONFIG['workers']
+        self.resource_plan = None
+        self.workers = None
+        self.deadline = deadline or SUPERVISOR_CONFIG['deadline']
+        self.result_cache = result_cache or get_result_cache()
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count(1)
+        self._started = False
+
+    def start(self):
+        """Jalankan semua proses worker (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self.resource_plan = resources.child_plan(self._requested_workers)
+            self.workers = self.resource_plan.workers
+            for index in range(self.workers):
+                self._add_worker(index)
+            self._started = True
+            atexit.register(self.shutdown)
+        self.logger.info(f"{self.workers} worker OCR terawasi dijalankan")
+
+    def _add_worker(self, index):
+        worker = _Worker(self._context, self.resource_plan, index)
+        self._all.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker):
+        """Bunuh worker yang macet/mati lalu jalankan pengganti"""
+        WORKER_RESTARTS.inc()
+        worker.kill()
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            self._add_worker(worker.index)
+
+    def warmup(self):
+        """Jalankan worker dan tunggu semuanya siap"""
+        self.start()
+        with self._lock:
+            workers = list(self._all)
+        return all(w.wait_ready(SUPERVISOR_CONFIG['startup_timeout']) for w in workers)
+
+    def reader_status(self):
+        """Status worker untuk endpoint readiness (format sama dengan ReaderPool.status)"""
+        with self._lock:
+            workers = list(self._all)
+        ready = sum(1 for w in workers if w.ready)
+        return {
+            'size': len(workers),
+            'in_use': len(workers) - self._idle.qsize(),
+            'loaded': self._started and ready == len(workers),
+            'warm': self._started and ready == len(workers),
+            'error': None,
+        }
+
+    def process_image(self, image_path, save_files=None, source_name=None, progress=None,
+                      deadline=None):
+        """Sama seperti OCRProcessor.process_image, dijalankan di worker"""
+        image_path = Path(image_path)
+        try:
+            data = image_path.read_bytes()
+        except OSError as e:
+            self.logger.error(f"Gagal membaca {image_path}: {str(e)}")
+            return None
+        return self.process_bytes(data, source_name or image_path.name, save_files=save_files,
+                                  progress=progress, deadline=deadline)
+
+    def process_bytes(self, data, source_name, save_files=None, digest=None, timings=None,
+                      progress=None, deadline=None):
+        """
+        OCR satu gambar di proses worker
+
+        Args:
+            data (bytes): Isi file gambar
+            source_name (str): Nama file asli
+            save_files (bool, optional): Tulis file text/detail
+            digest (str, optional): sha256 data jika sudah dihitung
+            timings (dict, optional): Durasi tahap sebelumnya
+            progress (callable, optional): Menerima progress dari worker; boleh
+                raise OCRCancelled untuk membatalkan
+            deadline (float, optional): Deadline detik (default SUPERVISOR_CONFIG)
+
+        Returns:
+            OCRResult: Hasil, atau None jika OCR gagal
+
+        Raises:
+            OCRTimeout: Melewati deadline (worker dibunuh jika tidak merespons)
+            OCRCancelled: Dibatalkan lewat progress callback
+            OCRWorkerCrashed: Worker mati saat memproses gambar
+        """
+        timings = {} if timings is None else timings
+        if self.result_cache is not None:
+            with stage_timer('cache_lookup', timings):
+                digest = digest or content_digest(data)
+                cached = self.result_cache.get(digest, source_name)
+            if cached is not None:
+                cached.timings = timings
+                return cached
+
+        self.start()
+        deadline = deadline or self.deadline
+        try:
+            worker = self._idle.get(timeout=deadline)
+        except queue.Empty:
+            raise OCRTimeout(f"Tidak ada worker OCR kosong dalam {deadline}s")
+
+        try:
+            if not worker.wait_ready(SUPERVISOR_CONFIG['startup_timeout']):
+                self._replace(worker)
+                raise OCRWorkerCrashed("Worker OCR gagal dijalankan")
+            with stage_timer('supervised_ocr', timings):
+                data_dict = self._run(worker, data, source_name, save_files, progress, deadline)
+        finally:
+            if worker.process.is_alive():
+                self._idle.put(worker)
+
+        if data_dict is None:
+            return None
+        result = OCRResult.from_dict(data_dict)
+        result.timings = dict(timings, **data_dict.get('timings', {}))
+        if self.result_cache is not None:
+            self.result_cache.put(digest, result)
+        return result
+
+    def _run(self, worker, data, source_name, save_files, progress, deadline):
+        """Kirim task ke worker dan awasi sampai selesai / deadline / crash"""
+        task_id = next(self._task_ids)
+        worker.conn.send(("task", task_id, data, source_name, save_files, progress is not None))
+        deadline_at = time.monotonic() + deadline
+        cancel_error = None
+        cancel_sent_at = None
+
+        while True:
+            now = time.monotonic()
+            if cancel_sent_at is None and now > deadline_at:
+                WORKER_TIMEOUTS.inc()
+                cancel_error = OCRTimeout(f"OCR {source_name} melewati deadline {deadline}s")
+                worker.conn.send(("cancel", task_id))
+                cancel_sent_at = now
+            if cancel_sent_at is not None and now - cancel_sent_at > SUPERVISOR_CONFIG['cancel_grace']:
+                # Worker tidak sampai ke checkpoint berikutnya: bunuh
+                self.logger.warning(f"Worker OCR tidak merespons pembatalan ({source_name}), dibunuh")
+                self._replace(worker)
+                raise cancel_error
+
+            if not worker.conn.poll(0.2):
+                if not worker.process.is_alive():
+                    WORKER_CRASHES.inc()
+                    self._replace(worker)
+                    raise OCRWorkerCrashed(f"Worker OCR mati saat memproses {source_name}")
+                continue
+            try:
+                message = worker.conn.recv()
+            except EOFError:
+                WORKER_CRASHES.inc()
+                self._replace(worker)
+                raise OCRWorkerCrashed(f"Worker OCR mati saat memproses {source_name}")
+
+            kind = message[0]
+            if len(message) < 2 or message[1] != task_id:
+                continue
+            if kind == "progress":
+                if cancel_sent_at is not None:
+                    continue
+                try:
+                    progress(message[2], message[3])
+                except OCRCancelled as e:
+                    cancel_error = e
+                    worker.conn.send(("cancel", task_id))
+                    cancel_sent_at = time.monotonic()
+            elif kind == "result":
+                if cancel_error is not None:
+                    raise cancel_error
+                return message[2]
+            elif kind == "cancelled":
+                raise cancel_error or OCRCancelled(source_name)
+            elif kind == "error":
+                self.logger.error(f"Error OCR di worker ({source_name}): {message[2]}")
+                return None
+
+    def shutdown(self):
+        """Hentikan semua worker"""
+        with self._lock:
+            workers, self._all = self._all, []
+            self._started = False
+        for worker in workers:
+            try:
+                worker.conn.send(("stop", None))
+            except (OSError, ValueError):
+                pass
+        for worker in workers:
+            worker.process.join(timeout=5)
+            worker.kill()
+
+
+def create_ocr_processor(batching=None):
+    """
+    OCRProcessor biasa, atau OCRSupervisor jika SUPERVISOR_CONFIG['enabled']
+
+    Args:
+        batching (bool, optional): Diteruskan ke OCRProcessor (mode in-process)
+    """
+    if SUPERVISOR_CONFIG['enabled']:
+        return OCRSupervisor()
+    from .ocr_processor import OCRProcessor
+    return OCRProcessor(batching=batching)
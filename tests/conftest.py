@@ -0,0 +1,8 @@
+"""
+Konfigurasi pytest - root repo di sys.path supaya `config`, `src` dan `utils`
+bisa diimport seperti saat aplikasi dijalankan dari root
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
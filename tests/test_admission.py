@@ -0,0 +1,90 @@
+"""
+Test admission control: slot, antrian terbatas, timeout dan Retry-After
+"""
+import threading
+import time
+
+import pytest
+
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("kondisi tidak tercapai")
+        time.sleep(0.005)
+
+
+def test_admits_up_to_max_concurrent():
+    controller = AdmissionController(max_concurrent=2, max_queue=0, queue_timeout=1, retry_after=1)
+    first, second = controller.admit(), controller.admit()
+    assert controller.active == 2
+
+    with pytest.raises(AdmissionRejected):
+        controller.admit()
+
+    first.release()
+    first.release()  # idempotent
+    assert controller.active == 1
+    second.release()
+    assert controller.active == 0
+
+
+def test_waiting_request_gets_released_slot():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5, retry_after=1)
+    ticket = controller.admit()
+    admitted = threading.Event()
+
+    def waiter():
+        with controller.admit():
+            admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    _wait_until(lambda: controller.waiting == 1)
+    assert not admitted.is_set()
+
+    ticket.release()
+    thread.join(timeout=2)
+    assert admitted.is_set()
+    assert controller.active == 0
+    assert controller.waiting == 0
+
+
+def test_rejects_when_queue_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5, retry_after=3)
+    ticket = controller.admit()
+    thread = threading.Thread(target=lambda: controller.admit().release())
+    thread.start()
+    _wait_until(lambda: controller.waiting == 1)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit()
+    assert rejected.value.retry_after == 3
+
+    ticket.release()
+    thread.join(timeout=2)
+
+
+def test_rejects_after_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05, retry_after=1)
+    ticket = controller.admit()
+
+    with pytest.raises(AdmissionRejected):
+        controller.admit()
+    assert controller.waiting == 0
+    ticket.release()
+
+
+def test_retry_after_follows_service_time():
+    controller = AdmissionController(max_concurrent=2, max_queue=4, queue_timeout=1, retry_after=1)
+    assert controller.retry_after() == 1
+
+    controller._service_avg = 10.0
+    controller.waiting = 3
+    # 10 detik x (3 menunggu + 1) / 2 slot
+    assert controller.retry_after() == 20
+    controller.waiting = 0
+    assert controller.retry_after() == 5
@@ -0,0 +1,74 @@
+"""
+Test export: parse_time, filter baris dan format CSV / JSON Lines
+"""
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from utils.export_utils import iter_csv, iter_filtered_rows, iter_jsonl, parse_time
+
+ROWS = [
+    {"Timestamp": "2026-01-01 08:00:00", "Source File": "a.jpg", "nik": "3201010101010001", "nama": "BUDI"},
+    {"Timestamp": datetime(2026, 1, 2, 12, 30), "Source File": "b.jpg", "nik": "3301010101010002", "nama": "SITI"},
+    {"Timestamp": date(2026, 1, 3), "Source File": "a.jpg", "nik": "3201010101010003", "nama": "ANI"},
+    {"Timestamp": "bukan waktu", "Source File": "c.jpg", "nik": "3201010101010004", "nama": "DEDI"},
+]
+
+
+def _names(rows):
+    return [row["nama"] for row in rows]
+
+
+def test_parse_time_date_and_iso():
+    assert parse_time("2026-01-02") == datetime(2026, 1, 2)
+    assert parse_time(" 2026-01-02T08:30 ") == datetime(2026, 1, 2, 8, 30)
+    assert parse_time("2026-01-02T08:30:15") == datetime(2026, 1, 2, 8, 30, 15)
+
+
+def test_parse_time_empty():
+    assert parse_time(None) is None
+    assert parse_time("") is None
+
+
+@pytest.mark.parametrize("value, aware", [
+    ("2026-01-02T08:00:00+07:00", datetime(2026, 1, 2, 8, tzinfo=timezone(timedelta(hours=7)))),
+    ("2026-01-02T01:00:00Z", datetime(2026, 1, 2, 1, tzinfo=timezone.utc)),
+])
+def test_parse_time_with_zone_becomes_naive_local(value, aware):
+    parsed = parse_time(value)
+    assert parsed.tzinfo is None
+    assert parsed == aware.astimezone().replace(tzinfo=None)
+
+
+def test_parse_time_invalid():
+    with pytest.raises(ValueError):
+        parse_time("02/01/2026")
+
+
+def test_filter_without_arguments_keeps_all_rows():
+    assert _names(iter_filtered_rows(rows=ROWS)) == ["BUDI", "SITI", "ANI", "DEDI"]
+
+
+def test_filter_time_range_skips_unparseable_timestamps():
+    rows = iter_filtered_rows(since=datetime(2026, 1, 2), until=datetime(2026, 1, 3), rows=ROWS)
+    assert _names(rows) == ["SITI"]
+    rows = iter_filtered_rows(since=datetime(2026, 1, 1, 8), rows=ROWS)
+    assert _names(rows) == ["BUDI", "SITI", "ANI"]
+
+
+def test_filter_nik_prefix_and_source():
+    assert _names(iter_filtered_rows(nik_prefix="32", rows=ROWS)) == ["BUDI", "ANI", "DEDI"]
+    assert _names(iter_filtered_rows(source="a.jpg", rows=ROWS)) == ["BUDI", "ANI"]
+    assert _names(iter_filtered_rows(nik_prefix="32", source="c.jpg", rows=ROWS)) == ["DEDI"]
+
+
+def test_csv_and_jsonl_output():
+    lines = list(iter_csv(ROWS[1:2]))
+    assert lines[0].startswith("Timestamp,Source File,nik,nama,")
+    assert lines[1].startswith("2026-01-02 12:30:00,b.jpg,3301010101010002,SITI,")
+
+    record = json.loads(next(iter_jsonl(ROWS[1:2])))
+    assert record["Timestamp"] == "2026-01-02 12:30:00"
+    assert record["nama"] == "SITI"
+    assert record["agama"] == ""
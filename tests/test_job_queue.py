@@ -0,0 +1,141 @@
+"""
+Test antrian job SQLite: klaim, lease, requeue, kepemilikan worker, pembatalan
+"""
+import pytest
+
+from config import JOB_CONFIG
+from src.job_queue import (
+    STATUS_CANCELLED, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, JobQueue,
+)
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def expire_leases(monkeypatch):
+    """Semua job 'running' dianggap lease-nya habis pada klaim berikutnya"""
+    monkeypatch.setitem(JOB_CONFIG, 'lease_timeout', -1)
+
+
+def test_claim_oldest_job_once(job_queue):
+    first = job_queue.submit("/tmp/a.png", "a.png")
+    second = job_queue.submit("/tmp/b.png", "b.png")
+
+    assert job_queue.claim("w1")['id'] == first
+    assert job_queue.claim("w2")['id'] == second
+    assert job_queue.claim("w3") is None
+    job = job_queue.get(first)
+    assert job['status'] == STATUS_RUNNING
+    assert job['worker'] == "w1"
+    assert job['attempts'] == 1
+
+
+def test_complete_stores_result(job_queue):
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.claim("w1")
+
+    assert job_queue.complete(job_id, {'fields': {'NIK': "1234"}}, "w1")
+    job = job_queue.get(job_id)
+    assert job['status'] == STATUS_DONE
+    assert job['result'] == {'fields': {'NIK': "1234"}}
+
+
+def test_expired_lease_is_requeued_and_reclaimed(job_queue, expire_leases):
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.claim("w1")
+
+    job = job_queue.claim("w2")
+    assert job['id'] == job_id
+    stored = job_queue.get(job_id)
+    assert stored['worker'] == "w2"
+    assert stored['attempts'] == 2
+
+
+def test_expired_lease_fails_after_max_attempts(job_queue, expire_leases, monkeypatch):
+    monkeypatch.setitem(JOB_CONFIG, 'max_attempts', 1)
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.claim("w1")
+
+    assert job_queue.claim("w2") is None
+    assert job_queue.get(job_id)['status'] == STATUS_FAILED
+
+
+def test_stale_worker_cannot_overwrite_new_owner(job_queue, expire_leases):
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.claim("w1")
+    job_queue.claim("w2")
+
+    assert not job_queue.complete(job_id, {'stale': True}, "w1")
+    assert not job_queue.fail(job_id, "stale error", "w1")
+    assert job_queue.get(job_id)['status'] == STATUS_RUNNING
+
+    assert job_queue.complete(job_id, {'ok': True}, "w2")
+    job = job_queue.get(job_id)
+    assert job['status'] == STATUS_DONE
+    assert job['result'] == {'ok': True}
+    assert job['error'] is None
+
+
+def test_fail_retries_until_max_attempts(job_queue, monkeypatch):
+    monkeypatch.setitem(JOB_CONFIG, 'max_attempts', 2)
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+
+    job_queue.claim("w1")
+    assert job_queue.fail(job_id, "error 1", "w1")
+    assert job_queue.get(job_id)['status'] == STATUS_QUEUED
+
+    job_queue.claim("w1")
+    assert job_queue.fail(job_id, "error 2", "w1")
+    job = job_queue.get(job_id)
+    assert job['status'] == STATUS_FAILED
+    assert job['error'] == "error 2"
+
+
+def test_fail_without_retry(job_queue):
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.claim("w1")
+
+    assert job_queue.fail(job_id, "deadline", "w1", retry=False)
+    assert job_queue.get(job_id)['status'] == STATUS_FAILED
+
+
+def test_cancelled_job_is_not_completed(job_queue):
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.claim("w1")
+
+    assert job_queue.cancel(job_id)
+    assert job_queue.is_cancelled(job_id)
+    assert not job_queue.complete(job_id, {}, "w1")
+    assert job_queue.get(job_id)['status'] == STATUS_CANCELLED
+    assert not job_queue.cancel(job_id)
+
+
+def test_cancel_checker_throttles_queries(job_queue, monkeypatch):
+    job_id = job_queue.submit("/tmp/a.png", "a.png")
+    queries = []
+    is_cancelled = job_queue.is_cancelled
+    monkeypatch.setattr(job_queue, 'is_cancelled', lambda j: queries.append(j) or is_cancelled(j))
+    now = [100.0]
+    monkeypatch.setattr("src.job_queue.time.monotonic", lambda: now[0])
+
+    check = job_queue.cancel_checker(job_id, interval=1.0)
+    assert not any(check() for _ in range(50))
+    assert len(queries) == 1
+
+    job_queue.cancel(job_id)
+    assert not check()
+    now[0] += 1.0
+    assert check()
+    assert check()
+    assert len(queries) == 2
+
+
+def test_counts(job_queue):
+    job_queue.submit("/tmp/a.png", "a.png")
+    job_queue.submit("/tmp/b.png", "b.png")
+    job_queue.claim("w1")
+
+    assert job_queue.counts() == {STATUS_QUEUED: 1, STATUS_RUNNING: 1}
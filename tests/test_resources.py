@@ -0,0 +1,74 @@
+"""
+Test rencana pembagian CPU: plan, kalibrasi, irisan core dan child_plan
+"""
+import json
+
+import pytest
+
+from config import RESOURCE_CONFIG
+from utils import resources
+
+
+@pytest.fixture
+def machine(monkeypatch, tmp_path):
+    """Mesin 16 CPU tanpa override config / kalibrasi, jatah proses belum diterapkan"""
+    monkeypatch.setattr(resources, "available_cpus", lambda: list(range(16)))
+    monkeypatch.setattr(resources, "_budget", None)
+    for key in ('workers', 'threads_per_worker'):
+        monkeypatch.setitem(RESOURCE_CONFIG, key, None)
+    monkeypatch.setitem(RESOURCE_CONFIG, 'pin_cpus', False)
+    monkeypatch.setitem(RESOURCE_CONFIG, 'calibration_file', tmp_path / "resources.json")
+    monkeypatch.setenv("OMP_NUM_THREADS", "1")
+    return tmp_path / "resources.json"
+
+
+def test_plan_heuristic(machine):
+    current = resources.plan()
+    assert (current.workers, current.threads_per_worker, current.source) == (4, 4, "heuristik")
+
+
+def test_plan_arguments_and_config(machine, monkeypatch):
+    current = resources.plan(workers=2)
+    assert (current.workers, current.threads_per_worker, current.source) == (2, 8, "argumen")
+
+    monkeypatch.setitem(RESOURCE_CONFIG, 'workers', 8)
+    current = resources.plan()
+    assert (current.workers, current.threads_per_worker, current.source) == (8, 2, "config")
+
+
+def test_plan_uses_calibration_for_same_cpu_count(machine):
+    machine.write_text(json.dumps({'cpus': 16, 'workers': 2, 'threads_per_worker': 6}))
+    current = resources.plan()
+    assert (current.workers, current.threads_per_worker, current.source) == (2, 6, "kalibrasi")
+
+    machine.write_text(json.dumps({'cpus': 8, 'workers': 2, 'threads_per_worker': 6}))
+    assert resources.plan().source == "heuristik"
+
+
+def test_cpus_for_slices_and_wraps(machine):
+    current = resources.ResourcePlan(list(range(8)), workers=3, threads_per_worker=4)
+    assert current.cpus_for(0) == [0, 1, 2, 3]
+    assert current.cpus_for(1) == [4, 5, 6, 7]
+    assert current.cpus_for(2) == [0, 1, 2, 3]
+
+
+def test_child_plan_without_budget_matches_plan(machine):
+    assert resources.child_plan() == resources.plan()
+
+
+def test_child_plan_divides_process_budget(machine):
+    resources.apply_worker(resources.plan(), 1)
+    assert resources._budget == ([4, 5, 6, 7], 4)
+
+    current = resources.child_plan()
+    assert (current.cpus, current.workers, current.threads_per_worker) == ([4, 5, 6, 7], 1, 4)
+    assert current.source == "jatah proses"
+
+    # Worker yang diminta dibatasi jatah thread proses ini
+    current = resources.child_plan(workers=16)
+    assert (current.workers, current.threads_per_worker) == (4, 1)
+
+
+def test_candidate_splits():
+    assert resources.candidate_splits(8) == [(1, 8), (2, 4), (4, 2), (8, 1)]
+    assert resources.candidate_splits(6) == [(1, 6), (2, 3), (4, 1), (6, 1)]
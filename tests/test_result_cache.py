@@ -0,0 +1,54 @@
+"""
+Test cache hasil OCR dan content store: fingerprint konfigurasi, memori/disk, dedupe upload
+"""
+import pytest
+
+from config import OCR_CONFIG
+from src.ocr_result import OCRResult, OCRToken
+from src.result_cache import ResultCache, config_fingerprint
+from utils.content_store import ContentStore, content_digest
+
+
+@pytest.fixture
+def result():
+    return OCRResult(source_name="ktp.png", text="NIK 1234",
+                     tokens=[OCRToken("NIK", 0.9, [[0, 0], [1, 0], [1, 1], [0, 1]]), OCRToken("1234", 0.8)])
+
+
+def test_fingerprint_ignores_keys_that_do_not_change_output(monkeypatch):
+    before = config_fingerprint()
+    monkeypatch.setitem(OCR_CONFIG, 'save_text_files', not OCR_CONFIG.get('save_text_files'))
+    monkeypatch.setitem(OCR_CONFIG, 'some_new_runtime_option', 123)
+    assert config_fingerprint() == before
+
+    monkeypatch.setitem(OCR_CONFIG, 'languages', ['xx'])
+    assert config_fingerprint() != before
+
+
+def test_cache_roundtrip_through_disk(tmp_path, result):
+    ResultCache(memory_items=4, disk_dir=tmp_path, disk_max_mb=1).put("abc", result)
+
+    fresh = ResultCache(memory_items=4, disk_dir=tmp_path, disk_max_mb=1)
+    cached = fresh.get("abc", source_name="lain.png")
+    assert cached.cache_hit
+    assert cached.source_name == "lain.png"
+    assert cached.text == "NIK 1234"
+    assert cached.tokens == result.tokens
+    assert fresh.get("tidak-ada") is None
+
+
+def test_cache_memory_is_lru(tmp_path, result):
+    cache = ResultCache(memory_items=2, disk_dir=tmp_path, disk_max_mb=1)
+    for digest in ("a", "b", "c"):
+        cache.put(digest, result)
+    assert list(cache._memory) == [cache.key_for("b"), cache.key_for("c")]
+
+
+def test_content_store_dedupes_by_content(tmp_path):
+    store = ContentStore(tmp_path)
+    first = store.put(b"gambar", ".PNG")
+    assert first == f"{content_digest(b'gambar')}.png"
+    assert store.put(b"gambar", "png") == first
+    assert store.put(b"gambar lain", ".png") != first
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [first, f"{content_digest(b'gambar lain')}.png"])
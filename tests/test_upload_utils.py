@@ -0,0 +1,123 @@
+"""
+Test validasi upload: pengenalan header gambar, batas ukuran dan max_pixels
+"""
+import io
+import struct
+
+import pytest
+
+from config import UPLOAD_CONFIG
+from utils.upload_utils import UploadRejected, read_image_upload, sniff_image_header, write_file_atomic
+
+
+def _png(width, height):
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR"
+            + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00" + b"\x00" * 32)
+
+
+def _jpeg(width, height, padding=0):
+    """JPEG minimal; padding = byte segmen APP1 sebelum SOF (mis. EXIF besar)"""
+    data = b"\xff\xd8"
+    while padding > 0:
+        chunk = min(padding, 65000)
+        data += b"\xff\xe1" + struct.pack(">H", chunk + 2) + b"\x00" * chunk
+        padding -= chunk
+    return data + b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+
+
+def _bmp(width, height):
+    return b"BM" + b"\x00" * 16 + struct.pack("<ii", width, -height) + b"\x00" * 32
+
+
+def _webp_vp8x(width, height):
+    return (b"RIFF" + struct.pack("<I", 30) + b"WEBPVP8X" + struct.pack("<I", 10) + b"\x00" * 4
+            + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little"))
+
+
+@pytest.mark.parametrize("data, expected", [
+    (_png(640, 480), {'format': 'png', 'width': 640, 'height': 480}),
+    (_jpeg(1280, 800), {'format': 'jpeg', 'width': 1280, 'height': 800}),
+    (_bmp(300, 200), {'format': 'bmp', 'width': 300, 'height': 200}),
+    (_webp_vp8x(1000, 700), {'format': 'webp', 'width': 1000, 'height': 700}),
+])
+def test_sniff_known_formats(data, expected):
+    assert sniff_image_header(data) == expected
+
+
+def test_sniff_unknown_format():
+    assert sniff_image_header(b"GIF89a" + b"\x00" * 32) is None
+
+
+def test_sniff_jpeg_without_sof_has_no_dimensions():
+    info = sniff_image_header(_jpeg(100, 100, padding=1000)[:500])
+    assert info == {'format': 'jpeg', 'width': None, 'height': None}
+
+
+def test_read_accepts_valid_upload():
+    data = _png(640, 480)
+    body, info = read_image_upload(io.BytesIO(data), len(data))
+    assert body == data
+    assert info['format'] == 'png'
+
+
+def test_read_rejects_unsupported_format():
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(b"GIF89a" + b"\x00" * 32))
+    assert rejected.value.status == 415
+
+
+def test_read_rejects_declared_content_length(monkeypatch):
+    monkeypatch.setitem(UPLOAD_CONFIG, 'max_mb', 1)
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(_png(10, 10)), 2 * 1024 * 1024)
+    assert rejected.value.status == 413
+
+
+def test_read_rejects_body_over_limit(monkeypatch):
+    monkeypatch.setitem(UPLOAD_CONFIG, 'max_mb', 1)
+    data = _png(10, 10) + b"\x00" * (1024 * 1024)
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(data))
+    assert rejected.value.status == 413
+
+
+def test_read_rejects_too_many_pixels_from_header(monkeypatch):
+    monkeypatch.setitem(UPLOAD_CONFIG, 'max_pixels', 1000)
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(_png(100, 100)))
+    assert rejected.value.status == 413
+
+
+def test_read_checks_max_pixels_when_sof_is_past_header(monkeypatch):
+    monkeypatch.setitem(UPLOAD_CONFIG, 'header_bytes', 1024)
+    monkeypatch.setitem(UPLOAD_CONFIG, 'max_pixels', 1000)
+    data = _jpeg(100, 100, padding=4096)
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(data))
+    assert rejected.value.status == 413
+
+    monkeypatch.setitem(UPLOAD_CONFIG, 'max_pixels', 100 * 100)
+    _, info = read_image_upload(io.BytesIO(data))
+    assert (info['width'], info['height']) == (100, 100)
+
+
+def test_read_rejects_unreadable_dimensions(monkeypatch):
+    monkeypatch.setitem(UPLOAD_CONFIG, 'header_bytes', 64)
+    data = _jpeg(100, 100, padding=1000)[:-20]
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(data))
+    assert rejected.value.status == 400
+
+
+def test_read_rejects_zero_dimensions():
+    with pytest.raises(UploadRejected) as rejected:
+        read_image_upload(io.BytesIO(_png(0, 10)))
+    assert rejected.value.status == 400
+
+
+def test_write_file_atomic_leaves_no_temp_files(tmp_path):
+    target = tmp_path / "a.png"
+    write_file_atomic(b"first", target)
+    write_file_atomic(b"second", target)
+    assert target.read_bytes() == b"second"
+    assert [p.name for p in tmp_path.iterdir()] == ["a.png"]
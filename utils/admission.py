@@ -0,0 +1,150 @@
+"""
+Admission control - Batasi jumlah OCR yang berjalan bersamaan di proses web
+
+Request yang tidak kebagian slot menunggu di antrian terbatas (dengan
+timeout); jika antrian penuh atau timeout habis, request ditolak dengan
+AdmissionRejected (503 + Retry-After di main.py). Waktu tunggu di antrian
+dan waktu layanan dicatat di histogram terpisah. Jumlah slot default diambil
+dari rencana CPU proses ini (utils/resources.py).
+"""
+import math
+import threading
+import time
+
+from config import ADMISSION_CONFIG, BATCHING_CONFIG
+from utils import resources
+from utils.metrics import counter, gauge, histogram
+
+QUEUE_WAIT = histogram(
+    "ocr_admission_queue_wait_seconds", "Waktu request menunggu slot OCR")
+SERVICE_TIME = histogram(
+    "ocr_admission_service_seconds", "Waktu request memegang slot OCR")
+REJECTED = counter(
+    "ocr_admission_rejected_total", "Request OCR yang ditolak admission control", ("reason",))
+
+
+class AdmissionRejected(Exception):
+    """Server sibuk: antrian penuh atau waktu tunggu habis"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """Slot yang sedang dipegang; release() idempotent, bisa dipakai sebagai context manager"""
+
+    def __init__(self, controller):
+        self._controller = controller
+        self._start = time.perf_counter()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.perf_counter() - self._start)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def default_max_concurrent():
+    """Slot OCR dari rencana CPU proses ini (x max_batch jika batching aktif)"""
+    slots = resources.child_plan().workers
+    return slots * (BATCHING_CONFIG['max_batch'] if BATCHING_CONFIG['enabled'] else 1)
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent=None, max_queue=None, queue_timeout=None, retry_after=None):
+        self.max_concurrent = (max_concurrent or ADMISSION_CONFIG['max_concurrent']
+                               or default_max_concurrent())
+        self.max_queue = ADMISSION_CONFIG['max_queue'] if max_queue is None else max_queue
+        self.queue_timeout = queue_timeout or ADMISSION_CONFIG['queue_timeout']
+        self.min_retry_after = retry_after or ADMISSION_CONFIG['retry_after']
+        self.active = 0
+        self.waiting = 0
+        self._service_avg = None   # EWMA waktu layanan, untuk perkiraan Retry-After
+        self._cond = threading.Condition()
+
+    def admit(self):
+        """
+        Ambil satu slot OCR, menunggu di antrian jika semua slot terpakai
+
+        Returns:
+            _Ticket: Panggil release() (atau pakai 'with') setelah OCR selesai
+
+        Raises:
+            AdmissionRejected: Jika antrian penuh atau timeout habis
+        """
+        start = time.perf_counter()
+        with self._cond:
+            if self.active >= self.max_concurrent or self.waiting:
+                if self.waiting >= self.max_queue:
+                    REJECTED.inc(reason="queue_full")
+                    raise AdmissionRejected("Server sibuk, antrian OCR penuh", self.retry_after())
+                self.waiting += 1
+                try:
+                    deadline = start + self.queue_timeout
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            REJECTED.inc(reason="timeout")
+                            raise AdmissionRejected("Server sibuk, waktu tunggu OCR habis",
+                                                    self.retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+        QUEUE_WAIT.observe(time.perf_counter() - start)
+        return _Ticket(self)
+
+    def _release(self, service_time):
+        SERVICE_TIME.observe(service_time)
+        with self._cond:
+            self.active -= 1
+            if self._service_avg is None:
+                self._service_avg = service_time
+            else:
+                self._service_avg = 0.8 * self._service_avg + 0.2 * service_time
+            self._cond.notify()
+
+    def retry_after(self):
+        """Perkiraan detik sampai antrian sekarang habis (minimal ADMISSION_CONFIG['retry_after'])"""
+        if self._service_avg is None:
+            return self.min_retry_after
+        estimate = self._service_avg * (self.waiting + 1) / self.max_concurrent
+        return max(self.min_retry_after, math.ceil(estimate))
+
+
+class _NoAdmission:
+    """Pengganti saat admission control dimatikan"""
+
+    def admit(self):
+        return _Ticket(self)
+
+    def _release(self, service_time):
+        pass
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """AdmissionController bersama untuk proses ini"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            if ADMISSION_CONFIG['enabled']:
+                _controller = AdmissionController()
+                gauge("ocr_admission_active", "Slot OCR yang sedang dipakai",
+                      fn=lambda: _controller.active)
+                gauge("ocr_admission_waiting", "Request yang menunggu slot OCR",
+                      fn=lambda: _controller.waiting)
+            else:
+                _controller = _NoAdmission()
+        return _controller
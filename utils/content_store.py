@@ -0,0 +1,63 @@
+"""
+Content store - Simpan upload berdasarkan hash isinya (sha256)
+
+Upload dengan isi sama hanya disimpan sekali, dan dua upload berbeda yang
+kebetulan bernama sama (mis. ktp.png) tidak lagi saling menimpa.
+"""
+import hashlib
+import logging
+from pathlib import Path
+
+from config import UPLOAD_DIR
+from utils.upload_utils import persist_upload_async, write_file_atomic
+
+
+def content_digest(data):
+    """sha256 hex dari isi file"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ContentStore:
+    def __init__(self, root=None):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root or UPLOAD_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def name_for(digest, ext):
+        """Nama file di store, mis. '9f86d0...png'"""
+        ext = ext.lower() if ext.startswith('.') else f".{ext.lower()}"
+        return f"{digest}{ext}"
+
+    def path_for(self, name):
+        return self.root / name
+
+    def put(self, data, ext, digest=None, background=False):
+        """
+        Simpan isi file (dilewati jika hash yang sama sudah ada)
+
+        Args:
+            data (bytes): Isi file
+            ext (str): Ekstensi, mis. '.png'
+            digest (str, optional): sha256 yang sudah dihitung
+            background (bool): Tulis di background thread
+
+        Returns:
+            str: Nama file di store
+        """
+        name = self.name_for(digest or content_digest(data), ext)
+        path = self.path_for(name)
+        if path.exists():
+            self.logger.info(f"Upload sudah ada di store: {name}")
+            return name
+        if background:
+            persist_upload_async(data, path)
+            return name
+        try:
+            write_file_atomic(data, path)
+        except OSError:
+            # Store berbasis isi: jika request lain sudah menulis hash yang sama, hasilnya identik
+            if not path.exists():
+                raise
+            self.logger.info(f"Upload sudah ditulis request lain: {name}")
+        return name
@@ -1,12 +1,16 @@
 # utils/excel_utils.py
+import os
 import re
-import shutil
 import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from openpyxl import Workbook, load_workbook
+
+from utils.metrics import stage_timer
 
 OUTPUT_EXCEL = Path("assets/output/ocr_results.xlsx")
+LOCK_STALE_SECONDS = 120  # lock lebih tua dari ini dianggap sisa proses yang crash
 
 # Struktur kolom final
 HEADERS = [
@@ -22,6 +26,7 @@ HEADERS = [
 # -------------------------
 def _ensure_workbook():
     """Buat workbook baru jika belum ada, dan pastikan header sesuai."""
+    from openpyxl import Workbook, load_workbook   # import ditunda: tidak perlu saat startup
     if OUTPUT_EXCEL.exists():
         wb = load_workbook(OUTPUT_EXCEL)
         ws = wb.active
@@ -32,20 +37,88 @@ def _ensure_workbook():
         ws.append(HEADERS)
         return wb, ws
 
+@contextmanager
+def _workbook_lock(timeout: float = 60.0):
+    """
+    Lock berbasis file di samping workbook, supaya beberapa proses
+    (web + worker job) tidak saling menimpa saat menulis Excel.
+    """
+    lock_path = OUTPUT_EXCEL.with_suffix(".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > LOCK_STALE_SECONDS:
+                    lock_path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Workbook sedang dikunci: {lock_path}")
+            time.sleep(0.05)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        try:
+            lock_path.unlink()
+        except FileNotFoundError:
+            pass
+
+def iter_excel_rows(path: Path = None):
+    """
+    Baca baris data workbook satu per satu (mode read_only, memori tetap kecil).
+    Yield dict dengan key = HEADERS; baris kosong dilewati.
+    Workbook diganti lewat os.replace saat ditulis (lihat _save_wb_safely),
+    jadi file yang sedang dibaca tidak berubah di tengah jalan.
+    """
+    from openpyxl import load_workbook
+    path = path or OUTPUT_EXCEL
+    if not path.exists():
+        return
+    wb = load_workbook(path, read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h) if h is not None else "" for h in header]
+        for values in rows:
+            if not any(v not in (None, "") for v in values):
+                continue
+            yield {col: ("" if v is None else v) for col, v in zip(columns, values)}
+    finally:
+        wb.close()
+
 def _save_wb_safely(wb, target: Path):
-    """Simpan workbook ke tmp file lalu move untuk mengurangi permission error."""
-    tmp = Path(tempfile.gettempdir()) / f"ocr_results_tmp_{int(datetime.now().timestamp())}.xlsx"
-    wb.save(tmp)
+    """
+    Simpan workbook ke tmp file di direktori target lalu os.replace.
+    Satu filesystem, jadi penggantian atomik: pembaca (iter_excel_rows)
+    melihat workbook lama atau baru, tidak pernah setengah jadi.
+    Jika target terkunci (PermissionError), simpan ke nama alternatif.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f".{target.stem}_", suffix=target.suffix, dir=target.parent)
+    os.close(fd)
     try:
-        shutil.move(str(tmp), str(target))
-    except PermissionError:
-        i = 1
-        while True:
-            alt = target.with_name(f"{target.stem}_{i}{target.suffix}")
-            if not alt.exists():
-                shutil.move(str(tmp), str(alt))
-                return alt
-            i += 1
+        wb.save(tmp)
+        try:
+            os.replace(tmp, target)
+        except PermissionError:
+            i = 1
+            while True:
+                alt = target.with_name(f"{target.stem}_{i}{target.suffix}")
+                if not alt.exists():
+                    os.replace(tmp, alt)
+                    return alt
+                i += 1
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
     return target
 
 # -------------------------
@@ -436,13 +509,46 @@ def save_to_excel_structured(detail_path: Path, source_file: str):
     detail_path: path ke file *_detail.txt
     source_file: nama file gambar asli
     """
-    wb, ws = _ensure_workbook()
     tokens = _extract_tokens_from_detail(detail_path)
-    data = _parse_tokens_to_fields(tokens)
+    return save_fields_to_excel(_parse_tokens_to_fields(tokens), source_file)
+
+def save_result_to_excel(result, source_file: str = None):
+    """
+    Simpan OCRResult (src/ocr_result.py) ke Excel tanpa membaca file detail.
+    source_file: nama file gambar asli (default result.source_name)
+    """
+    return save_rows_to_excel([(result.fields, source_file or result.source_name)],
+                              timings=result.timings)
+
+def extract_ktp_fields(tokens):
+    """
+    Mapping token OCR (urut seperti hasil EasyOCR) ke kolom KTP.
+    Return dict dengan key = HEADERS[2:].
+    """
+    return _parse_tokens_to_fields(tokens)
 
-    row = [datetime.now().strftime("%Y-%m-%d %H:%M:%S"), source_file] \
-        + [data.get(h, "") for h in HEADERS[2:]]
+def save_fields_to_excel(data: dict, source_file: str):
+    """
+    Tambahkan satu baris field KTP ke Excel.
+    data: dict hasil extract_ktp_fields
+    source_file: nama file gambar asli
+    """
+    return save_rows_to_excel([(data, source_file)])
 
-    ws.append(row)
-    _save_wb_safely(wb, OUTPUT_EXCEL)
-    return OUTPUT_EXCEL
\ No newline at end of file
+def save_rows_to_excel(items, timings=None):
+    """
+    Tambahkan banyak baris sekaligus dengan satu kali load + save workbook.
+    items: iterable (data, source_file)
+    timings: dict opsional, diisi durasi 'excel_write'
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [
+        [timestamp, source_file] + [data.get(h, "") for h in HEADERS[2:]]
+        for data, source_file in items
+    ]
+
+    with stage_timer('excel_write', timings), _workbook_lock():
+        wb, ws = _ensure_workbook()
+        for row in rows:
+            ws.append(row)
+        return _save_wb_safely(wb, OUTPUT_EXCEL)
@@ -0,0 +1,121 @@
+"""
+Export - Hasil OCR dari workbook sebagai CSV / JSON Lines (streaming)
+
+Baris dibaca dan ditulis satu per satu lewat generator, jadi memori tetap
+datar berapapun jumlah baris di ocr_results.xlsx.
+"""
+import csv
+import json
+from datetime import date, datetime
+
+from utils.excel_utils import HEADERS, iter_excel_rows
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_time(value):
+    """
+    Parse filter waktu 'YYYY-MM-DD' atau ISO 'YYYY-MM-DDTHH:MM[:SS][+07:00|Z]'
+
+    Timestamp di Excel ditulis dalam waktu lokal tanpa zona, jadi waktu
+    dengan zona dikonversi ke waktu lokal lalu zonanya dibuang (naive
+    dan aware tidak bisa dibandingkan).
+
+    Returns:
+        datetime: Waktu lokal naive, atau None jika value kosong
+
+    Raises:
+        ValueError: Format waktu tidak dikenali
+    """
+    if not value:
+        return None
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Format waktu tidak valid: {value} (pakai YYYY-MM-DD atau YYYY-MM-DDTHH:MM:SS)")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _row_time(row):
+    value = row.get("Timestamp")
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    try:
+        return datetime.strptime(str(value), _TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def iter_filtered_rows(since=None, until=None, nik_prefix=None, source=None, rows=None):
+    """
+    Filter baris hasil OCR
+
+    Args:
+        since (datetime, optional): Timestamp >= since
+        until (datetime, optional): Timestamp < until
+        nik_prefix (str, optional): NIK diawali string ini
+        source (str, optional): Nama file sumber sama persis
+        rows (iterable, optional): Sumber baris (default iter_excel_rows())
+
+    Yields:
+        dict: Baris dengan key = HEADERS
+    """
+    rows = iter_excel_rows() if rows is None else rows
+    for row in rows:
+        if since is not None or until is not None:
+            timestamp = _row_time(row)
+            if timestamp is None:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                continue
+        if nik_prefix and not str(row.get("nik", "")).startswith(nik_prefix):
+            continue
+        if source and str(row.get("Source File", "")) != source:
+            continue
+        yield row
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.strftime(_TIMESTAMP_FORMAT)
+    return value
+
+
+class _LineBuffer:
+    """Target csv.writer yang mengembalikan baris, bukan menulisnya"""
+
+    def write(self, line):
+        return line
+
+
+def iter_csv(rows):
+    """Yield CSV (header lalu satu baris per item) sebagai string"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(HEADERS)
+    for row in rows:
+        yield writer.writerow([_cell(row.get(h, "")) for h in HEADERS])
+
+
+def iter_jsonl(rows):
+    """Yield JSON Lines (satu object per baris) sebagai string"""
+    for row in rows:
+        yield json.dumps({h: _cell(row.get(h, "")) for h in HEADERS}, ensure_ascii=False) + "\n"
+
+
+def iter_export(fmt, rows):
+    """Generator output sesuai format ('csv' atau 'jsonl')"""
+    return iter_csv(rows) if fmt == 'csv' else iter_jsonl(rows)
@@ -0,0 +1,233 @@
+"""
+Metrics - Counter, gauge, dan histogram sederhana dalam format teks Prometheus
+
+Metrik disimpan per proses; endpoint /metrics di main.py merender REGISTRY.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: label harus {self.labelnames}, dapat {tuple(labels)}")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        lines += self._samples()
+        return lines
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), fn=None):
+        super().__init__(name, help_text, labelnames)
+        self._fn = fn
+
+    def set_function(self, fn):
+        """Nilai gauge dihitung saat scrape (tanpa label)"""
+        self._fn = fn
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        if self._fn is not None:
+            try:
+                return [f"{self.name} {_format_value(self._fn())}"]
+            except Exception:
+                return []
+        return super()._samples()
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            for bound, n in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {n}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {repr(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help_text, labelnames=()):
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+
+def gauge(name, help_text, labelnames=(), fn=None):
+    return REGISTRY.register(Gauge(name, help_text, labelnames, fn))
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+
+# ----- Metrik pipeline OCR -----
+STAGE_DURATION = histogram(
+    "ocr_stage_duration_seconds", "Durasi setiap tahap pipeline OCR", ("stage",))
+STAGE_ERRORS = counter(
+    "ocr_stage_errors_total", "Jumlah exception per tahap pipeline OCR", ("stage",))
+REQUESTS = counter(
+    "ocr_http_requests_total", "Jumlah request HTTP per endpoint", ("endpoint",))
+REQUEST_DURATION = histogram(
+    "ocr_http_request_duration_seconds", "Durasi request HTTP per endpoint", ("endpoint",))
+INFLIGHT = gauge(
+    "ocr_inflight_requests", "Request OCR yang sedang diproses")
+STARTUP_DURATION = gauge(
+    "ocr_startup_seconds", "Durasi fase startup proses (import, create_app, reader_warmup)", ("phase",))
+
+
+@contextmanager
+def stage_timer(stage, timings=None):
+    """
+    Ukur satu tahap pipeline ke histogram STAGE_DURATION
+
+    Args:
+        stage (str): Nama tahap, mis. 'readtext'
+        timings (dict, optional): Diisi {stage: detik} untuk dilaporkan per request
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def track_request(endpoint):
+    """Decorator view: hitung request, durasi, dan gauge in-flight"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            REQUESTS.inc(endpoint=endpoint)
+            INFLIGHT.inc()
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                INFLIGHT.dec()
+                REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+        return wrapper
+    return decorator
+
+
+def render_metrics():
+    """Teks exposition format untuk endpoint /metrics"""
+    return REGISTRY.render()
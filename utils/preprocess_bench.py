@@ -0,0 +1,124 @@
+"""
+Preprocess bench - Bandingkan akurasi field dengan dan tanpa preprocessing
+
+Setiap mode menyalakan kombinasi OCR_CONFIG['auto_rotate'] dan
+OCR_CONFIG['enhance_text'], lalu meng-OCR semua gambar dengan reader yang
+sama. Laporan berisi latency per kartu, akurasi field dan sudut kemiringan
+yang diperkirakan (dengan --tilt kartu juga diputar dulu sekian derajat
+untuk memeriksa arah rotasi). Tanpa file kunci jawaban, akurasi dihitung
+terhadap mode 'mati' (gambar asli).
+
+Contoh:
+    python -m utils.preprocess_bench
+    python -m utils.preprocess_bench --images uploads --truth truth.json --tilt 8
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from config import INPUT_DIR, OCR_CONFIG, SUPPORTED_FORMATS
+from utils.quantize_bench import _field_accuracy, _percent
+
+# nama -> (auto_rotate, enhance_text)
+MODES = (("mati", (False, False)), ("rotasi", (True, False)),
+         ("enhance", (False, True)), ("keduanya", (True, True)))
+
+
+def load_images(paths, tilt=0.0):
+    """
+    Decode gambar (dan putar tilt derajat berlawanan arah jarum jam)
+
+    Returns:
+        dict: {nama_file: numpy.ndarray RGB}
+    """
+    from src.image_handler import ImageHandler
+
+    handler = ImageHandler()
+    images = {}
+    for path in paths:
+        image = handler.decode_image(path.read_bytes(), path.name)
+        if image is None:
+            continue
+        images[path.name] = handler.rotate_image(image, tilt) if tilt else image
+    return images
+
+
+def run_mode(ocr, images, auto_rotate, enhance_text):
+    """
+    OCR semua gambar dengan satu kombinasi preprocessing
+
+    Returns:
+        dict: {nama_file: {'seconds', 'skew', 'fields'}}
+    """
+    saved = OCR_CONFIG.get('auto_rotate'), OCR_CONFIG.get('enhance_text')
+    OCR_CONFIG['auto_rotate'], OCR_CONFIG['enhance_text'] = auto_rotate, enhance_text
+    results = {}
+    try:
+        for name, image in images.items():
+            started = time.perf_counter()
+            result = ocr.process_array(image, source_name=name, save_files=False)
+            results[name] = {
+                'seconds': time.perf_counter() - started,
+                'skew': ocr.image_handler.estimate_skew(image) if auto_rotate else None,
+                'fields': result.fields if result is not None else {},
+            }
+    finally:
+        OCR_CONFIG['auto_rotate'], OCR_CONFIG['enhance_text'] = saved
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan akurasi OCR dengan / tanpa preprocessing")
+    parser.add_argument("--images", default=str(INPUT_DIR), help="Folder contoh kartu KTP")
+    parser.add_argument("--truth", help="JSON kunci jawaban {nama_file: {field: nilai}}")
+    parser.add_argument("--tilt", type=float, default=0.0,
+                        help="Putar kartu sekian derajat (berlawanan arah jarum jam) sebelum OCR")
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan lengkap ke file JSON")
+    args = parser.parse_args()
+
+    from src.ocr_processor import OCRProcessor
+
+    paths = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in SUPPORTED_FORMATS)
+    images = load_images(paths, args.tilt)
+    if not images:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+    truth = json.loads(Path(args.truth).read_text(encoding='utf-8')) if args.truth else None
+
+    ocr = OCRProcessor(result_cache=False, batching=False)
+    report = {'images': list(images), 'tilt': args.tilt, 'modes': {}}
+    for name, (auto_rotate, enhance_text) in MODES:
+        print(f"Mengukur mode {name}...")
+        report['modes'][name] = {'results': run_mode(ocr, images, auto_rotate, enhance_text)}
+
+    baseline = report['modes']['mati']['results']
+    print(f"\n{'gambar':30} {'skew':>6} " + " ".join(f"{name:>9}" for name, _ in MODES))
+    accuracy = {name: [] for name, _ in MODES}
+    for image in report['images']:
+        reference = truth.get(image, {}) if truth else baseline[image]['fields']
+        row = []
+        for name, _ in MODES:
+            value = _field_accuracy(report['modes'][name]['results'][image]['fields'], reference)
+            if value is not None:
+                accuracy[name].append(value)
+            row.append(f"{_percent(value):>9}")
+        skew = report['modes']['rotasi']['results'][image]['skew']
+        print(f"{image[:30]:30} {skew:+6.1f} " + " ".join(row))
+
+    print("\n=== Ringkasan ===")
+    basis = "kunci jawaban" if truth else "mode mati"
+    for name, _ in MODES:
+        mode = report['modes'][name]
+        mode['median_seconds'] = statistics.median(r['seconds'] for r in mode['results'].values())
+        mode['field_accuracy'] = statistics.mean(accuracy[name]) if accuracy[name] else None
+        print(f"{name}: median {mode['median_seconds']:.2f}s/kartu, "
+              f"akurasi field vs {basis}: {_percent(mode['field_accuracy'])}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+        print(f"\nLaporan disimpan ke {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
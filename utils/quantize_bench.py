@@ -0,0 +1,135 @@
+"""
+Quantize bench - Bandingkan reader fp32 dan int8 (kuantisasi dinamis) di CPU
+
+Untuk setiap mode laporan berisi waktu memuat reader (konversi penuh vs dari
+cache modul), latency OCR per kartu, dan akurasi field. Jika file kunci
+jawaban diberikan (JSON {nama_file: {field: nilai}}), akurasi dihitung
+terhadap kunci itu; jika tidak, hasil int8 dibandingkan dengan fp32.
+
+Contoh:
+    python -m utils.quantize_bench
+    python -m utils.quantize_bench --images assets/input --truth truth.json --json bench.json
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from config import INPUT_DIR, SUPPORTED_FORMATS
+
+MODES = (("fp32", False), ("int8", True))
+
+
+def _normalize(value):
+    return " ".join(str(value or "").upper().split())
+
+
+def _field_accuracy(fields, reference):
+    """Porsi field referensi (yang tidak kosong) yang terbaca sama persis"""
+    keys = [k for k, v in reference.items() if _normalize(v)]
+    if not keys:
+        return None
+    return sum(_normalize(fields.get(k)) == _normalize(reference[k]) for k in keys) / len(keys)
+
+
+def _percent(value):
+    return f"{value * 100:.1f}%" if value is not None else "-"
+
+
+def measure_load(quantize):
+    """
+    Waktu membuat reader: konversi penuh (tanpa cache) dan dari cache modul
+
+    Returns:
+        dict: {'uncached': detik, 'cached': detik}
+    """
+    from src.model_cache import create_reader
+
+    started = time.perf_counter()
+    create_reader(quantize=quantize, use_cache=False)
+    uncached = time.perf_counter() - started
+
+    create_reader(quantize=quantize)  # pastikan file cache ada
+    started = time.perf_counter()
+    create_reader(quantize=quantize)
+    return {'uncached': uncached, 'cached': time.perf_counter() - started}
+
+
+def run_mode(quantize, images):
+    """
+    OCR semua gambar dengan satu mode reader
+
+    Returns:
+        dict: {nama_file: {'seconds', 'fields'}}
+    """
+    from src.ocr_processor import OCRProcessor, ReaderPool
+
+    pool = ReaderPool(size=1, quantize=quantize)
+    pool.load().warmup()
+    ocr = OCRProcessor(reader_pool=pool, result_cache=False, batching=False)
+    results = {}
+    try:
+        for path in images:
+            started = time.perf_counter()
+            result = ocr.process_image(path, save_files=False)
+            results[path.name] = {
+                'seconds': time.perf_counter() - started,
+                'fields': result.fields if result is not None else {},
+            }
+    finally:
+        pool.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan reader EasyOCR fp32 vs int8 di CPU")
+    parser.add_argument("--images", default=str(INPUT_DIR), help="Folder contoh kartu KTP")
+    parser.add_argument("--truth", help="JSON kunci jawaban {nama_file: {field: nilai}}")
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan lengkap ke file JSON")
+    args = parser.parse_args()
+
+    images = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in SUPPORTED_FORMATS)
+    if not images:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+    truth = json.loads(Path(args.truth).read_text(encoding='utf-8')) if args.truth else None
+
+    report = {'images': [p.name for p in images], 'modes': {}}
+    for name, quantize in MODES:
+        print(f"Mengukur mode {name}...")
+        report['modes'][name] = {'load': measure_load(quantize), 'results': run_mode(quantize, images)}
+
+    fp32, int8 = report['modes']['fp32']['results'], report['modes']['int8']['results']
+    print(f"\n{'gambar':30} {'fp32 s':>8} {'int8 s':>8} {'speedup':>8} "
+          f"{'akurasi fp32':>13} {'akurasi int8':>13}")
+    accuracy = {'fp32': [], 'int8': []}
+    for image in report['images']:
+        reference = truth.get(image, {}) if truth else fp32[image]['fields']
+        row_accuracy = {}
+        for name, results in (('fp32', fp32), ('int8', int8)):
+            value = _field_accuracy(results[image]['fields'], reference)
+            row_accuracy[name] = value
+            if value is not None:
+                accuracy[name].append(value)
+        speedup = fp32[image]['seconds'] / int8[image]['seconds'] if int8[image]['seconds'] else 0
+        print(f"{image[:30]:30} {fp32[image]['seconds']:8.2f} {int8[image]['seconds']:8.2f} "
+              f"{speedup:7.2f}x {_percent(row_accuracy['fp32']):>13} {_percent(row_accuracy['int8']):>13}")
+
+    print("\n=== Ringkasan ===")
+    basis = "kunci jawaban" if truth else "hasil fp32"
+    for name, _ in MODES:
+        mode = report['modes'][name]
+        latencies = [r['seconds'] for r in mode['results'].values()]
+        mode['median_seconds'] = statistics.median(latencies)
+        mode['field_accuracy'] = statistics.mean(accuracy[name]) if accuracy[name] else None
+        print(f"{name}: median {mode['median_seconds']:.2f}s/kartu, "
+              f"load {mode['load']['uncached']:.2f}s (cache {mode['load']['cached']:.2f}s), "
+              f"akurasi field vs {basis}: {_percent(mode['field_accuracy'])}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+        print(f"\nLaporan disimpan ke {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Resources - Pembagian CPU antar proses OCR (workers x thread per worker)
+
+Torch (intra-op), OpenCV dan pool worker kita masing-masing default memakai
+semua core, sehingga beberapa proses OCR saling berebut CPU. Modul ini
+menentukan satu rencana: jumlah proses worker dan thread per worker, lalu
+setiap worker menerapkannya (torch.set_num_threads, cv2.setNumThreads dan
+opsional CPU affinity ke irisan core sendiri).
+
+Urutan sumber rencana: argumen eksplisit, RESOURCE_CONFIG, hasil kalibrasi
+untuk jumlah CPU yang sama, lalu heuristik (cpu // 4 worker). Pool bersarang
+(batch, supervisor) dan admission control memakai child_plan, yang membagi
+jatah proses ini (hasil apply) dan bukan seluruh mesin.
+
+Contoh:
+    python -m utils.resources show
+    python -m utils.resources calibrate --images assets/input --duration 20
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from config import INPUT_DIR, RESOURCE_CONFIG, SUPPORTED_FORMATS
+
+logger = logging.getLogger(__name__)
+
+# Jatah CPU proses ini setelah apply(): (cpus, threads); None = seluruh mesin
+_budget = None
+
+
+@dataclass
+class ResourcePlan:
+    cpus: list
+    workers: int
+    threads_per_worker: int
+    source: str = "heuristik"
+
+    def cpus_for(self, index):
+        """Irisan core untuk worker ke-index (berputar jika workers x threads > CPU)"""
+        start = (index * self.threads_per_worker) % len(self.cpus)
+        doubled = self.cpus + self.cpus
+        return doubled[start:start + min(self.threads_per_worker, len(self.cpus))]
+
+
+def available_cpus():
+    """CPU yang boleh dipakai proses ini (affinity/cgroup), dibatasi RESOURCE_CONFIG['cpus']"""
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = list(range(os.cpu_count() or 1))
+    if RESOURCE_CONFIG['cpus']:
+        cpus = cpus[:RESOURCE_CONFIG['cpus']]
+    return cpus
+
+
+def _load_calibration(cpu_count):
+    """Hasil kalibrasi tersimpan, hanya jika diukur di jumlah CPU yang sama"""
+    path = Path(RESOURCE_CONFIG['calibration_file'])
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return data if data.get('cpus') == cpu_count else None
+
+
+def plan(workers=None, threads=None):
+    """
+    Tentukan workers x thread per worker untuk proses OCR
+
+    Args:
+        workers (int, optional): Paksa jumlah worker (mis. dari argumen CLI)
+        threads (int, optional): Paksa thread per worker
+
+    Returns:
+        ResourcePlan: Rencana pembagian CPU
+    """
+    cpus = available_cpus()
+    count = len(cpus)
+    calibration = _load_calibration(count)
+    source = "argumen" if workers or threads else "heuristik"
+
+    if not workers:
+        if RESOURCE_CONFIG['workers']:
+            workers, source = RESOURCE_CONFIG['workers'], "config"
+        elif calibration:
+            workers, source = calibration['workers'], "kalibrasi"
+        else:
+            workers = max(1, count // 4)
+    workers = max(1, int(workers))
+
+    if not threads:
+        if RESOURCE_CONFIG['threads_per_worker']:
+            threads = RESOURCE_CONFIG['threads_per_worker']
+        elif calibration and calibration['workers'] == workers:
+            threads = calibration['threads_per_worker']
+        else:
+            threads = max(1, count // workers)
+    return ResourcePlan(cpus, workers, max(1, int(threads)), source)
+
+
+def apply(threads, cpus=None):
+    """
+    Terapkan batas thread (dan affinity) di proses ini
+
+    Args:
+        threads (int): Thread torch intra-op dan OpenCV
+        cpus (list, optional): Core untuk affinity (hanya jika RESOURCE_CONFIG['pin_cpus'])
+            sekaligus jatah proses ini untuk child_plan
+    """
+    global _budget
+    _budget = (list(cpus) if cpus else available_cpus()[:threads], threads)
+    # Untuk library OpenMP yang belum terimport / proses anak
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+    if cpus and RESOURCE_CONFIG['pin_cpus'] and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.warning(f"Gagal mengatur CPU affinity {cpus}: {str(e)}")
+
+
+def apply_worker(resource_plan, index):
+    """Terapkan rencana untuk worker ke-index"""
+    apply(resource_plan.threads_per_worker, resource_plan.cpus_for(index))
+
+
+def child_plan(workers=None, threads=None):
+    """
+    Rencana pool bersarang (batch / supervisor) di dalam jatah proses ini
+
+    Di proses yang sudah menerima irisan lewat apply (worker prefork, worker
+    job, worker pool), workers x threads dibagi dari jatah thread proses itu,
+    bukan dari seluruh mesin. Tanpa apply sama dengan plan.
+
+    Args:
+        workers (int, optional): Paksa jumlah worker (dibatasi jatah thread)
+        threads (int, optional): Paksa thread per worker
+
+    Returns:
+        ResourcePlan: Rencana pembagian jatah proses ini
+    """
+    if _budget is None:
+        return plan(workers, threads)
+    cpus, budget = _budget
+    workers = max(1, min(int(workers or budget // 4 or 1), budget))
+    threads = max(1, int(threads or budget // workers))
+    return ResourcePlan(cpus, workers, threads, "jatah proses")
+
+
+# ----- Kalibrasi -----
+def _calibration_worker(index, resource_plan, images, duration, barrier, results):
+    apply_worker(resource_plan, index)
+    from src.ocr_processor import OCRProcessor
+
+    ocr = OCRProcessor(result_cache=False, batching=False)
+    ocr.warmup()
+    data = [(path.name, path.read_bytes()) for path in images]
+    barrier.wait()
+
+    latencies = []
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        name, content = data[len(latencies) % len(data)]
+        started = time.perf_counter()
+        ocr.process_bytes(content, name, save_files=False)
+        latencies.append(time.perf_counter() - started)
+    results.put(latencies)
+
+
+def measure_split(workers, threads, images, duration):
+    """
+    Throughput OCR dengan `workers` proses x `threads` thread
+
+    Returns:
+        dict: workers, threads_per_worker, images_per_second, p50_seconds
+    """
+    context = multiprocessing.get_context("spawn")
+    resource_plan = plan(workers, threads)
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_calibration_worker,
+                        args=(i, resource_plan, images, duration, barrier, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    latencies = []
+    for _ in processes:
+        latencies += results.get()
+    for process in processes:
+        process.join()
+    return {
+        'workers': workers,
+        'threads_per_worker': threads,
+        'images_per_second': len(latencies) / duration,
+        'p50_seconds': statistics.median(latencies) if latencies else None,
+    }
+
+
+def candidate_splits(cpu_count):
+    """workers x threads yang memakai semua CPU: 1, 2, 4, ... worker"""
+    splits = []
+    workers = 1
+    while workers <= cpu_count:
+        splits.append((workers, cpu_count // workers))
+        workers *= 2
+    if splits[-1][0] != cpu_count:
+        splits.append((cpu_count, 1))
+    return splits
+
+
+def calibrate(images, duration=20, splits=None):
+    """
+    Ukur setiap pembagian dan simpan yang tercepat ke RESOURCE_CONFIG['calibration_file']
+
+    Returns:
+        dict: Hasil kalibrasi (best + semua pengukuran)
+    """
+    cpu_count = len(available_cpus())
+    measurements = []
+    for workers, threads in splits or candidate_splits(cpu_count):
+        logger.info(f"Kalibrasi {workers} worker x {threads} thread...")
+        measurements.append(measure_split(workers, threads, images, duration))
+
+    best = max(measurements, key=lambda m: m['images_per_second'])
+    report = {
+        'cpus': cpu_count,
+        'workers': best['workers'],
+        'threads_per_worker': best['threads_per_worker'],
+        'images_per_second': best['images_per_second'],
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+        'measurements': measurements,
+    }
+    path = Path(RESOURCE_CONFIG['calibration_file'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    return report
+
+
+def _parse_split(value):
+    workers, threads = value.lower().split("x")
+    return int(workers), int(threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pembagian CPU proses OCR")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="Tampilkan rencana yang berlaku")
+    cal = sub.add_parser("calibrate", help="Cari workers x threads tercepat di mesin ini")
+    cal.add_argument("--images", default=str(INPUT_DIR), help="Folder contoh gambar")
+    cal.add_argument("--duration", type=float, default=20, help="Detik pengukuran per pembagian")
+    cal.add_argument("--splits", nargs="*", type=_parse_split,
+                     help="Pembagian yang diuji, mis. 1x8 2x4 4x2 (default semua CPU)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.command == "show":
+        current = plan()
+        print(f"CPU: {len(current.cpus)} ({current.cpus})")
+        print(f"Rencana ({current.source}): {current.workers} worker x {current.threads_per_worker} thread, "
+              f"pin_cpus={RESOURCE_CONFIG['pin_cpus']}")
+        return
+
+    images = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in SUPPORTED_FORMATS)
+    if not images:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+    report = calibrate(images, args.duration, args.splits)
+
+    print(f"\n{'workers':>8} {'threads':>8} {'gambar/s':>10} {'p50 s':>8}")
+    for m in report['measurements']:
+        p50 = f"{m['p50_seconds']:.2f}" if m['p50_seconds'] is not None else "-"
+        print(f"{m['workers']:8} {m['threads_per_worker']:8} {m['images_per_second']:10.2f} {p50:>8}")
+    print(f"\nTerbaik: {report['workers']} worker x {report['threads_per_worker']} thread "
+          f"({report['images_per_second']:.2f} gambar/s), disimpan ke {RESOURCE_CONFIG['calibration_file']}")
+
+
+if __name__ == "__main__":
+    main()
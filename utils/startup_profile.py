@@ -0,0 +1,133 @@
+"""
+Startup profile - Ukur cold start aplikasi web
+
+Laporan berisi waktu import per modul (python -X importtime) dan durasi
+fase startup di proses baru: import main, create_app, dan request pertama
+ke beberapa route ringan. Semua diukur di subprocess supaya benar-benar dingin.
+
+Contoh:
+    python -m utils.startup_profile
+    python -m utils.startup_profile --top 30 --json assets/logs/startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_ROUTES = ("/healthz", "/download_excel", "/metrics")
+
+# Dijalankan di subprocess: ukur fase startup + request pertama per route.
+# Hasil dicetak dengan prefix karena log aplikasi juga ditulis ke stdout.
+_MARKER = "STARTUP_PROFILE "
+_PHASES_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+app = main.create_app(warmup=False)
+t2 = time.perf_counter()
+client = app.test_client()
+routes = {}
+for path in sys.argv[1:]:
+    start = time.perf_counter()
+    status = client.get(path).status_code
+    routes[path] = {"status": status, "seconds": time.perf_counter() - start}
+heavy = [m for m in ("torch", "easyocr", "cv2", "numpy", "openpyxl") if m in sys.modules]
+print("STARTUP_PROFILE " + json.dumps({"import_main": t1 - t0, "create_app": t2 - t1,
+                  "routes": routes, "heavy_modules_loaded": heavy}))
+"""
+
+
+def profile_imports(module="main"):
+    """
+    Jalankan `python -X importtime -c "import <module>"` dan parse hasilnya
+
+    Returns:
+        list: dict {'module', 'self_ms', 'cumulative_ms', 'depth'} sesuai urutan import
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return rows
+
+
+def profile_phases(routes=DEFAULT_ROUTES):
+    """
+    Ukur fase startup di proses baru
+
+    Returns:
+        dict: import_main, create_app (detik), routes {path: {status, seconds}},
+              heavy_modules_loaded (modul berat yang sudah terimport setelah startup)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", _PHASES_SCRIPT, *routes],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Gagal mengukur startup:\n{proc.stderr[-2000:]}")
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(_MARKER):
+            return json.loads(line[len(_MARKER):])
+    raise RuntimeError("Output profil startup tidak ditemukan")
+
+
+def _top_level_totals(rows):
+    """Total waktu import per package top-level (mis. 'flask', 'cv2')"""
+    totals = {}
+    for row in rows:
+        if row['depth'] == 1:
+            package = row['module'].split(".")[0]
+            totals[package] = totals.get(package, 0.0) + row['cumulative_ms']
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil cold start aplikasi web OCR")
+    parser.add_argument("--module", default="main", help="Modul yang diimport")
+    parser.add_argument("--top", type=int, default=20, help="Jumlah modul terlama yang ditampilkan")
+    parser.add_argument("--routes", nargs="*", default=list(DEFAULT_ROUTES),
+                        help="Route yang diukur request pertamanya")
+    parser.add_argument("--json", dest="json_path", help="Simpan laporan lengkap ke file JSON")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    phases = profile_phases(args.routes)
+
+    print(f"=== Import '{args.module}' per package ===")
+    for package, ms in _top_level_totals(rows)[:args.top]:
+        print(f"{ms:10.1f} ms  {package}")
+
+    print(f"\n=== {args.top} modul terlama (kumulatif) ===")
+    for row in sorted(rows, key=lambda r: r['cumulative_ms'], reverse=True)[:args.top]:
+        print(f"{row['cumulative_ms']:10.1f} ms  {row['self_ms']:8.1f} ms self  {row['module']}")
+
+    print("\n=== Fase startup ===")
+    print(f"{phases['import_main'] * 1000:10.1f} ms  import main")
+    print(f"{phases['create_app'] * 1000:10.1f} ms  create_app")
+    for path, info in phases['routes'].items():
+        print(f"{info['seconds'] * 1000:10.1f} ms  GET {path} ({info['status']})")
+    print(f"Modul berat sudah terimport: {', '.join(phases['heavy_modules_loaded']) or '-'}")
+
+    if args.json_path:
+        report = {'imports': rows, 'phases': phases}
+        Path(args.json_path).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\nLaporan disimpan ke {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Thumbnails - Turunan gambar upload (JPEG/WebP) untuk ditampilkan di web
+
+Thumbnail dibuat saat pertama diminta pada beberapa lebar tetap, disimpan di
+disk, lalu dipakai ulang. Total ukuran cache dibatasi; file yang paling lama
+tidak diminta dihapus lebih dulu (sama seperti cache hasil OCR).
+"""
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+
+from config import THUMBNAIL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'jpeg': ('jpg', 'image/jpeg'),
+    'webp': ('webp', 'image/webp'),
+}
+
+# Nama upload dari ContentStore: sha256 isi file, jadi isinya tidak pernah berubah
+_CONTENT_HASH_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+def is_immutable_name(filename):
+    """True jika nama file upload berupa hash isi (aman di-cache selamanya)"""
+    return bool(_CONTENT_HASH_NAME.match(filename))
+
+
+def pick_width(requested):
+    """Bulatkan lebar yang diminta ke lebar tetap terdekat di atasnya"""
+    widths = sorted(THUMBNAIL_CONFIG['widths'])
+    for width in widths:
+        if requested <= width:
+            return width
+    return widths[-1]
+
+
+def pick_format(accept_header):
+    """WebP jika browser mendukung, selain itu JPEG"""
+    return 'webp' if accept_header and 'image/webp' in accept_header else 'jpeg'
+
+
+class ThumbnailCache:
+    def __init__(self, source_dir, cache_dir=None, max_mb=None):
+        self.source_dir = Path(source_dir)
+        self.cache_dir = Path(cache_dir or THUMBNAIL_CONFIG['dir'])
+        self.max_bytes = (max_mb or THUMBNAIL_CONFIG['max_mb']) * 1024 * 1024
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*") if p.is_file())
+
+    def get(self, filename, width, fmt='jpeg'):
+        """
+        Ambil (atau buat) thumbnail satu file upload
+
+        Args:
+            filename (str): Nama file di folder upload (sudah secure)
+            width (int): Lebar yang diminta (dibulatkan lewat pick_width)
+            fmt (str): 'jpeg' atau 'webp'
+
+        Returns:
+            tuple: (Path thumbnail, mimetype), atau (None, None) jika sumber
+                   tidak ada / tidak bisa dibaca
+        """
+        ext, mimetype = FORMATS[fmt]
+        source = self.source_dir / filename
+        key = Path(filename).stem
+        if not is_immutable_name(filename):
+            # Nama lama (bukan hash) bisa ditimpa: versi sumber ikut jadi key
+            try:
+                key = f"{key}-{source.stat().st_mtime_ns}"
+            except FileNotFoundError:
+                return None, None
+        target = self.cache_dir / f"{key}-{width}.{ext}"
+
+        if target.exists():
+            try:
+                os.utime(target)  # tandai baru dipakai untuk eviction
+            except FileNotFoundError:
+                pass
+            else:
+                return target, mimetype
+        if not source.is_file():
+            return None, None
+
+        try:
+            size = self._render(source, target, width, fmt)
+        except Exception as e:
+            logger.error(f"Gagal membuat thumbnail {filename} ({width}px): {str(e)}")
+            return None, None
+        with self._lock:
+            self._bytes += size
+            over_limit = self._bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+        return target, mimetype
+
+    def _render(self, source, target, width, fmt):
+        """Resize + encode ke file sementara lalu os.replace; return ukuran file"""
+        from PIL import Image, ImageOps
+
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            if fmt == 'webp':
+                image.save(tmp, 'WEBP', quality=THUMBNAIL_CONFIG['webp_quality'])
+            else:
+                image.save(tmp, 'JPEG', quality=THUMBNAIL_CONFIG['jpeg_quality'],
+                           optimize=True, progressive=True)
+        os.replace(tmp, target)
+        return target.stat().st_size
+
+    def _evict(self):
+        """Hapus thumbnail paling lama tidak dipakai sampai di bawah batas"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self._lock:
+            self._bytes = total
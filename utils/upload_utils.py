@@ -0,0 +1,236 @@
+"""
+Upload utilities - Baca upload ke buffer terbatas, cek header gambar,
+dan simpan file asli secara asynchronous
+"""
+import io
+import logging
+import os
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from config import SUPPORTED_FORMATS, UPLOAD_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-persist")
+
+
+class UploadRejected(Exception):
+    """Upload ditolak sebelum diproses (ukuran/format/dimensi)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff_image_header(data):
+    """
+    Kenali format dan dimensi gambar hanya dari beberapa byte awal
+
+    Args:
+        data (bytes): Byte awal file
+
+    Returns:
+        dict: {'format', 'width', 'height'} (dimensi None jika belum terbaca),
+              atau None jika format tidak dikenali
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) >= 24:
+            width, height = struct.unpack(">II", data[16:24])
+            return {'format': 'png', 'width': width, 'height': height}
+        return {'format': 'png', 'width': None, 'height': None}
+
+    if data.startswith(b"\xff\xd8"):
+        width, height = _jpeg_size(data)
+        return {'format': 'jpeg', 'width': width, 'height': height}
+
+    if data.startswith(b"BM"):
+        if len(data) >= 26:
+            width, height = struct.unpack("<ii", data[18:26])
+            return {'format': 'bmp', 'width': width, 'height': abs(height)}
+        return {'format': 'bmp', 'width': None, 'height': None}
+
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        width, height = _tiff_size(data)
+        return {'format': 'tiff', 'width': width, 'height': height}
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        width, height = _webp_size(data)
+        return {'format': 'webp', 'width': width, 'height': height}
+
+    return None
+
+
+def _jpeg_size(data):
+    """Cari marker SOFn dan baca dimensinya"""
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            i += 1 if marker == 0xFF else 2
+            continue
+        seg_len = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + seg_len
+    return None, None
+
+
+def _tiff_size(data):
+    """Baca tag ImageWidth (256) / ImageLength (257) dari IFD pertama"""
+    endian = "<" if data[:2] == b"II" else ">"
+    try:
+        ifd = struct.unpack(endian + "I", data[4:8])[0]
+        count = struct.unpack(endian + "H", data[ifd:ifd + 2])[0]
+        dims = {}
+        for n in range(count):
+            entry = data[ifd + 2 + n * 12:ifd + 14 + n * 12]
+            tag, typ = struct.unpack(endian + "HH", entry[:4])
+            if tag in (256, 257):
+                fmt = "H" if typ == 3 else "I"
+                dims[tag] = struct.unpack(endian + fmt, entry[8:8 + struct.calcsize(fmt)])[0]
+        return dims.get(256), dims.get(257)
+    except struct.error:
+        return None, None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    try:
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            b = data[21:25]
+            width = 1 + (((b[1] & 0x3F) << 8) | b[0])
+            height = 1 + (((b[3] & 0xF) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+            return width, height
+        if chunk == b"VP8X":
+            width = 1 + int.from_bytes(data[24:27], "little")
+            height = 1 + int.from_bytes(data[27:30], "little")
+            return width, height
+    except (struct.error, IndexError):
+        pass
+    return None, None
+
+
+def _check_dimensions(info):
+    """Tolak dimensi tidak valid atau melebihi UPLOAD_CONFIG['max_pixels']"""
+    width, height = info['width'], info['height']
+    if width <= 0 or height <= 0:
+        raise UploadRejected("Header gambar tidak valid")
+    if width * height > UPLOAD_CONFIG['max_pixels']:
+        raise UploadRejected(f"Dimensi gambar terlalu besar: {width}x{height}", 413)
+
+
+def _read_dimensions(data, info):
+    """
+    Dimensi dari seluruh file jika header awal belum memuatnya (mis. JPEG
+    dengan EXIF besar): sniff ulang, lalu PIL (hanya membaca header, tanpa
+    decode pixel)
+
+    Raises:
+        UploadRejected: Jika dimensi tetap tidak terbaca
+    """
+    full = sniff_image_header(data)
+    if full is not None and full['width'] is not None and full['height'] is not None:
+        return dict(info, width=full['width'], height=full['height'])
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+    except Exception:
+        raise UploadRejected("Dimensi gambar tidak terbaca")
+    return dict(info, width=width, height=height)
+
+
+def read_image_upload(stream, content_length=None):
+    """
+    Baca upload gambar ke memori dengan batas ukuran dan validasi awal
+
+    Header dibaca dulu untuk mengenali format dan dimensi. Untuk body mentah
+    (request.stream) upload yang terlalu besar atau tidak didukung ditolak
+    sebelum sisa body dibaca; upload multipart sudah di-spool penuh oleh
+    werkzeug, jadi di sana penolakan hanya mencegah decode. Dimensi yang
+    tidak ada di header awal dibaca dari seluruh file, dan max_pixels selalu
+    dicek sebelum decode.
+
+    Args:
+        stream: File-like dari request (FileStorage.stream)
+        content_length (int, optional): Content-Length request
+
+    Returns:
+        tuple: (bytes, info dict dari sniff_image_header)
+
+    Raises:
+        UploadRejected: Jika upload tidak memenuhi syarat
+    """
+    max_bytes = UPLOAD_CONFIG['max_mb'] * 1024 * 1024
+    if content_length and content_length > max_bytes:
+        raise UploadRejected(f"File terlalu besar (max {UPLOAD_CONFIG['max_mb']}MB)", 413)
+
+    head = stream.read(UPLOAD_CONFIG['header_bytes'])
+    info = sniff_image_header(head)
+    if info is None or f".{info['format']}" not in SUPPORTED_FORMATS:
+        raise UploadRejected("Format gambar tidak didukung", 415)
+
+    known = info['width'] is not None and info['height'] is not None
+    if known:
+        _check_dimensions(info)
+
+    rest = stream.read(max_bytes - len(head) + 1)
+    if len(head) + len(rest) > max_bytes:
+        raise UploadRejected(f"File terlalu besar (max {UPLOAD_CONFIG['max_mb']}MB)", 413)
+    data = head + rest
+    if not known:
+        info = _read_dimensions(data, info)
+        _check_dimensions(info)
+    return data, info
+
+
+def write_file_atomic(data, target):
+    """
+    Tulis file lewat tmp + os.replace supaya pembaca tidak melihat file setengah jadi
+
+    File sementara dibuat dengan mkstemp di direktori target: unik per
+    thread dan proses, dan os.replace tetap atomik (filesystem sama).
+    """
+    target = Path(target)
+    fd, tmp = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return target
+
+
+def persist_upload_async(data, target):
+    """
+    Simpan file upload asli di background thread (tidak memblokir request)
+
+    Returns:
+        concurrent.futures.Future: selesai dengan Path target
+    """
+    future = _persist_executor.submit(write_file_atomic, data, target)
+
+    def _log_error(f):
+        if f.exception() is not None:
+            logger.error(f"Gagal menyimpan upload {target}: {f.exception()}")
+
+    future.add_done_callback(_log_error)
+    return future
+
+
+def wait_pending_uploads():
+    """Tunggu semua upload yang sedang disimpan di background (sebelum proses keluar)"""
+    _persist_executor.shutdown(wait=True)
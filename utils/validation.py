@@ -1,9 +1,13 @@
+import importlib.util
 import logging
 import sys
 from pathlib import Path
 from config import IMAGE_PATHS, INPUT_DIR, OUTPUT_DIR, LOGS_DIR
 
 def validate_setup():
+    """
+    Validasi environment. Dipanggil sekali saat startup (bukan per request).
+    """
     logger = logging.getLogger(__name__)
     try:
         # Validasi Python
@@ -33,13 +37,10 @@ def validate_dependencies():
     required_packages = ['easyocr', 'cv2', 'PIL', 'numpy']
     missing_packages = []
     for package in required_packages:
-        try:
-            if package == 'cv2': import cv2
-            elif package == 'PIL': from PIL import Image
-            elif package == 'easyocr': import easyocr
-            elif package == 'numpy': import numpy
-            logger.info(f"✅ {package} tersedia")
-        except ImportError:
+        # find_spec hanya mencari modul, tidak mengimport torch dkk.
+        if importlib.util.find_spec(package) is not None:
+            logger.debug(f"✅ {package} tersedia")
+        else:
             missing_packages.append(package)
             logger.error(f"❌ {package} tidak ditemukan")
     if missing_packages:
@@ -53,7 +54,7 @@ def validate_directories():
     for name, directory in directories:
         try:
             directory.mkdir(parents=True, exist_ok=True)
-            logger.info(f"✅ Direktori {name}: {directory}")
+            logger.debug(f"✅ Direktori {name}: {directory}")
         except Exception as e:
             logger.error(f"❌ Error direktori {name}: {str(e)}")
             return False
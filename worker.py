@@ -0,0 +1,60 @@
+"""
+Jalankan pool worker OCR yang menguras antrian job (src/job_queue.py)
+
+Contoh:
+    python worker.py --workers 4
+"""
+import argparse
+import logging
+import multiprocessing
+import signal
+import sys
+
+from config import JOB_CONFIG, LOG_FORMAT, LOG_LEVEL
+from src.job_queue import run_worker
+from utils import resources
+
+
+def _worker_entry(stop_event, resource_plan, index):
+    # Ctrl+C ditangani proses induk lewat stop_event, bukan KeyboardInterrupt di anak
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    resources.apply_worker(resource_plan, index)
+    run_worker(stop_event=stop_event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker antrian OCR")
+    parser.add_argument("--workers", type=int, default=JOB_CONFIG['workers'],
+                        help="Jumlah proses worker (default RESOURCE_CONFIG / kalibrasi)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Thread torch/OpenCV per worker (default RESOURCE_CONFIG / kalibrasi)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL), format=LOG_FORMAT,
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    logger = logging.getLogger(__name__)
+
+    resource_plan = resources.plan(args.workers, args.threads)
+    stop_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=_worker_entry, args=(stop_event, resource_plan, index))
+        for index in range(resource_plan.workers)
+    ]
+    for p in processes:
+        p.start()
+    logger.info(f"{len(processes)} worker OCR berjalan "
+                f"({resource_plan.threads_per_worker} thread per worker, {resource_plan.source})")
+
+    def _stop(signum, frame):
+        logger.info("Menghentikan worker...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    for p in processes:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()